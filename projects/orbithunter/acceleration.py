@@ -0,0 +1,87 @@
+import numpy as np
+
+__all__ = ['AndersonAcceleration']
+
+
+class AndersonAcceleration:
+    """ Anderson acceleration (Anderson mixing) of a fixed-point iteration x -> g(x) on flat vectors.
+
+    Parameters
+    ----------
+    depth : int
+        The number of previous iterates whose differences are kept, m.
+    mixing : float
+        The relaxation (mixing) parameter, beta; 1 mixes the images g(x) alone.
+    regularization : float
+        Tikhonov regularization of the least-squares problem, relative to its largest diagonal element.
+
+    Notes
+    -----
+    With the residual f_k = g(x_k) - x_k, the differences of the last m iterates and residuals are the columns
+    of dX and dF. The coefficients gamma minimize ||f_k - dF gamma||, and the next iterate is
+    x_{k+1} = x_k + beta f_k - (dX + beta dF) gamma, the type II method of Walker and Ni. The differences are
+    the rows of two preallocated arrays used as a ring buffer, so the memory is 2 m times the size of the
+    vectors regardless of the number of iterations. The least-squares problem is solved by its m by m normal
+    equations, which is stable with the regularization and short histories; the caller is responsible for
+    safeguarding, e.g. by rejecting accelerated iterates which do not decrease an objective, and for calling
+    reset whenever the fixed-point map changes.
+
+    Examples
+    --------
+    >>> acceleration = AndersonAcceleration(depth=5)
+    >>> for iteration in range(maxiter):
+    ...     x = acceleration.step(x, g(x) - x)
+    """
+
+    def __init__(self, depth=5, mixing=1.0, regularization=1e-10):
+        self.depth = depth
+        self.mixing = mixing
+        self.regularization = regularization
+        self._dx, self._df = None, None
+        self._previous = None
+        self._count = 0
+
+    def __len__(self):
+        return min(self._count, self.depth)
+
+    def __repr__(self):
+        return self.__class__.__name__ + '(depth={}, {} differences)'.format(self.depth, len(self))
+
+    def reset(self):
+        """ Discard the history, such that the next step is a plain (mixed) fixed-point step """
+        self._previous = None
+        self._count = 0
+        return None
+
+    def step(self, x, residual):
+        """ The next iterate of the accelerated iteration
+
+        Parameters
+        ----------
+        x : ndarray
+            The current iterate, x_k.
+        residual : ndarray
+            The fixed-point residual at the current iterate, f_k = g(x_k) - x_k.
+
+        Returns
+        -------
+        ndarray :
+            The next iterate, x_{k+1}.
+        """
+        if self._dx is None:
+            self._dx, self._df = np.empty((self.depth, x.size)), np.empty((self.depth, x.size))
+        if self._previous is not None:
+            index = self._count % self.depth
+            np.subtract(x, self._previous[0], out=self._dx[index])
+            np.subtract(residual, self._previous[1], out=self._df[index])
+            self._count += 1
+        self._previous = (x.copy(), residual.copy())
+        next_x = x + self.mixing * residual
+        if not self._count:
+            return next_x
+        dx, df = self._dx[:len(self)], self._df[:len(self)]
+        normal_matrix = np.dot(df, df.T)
+        scale = max(normal_matrix.diagonal().max(), np.finfo(float).tiny)
+        normal_matrix[np.diag_indices_from(normal_matrix)] += self.regularization * scale
+        gamma = np.linalg.solve(normal_matrix, np.dot(df, residual))
+        return next_x - np.dot(gamma, dx + self.mixing * df)
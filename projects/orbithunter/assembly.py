@@ -0,0 +1,187 @@
+from concurrent.futures import ThreadPoolExecutor
+import collections
+import os
+import numpy as np
+from torihunter.packing import TorusPacking
+
+__all__ = ['StoredJacobian', 'assemble_jacobian']
+
+
+class StoredJacobian:
+    """ Jacobian matrix held in (memory-mapped) storage, whose products read one block of columns at a time.
+
+    Parameters
+    ----------
+    storage : ndarray, numpy.memmap or h5py.Dataset
+        The matrix, with the raveled modes as rows and the modes followed by the free parameters as columns.
+    block_size : int
+        The number of columns read per block; defaults to the chunk size of HDF5 datasets, else 64.
+    file : h5py.File
+        The file which contains storage, if any, which is closed by close().
+
+    Notes
+    -----
+    The products J x and J^T y are accumulated over blocks of columns, J x = sum_b J[:, b] x[b], such that only
+    a single block of the matrix is held in memory at a time. The storage created by assemble_jacobian is
+    column major (Fortran ordered arrays, HDF5 chunks spanning every row), hence each block is contiguous.
+
+    Examples
+    --------
+    >>> with StoredJacobian.open('jacobian.h5') as jacobian:
+    ...     product = jacobian.matvec(vector)
+    """
+
+    def __init__(self, storage, block_size=None, file=None):
+        self.storage = storage
+        self.shape = storage.shape
+        chunks = getattr(storage, 'chunks', None)
+        self.block_size = block_size or (chunks[1] if chunks else 64)
+        self.file = file
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __repr__(self):
+        return self.__class__.__name__ + '({}, block_size={})'.format(self.shape, self.block_size)
+
+    @classmethod
+    def open(cls, filename, block_size=None, mode='r'):
+        """ Open a Jacobian stored by assemble_jacobian in an HDF5 (.h5, .hdf5) or NumPy (.npy) file """
+        if os.path.splitext(filename)[1] in ['.h5', '.hdf5']:
+            import h5py
+            file = h5py.File(filename, mode)
+            return cls(file['jacobian'], block_size=block_size, file=file)
+        return cls(np.load(filename, mmap_mode=mode), block_size=block_size)
+
+    def blocks(self):
+        """ The slices of the blocks of columns """
+        return [slice(start, min(start + self.block_size, self.shape[1]))
+                for start in range(0, self.shape[1], self.block_size)]
+
+    def close(self):
+        """ Flush the storage and close its file, if any """
+        if isinstance(self.storage, np.memmap):
+            self.storage.flush()
+        if self.file is not None:
+            self.file.close()
+        return None
+
+    def matvec(self, vector):
+        """ The product J x with a flat vector in the domain of the Jacobian """
+        product = np.zeros(self.shape[0])
+        for block in self.blocks():
+            product += np.dot(self.storage[:, block], vector[block])
+        return product
+
+    def rmatvec(self, vector):
+        """ The product J^T y with a flat vector in the range of the Jacobian """
+        product = np.empty(self.shape[1])
+        for block in self.blocks():
+            product[block] = np.dot(vector, self.storage[:, block])
+        return product
+
+    def toarray(self):
+        """ The Jacobian as an array in memory """
+        return np.asarray(self.storage[()] if self.file is not None else self.storage)
+
+
+def assemble_jacobian(torus, out=None, fixedparams=None, block_size=64, threads=None, max_pending=None):
+    """ Assemble the Jacobian matrix from Jacobian-vector products, block of columns by block of columns
+
+    Parameters
+    ----------
+    torus : Torus
+        The state at which the Jacobian is evaluated.
+    out : str, ndarray, numpy.memmap or h5py.Dataset
+        The storage of the Jacobian. A filename ending in '.h5' or '.hdf5' creates an HDF5 file with the chunked
+        dataset 'jacobian', any other filename a column major NumPy (.npy) file which is memory-mapped. Arrays
+        and datasets of the correct shape are filled as is. If None, the Jacobian is assembled in memory.
+    fixedparams : tuple of bool
+        Whether or not each parameter is fixed, see Torus.jac. Defaults to all parameters varying.
+    block_size : int
+        The number of columns per block.
+    threads : int
+        The number of threads which compute blocks; defaults to the number of processors.
+    max_pending : int
+        The largest number of blocks which are computed or awaiting to be written at any time; defaults to twice
+        the number of threads.
+
+    Returns
+    -------
+    StoredJacobian :
+        The Jacobian, whose rows are the raveled modes of the spatiotemporal mapping and whose columns are the
+        modes followed by the free parameters, in the order of Torus.jac.
+
+    Notes
+    -----
+    Each column is the product of the Jacobian with a unit vector, see Torus.matvec, and costs a few Fourier
+    transforms, which release the GIL; the blocks are therefore computed by a pool of threads. Blocks are
+    written to the storage by the calling thread as they complete, and no more than max_pending blocks are
+    submitted at once, so the memory footprint is max_pending blocks regardless of the size of the matrix.
+    The Jacobian is never assembled in memory as a whole, unlike Torus.jac, which also requires the dense
+    Fourier transform matrices. HDF5 chunks span every row and block_size columns. Torus.jac assembles in memory
+    with this function when its argument threads is provided.
+
+    Examples
+    --------
+    >>> jacobian = assemble_jacobian(torus, 'jacobian.h5', block_size=128, threads=8)
+    >>> product = jacobian.matvec(vector)
+    >>> jacobian.close()
+    """
+    torus = torus.convert(to='modes')
+    # The default fixedparams of linearize leave every parameter free.
+    linearization = torus.linearize() if fixedparams is None else torus.linearize(fixedparams)
+    packing = TorusPacking(torus, linearization.fixedparams)
+    shape = (torus.state.size, packing.size)
+    block_size = min(block_size, shape[1])
+    file = None
+    if out is None:
+        storage = np.empty(shape, order='F')
+    elif isinstance(out, str):
+        if os.path.splitext(out)[1] in ['.h5', '.hdf5']:
+            import h5py
+            file = h5py.File(out, 'w')
+            storage = file.create_dataset('jacobian', shape=shape, dtype=float, chunks=(shape[0], block_size))
+        else:
+            storage = np.lib.format.open_memmap(out, mode='w+', dtype=float, shape=shape, fortran_order=True)
+    else:
+        if tuple(out.shape) != shape:
+            raise ValueError('out must have the shape of the Jacobian, {}.'.format(shape))
+        storage = out
+    jacobian = StoredJacobian(storage, block_size=block_size, file=file)
+
+    threads = threads if threads is not None else os.cpu_count()
+    max_pending = max_pending if max_pending is not None else 2 * threads
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        pending = collections.deque()
+        for block in jacobian.blocks():
+            if len(pending) >= max_pending:
+                _write_block(jacobian.storage, *pending.popleft())
+            pending.append((block, executor.submit(_column_block, linearization, packing, block)))
+        while pending:
+            _write_block(jacobian.storage, *pending.popleft())
+    return jacobian
+
+
+def _column_block(linearization, packing, block):
+    """ The columns of the Jacobian with indices in a slice, computed as products with unit vectors """
+    columns = np.empty((linearization.torus.state.size, block.stop - block.start), order='F')
+    for index, column in enumerate(range(block.start, block.stop)):
+        state = np.zeros(packing.shape)
+        vector = linearization.torus.copy()
+        vector.T, vector.L, vector.S = 0., 0., 0.
+        if column < state.size:
+            state.flat[column] = 1.0
+        else:
+            setattr(vector, packing.parameters[column - state.size], 1.0)
+        vector.state = state
+        columns[:, index] = linearization.matvec(vector, preconditioning=False).state.ravel()
+    return columns
+
+
+def _write_block(storage, block, future):
+    storage[:, block] = future.result()
+    return None
@@ -0,0 +1,188 @@
+import json
+import os
+import numpy as np
+from torihunter import orbit
+
+__all__ = ['Checkpoint']
+
+
+class Checkpoint:
+    """ Periodic snapshots of a search which allow it to be resumed after being interrupted.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the snapshot file. The iteration history is kept next to it in a JSON-lines file,
+        which has the same name with '_history.jsonl' appended in place of the extension.
+    frequency : int
+        Number of iterations between snapshots.
+
+    Notes
+    -----
+    Writes are both incremental and atomic. The history is only ever appended to, one line per
+    iteration. Snapshots are written to a temporary file which then replaces the previous snapshot,
+    so a crash during a write leaves the last complete snapshot intact. Each snapshot records the
+    length of the history file at the time it was taken; when loading, any history written after the
+    last snapshot is discarded so that the history always agrees with the snapshot it is resumed from.
+
+    """
+
+    def __init__(self, filename, frequency=100):
+        self.filename = filename
+        self.history_filename = os.path.splitext(filename)[0] + '_history.jsonl'
+        self.frequency = frequency
+        self._history_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """ Close the history file, if open """
+        if self._history_file is not None:
+            self._history_file.close()
+            self._history_file = None
+
+    def start(self):
+        """ Discard the snapshot and history of any previous search which used the same filenames
+
+        Notes
+        -----
+        Called by the search methods before their first iteration, but not by resume(); otherwise the history
+        of a new search would be appended to that of an unrelated one.
+        """
+        self.close()
+        if os.path.isfile(self.filename):
+            os.remove(self.filename)
+        self._history_file = open(self.history_filename, 'w')
+        return None
+
+    def exists(self):
+        """ Whether or not a snapshot is available to resume from """
+        return os.path.isfile(self.filename)
+
+    def record(self, **values):
+        """ Append the values of a single iteration to the history file
+
+        Parameters
+        ----------
+        **values :
+            JSON serializable values that describe the current iteration; typically iteration number,
+            residual and step size.
+        """
+        if self._history_file is None:
+            self._history_file = open(self.history_filename, 'a')
+        self._history_file.write(json.dumps(values) + '\n')
+        self._history_file.flush()
+        return None
+
+    def update(self, iteration, torus, direction, stepsize, settings, **values):
+        """ Record the current iteration and take a snapshot if one is due
+
+        Parameters
+        ----------
+        iteration : int
+            The current iteration number.
+        torus : Torus
+            The current state of the search.
+        direction : Torus
+            The current search direction.
+        stepsize : float
+            The current step size.
+        settings : dict
+            JSON serializable description of the search, used to restart it exactly.
+        **values :
+            Values recorded in the history; see Checkpoint.record
+
+        """
+        self.record(iteration=iteration, stepsize=float(stepsize), **values)
+        if iteration % self.frequency == 0:
+            self.save(iteration, torus, direction, stepsize, settings)
+        return None
+
+    def save(self, iteration, torus, direction, stepsize, settings):
+        """ Atomically write a snapshot of the search
+
+        Parameters
+        ----------
+        iteration : int
+            The current iteration number.
+        torus : Torus
+            The current state of the search.
+        direction : Torus
+            The current search direction.
+        stepsize : float
+            The current step size.
+        settings : dict
+            JSON serializable description of the search, used to restart it exactly.
+
+        """
+        if self._history_file is not None:
+            self._history_file.flush()
+            os.fsync(self._history_file.fileno())
+            history_offset = self._history_file.tell()
+        elif os.path.isfile(self.history_filename):
+            history_offset = os.path.getsize(self.history_filename)
+        else:
+            history_offset = 0
+
+        tmp_filename = self.filename + '.tmp'
+        with open(tmp_filename, 'wb') as f:
+            np.savez(f, iteration=iteration, stepsize=float(stepsize), history_offset=history_offset,
+                     settings=json.dumps(settings), **_torus_arrays(torus, 'torus'),
+                     **_torus_arrays(direction, 'direction'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_filename, self.filename)
+        return None
+
+    def load(self):
+        """ Load the most recent snapshot
+
+        Returns
+        -------
+        dict :
+            Contains the keys 'iteration', 'stepsize', 'settings', 'torus', 'direction' and 'history',
+            the latter being the list of recorded iterations up to and including the snapshot.
+
+        Notes
+        -----
+        History recorded after the snapshot is truncated so that further iterations may be appended.
+        """
+        self.close()
+        with np.load(self.filename) as data:
+            history_offset = int(data['history_offset'])
+            snapshot = {'iteration': int(data['iteration']),
+                        'stepsize': float(data['stepsize']),
+                        'settings': json.loads(str(data['settings'])),
+                        'torus': _torus_from_arrays(data, 'torus'),
+                        'direction': _torus_from_arrays(data, 'direction')}
+
+        history = []
+        if os.path.isfile(self.history_filename):
+            with open(self.history_filename, 'r+') as f:
+                f.truncate(history_offset)
+                f.seek(0)
+                history = [json.loads(line) for line in f if line.strip()]
+        snapshot['history'] = history
+        return snapshot
+
+
+def _torus_arrays(torus, prefix):
+    """ Arrays which completely specify a torus, keyed for np.savez """
+    return {prefix + '_class': torus.__class__.__name__,
+            prefix + '_state': torus.state,
+            prefix + '_statetype': torus.statetype,
+            prefix + '_parameters': np.array([float(torus.T), float(torus.L), float(torus.S)])}
+
+
+def _torus_from_arrays(data, prefix):
+    """ Reconstruct a torus saved by _torus_arrays """
+    torus_class = getattr(orbit, str(data[prefix + '_class']))
+    T, L, S = data[prefix + '_parameters']
+    torus = torus_class(state=data[prefix + '_state'], statetype=str(data[prefix + '_statetype']), T=T, L=L, S=S)
+    # Not every class accepts every parameter as a keyword; set them explicitly to guarantee an exact restart.
+    torus.T, torus.L, torus.S = T, L, S
+    return torus
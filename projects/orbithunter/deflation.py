@@ -0,0 +1,265 @@
+from math import pi
+import numpy as np
+import scipy.optimize
+
+__all__ = ['Deflation', 'amplitude_spectrum', 'group_distance']
+
+
+class Deflation:
+    """ Deflation operator which removes known tori from the solutions of F = 0.
+
+    Parameters
+    ----------
+    known : iterable of Torus
+        The tori to deflate; only those of the same class as the torus which is deflated are used.
+    power : float
+        The power of the distance, p, see Notes.
+    shift : float
+        The shift, sigma, which is the value of each factor of the operator far away from the known tori.
+    samples : int
+        The number of candidate translations per mode in each direction, before refinement, see group_distance.
+
+    Notes
+    -----
+    The deflated mapping is G(u) = M(u) F(u), with the operator M(u) = prod_i (1 / d(u, u_i)^p + sigma), which
+    diverges at each of the known tori u_i, such that they are no longer solutions of G = 0, whereas every other
+    solution of F = 0 remains a solution (Farrell, Birkisson and Funke, 2015). The distance d is the distance
+    between u and the group orbit of u_i, i.e. the smallest distance to a translation of u_i in time and space,
+    see group_distance; a shifted copy of a known torus is deflated just the same, whereas distinct tori whose
+    amplitude spectra coincide are not. Tori of different discretizations are compared on their common modes.
+    The distance does not depend on the parameters T, L and S.
+
+    Examples
+    --------
+    >>> deflation = Deflation(known_tori, power=2, shift=1.0)
+    >>> deflation.distances(torus)
+    """
+
+    def __init__(self, known, power=2, shift=1.0, samples=4):
+        self.known = [torus.convert(to='modes') for torus in known]
+        self.power = power
+        self.shift = shift
+        self.samples = samples
+
+    def __len__(self):
+        return len(self.known)
+
+    def __repr__(self):
+        return self.__class__.__name__ + '({} tori, power={}, shift={})'.format(len(self), self.power, self.shift)
+
+    def distance(self, torus, other):
+        """ The symmetry invariant distance between two tori of the same class """
+        return float(np.linalg.norm(_aligned_difference(torus.convert(to='modes'), other.convert(to='modes'),
+                                                        self.samples).ravel()))
+
+    def distances(self, torus):
+        """ The distances between a torus and each of the known tori, infinite for tori of other classes """
+        return [self.distance(torus, known) if known.__class__ is torus.__class__ else np.inf for known in self.known]
+
+    def gradient(self, torus):
+        """ The gradient of the logarithm of the deflation operator, grad M / M, with respect to the modes
+
+        Returns
+        -------
+        Torus :
+            The gradient; its parameter components are zero, as the distance does not depend on the parameters.
+
+        Notes
+        -----
+        The gradient of the distance is (u - g u_i) / d, with g the translation which minimizes the distance; the
+        derivative of the minimizing translation does not contribute, as the distance is stationary in it.
+        """
+        torus = torus.convert(to='modes')
+        gradient = torus.copy()
+        gradient.state = np.zeros(torus.state.shape)
+        for known in self.known:
+            if known.__class__ is not torus.__class__:
+                continue
+            difference = _aligned_difference(torus, known, self.samples)
+            distance = max(np.linalg.norm(difference.ravel()), np.finfo(float).tiny)
+            factor = distance**(-self.power) + self.shift
+            # d/dd log(d^-p + sigma) times the derivative of the distance.
+            gradient.state += (-self.power * distance**(-self.power - 1) / factor) * difference / distance
+        gradient.T, gradient.L, gradient.S = 0., 0., 0.
+        return gradient
+
+    def multiplier(self, torus):
+        """ The value of the deflation operator, M """
+        return float(np.prod([distance**(-self.power) + self.shift for distance in self.distances(torus)
+                              if distance < np.inf]))
+
+
+def group_distance(torus, other, samples=4):
+    """ The distance between a torus and the closest translation of another torus in time and space
+
+    Parameters
+    ----------
+    torus : Torus
+        The torus, in the spatiotemporal mode basis.
+    other : Torus
+        A torus of the same class, in the spatiotemporal mode basis.
+    samples : int
+        The number of candidate translations per mode in each direction, before refinement.
+
+    Returns
+    -------
+    float :
+        The smallest Euclidean distance, min_g ||u - g v||, between the modes of the tori, over the translations g
+        which leave the class invariant.
+
+    Notes
+    -----
+    Translations rotate the pair of cosine and sine coefficients of each temporal frequency j and spatial wave
+    number k by the angles j alpha and k beta, with alpha and beta the translations as fractions of the periods
+    times 2 pi. The inner product <u, g v> is therefore a trigonometric polynomial in (alpha, beta), which is
+    evaluated on a grid with a single two dimensional FFT; its maximum is refined by BFGS. Time translations are
+    continuous for every class. Spatial translations are continuous for Torus and RelativeTorus, whereas only
+    the translation by half of the spatial period preserves the discrete symmetries of the other classes.
+    Unlike the distance between amplitude spectra, see amplitude_spectrum, which is a lower bound, the phases
+    are retained, so tori which are not translations of each other are a finite distance apart.
+    """
+    return float(np.linalg.norm(_aligned_difference(torus, other, samples).ravel()))
+
+
+def amplitude_spectrum(torus):
+    """ The amplitudes of the spatiotemporal modes, which are invariant under translations in time and space
+
+    Parameters
+    ----------
+    torus : Torus
+        The torus, in the spatiotemporal mode basis.
+
+    Returns
+    -------
+    ndarray :
+        Array whose element (j, k) is the norm of the coefficients of the j-th temporal and k-th spatial frequency.
+
+    Notes
+    -----
+    Translations in time (space) rotate the pairs of coefficients of the cosine and sine of each frequency (wave
+    number) by the angle of the frequency times the translation. The norm of all of the coefficients which are
+    mixed by the translations, i.e. those of (cos, sin) in time times (cos, sin) in space, is therefore
+    invariant. Only the tori without discrete symmetries, Torus and RelativeTorus, have both cosine and sine
+    spatial modes; equilibria only have a single row of modes.
+    """
+    power = torus.state**2
+    if power.shape[0] > 1:
+        n = (power.shape[0] - 1) // 2
+        power = np.concatenate((power[:1], power[1:n+1] + power[n+1:]), axis=0)
+    if torus.__class__.__name__ in ['Torus', 'RelativeTorus']:
+        m = power.shape[1] // 2
+        power = power[:, :m] + power[:, m:]
+    return np.sqrt(power)
+
+
+def _aligned_difference(torus, other, samples):
+    """ The difference between the modes of torus and the translation of other which minimizes its norm
+
+    The difference has the shape of the modes of torus and is zero outside of the modes common to both tori.
+    """
+    blocks, other_blocks = _blocks(torus), _blocks(other)
+    rows, columns = min(blocks.shape[0], other_blocks.shape[0]), min(blocks.shape[1], other_blocks.shape[1])
+    common, other_common = blocks[:rows, :columns], other_blocks[:rows, :columns]
+    frequencies, wave_numbers = np.arange(rows).reshape(-1, 1), np.arange(1, columns + 1).reshape(1, -1)
+    # <u, g v> = 2 Re sum (a exp(-i (k beta - j alpha)) + b exp(-i (k beta + j alpha))), see _rotation_parts.
+    (z, w), (other_z, other_w) = _rotation_parts(common), _rotation_parts(other_common)
+    a, b = z * np.conj(other_z), w * np.conj(other_w)
+    continuous_space = torus.__class__.__name__ in ['Torus', 'RelativeTorus']
+    P = samples * (2 * rows) if rows > 1 else 1
+    Q = samples * (2 * columns + 2) if continuous_space else 2
+    coefficients = np.zeros((P, Q), dtype=complex)
+    # Frequencies beyond the grid alias, which leaves the values at the grid points exact.
+    np.add.at(coefficients, np.broadcast_arrays(-frequencies % P, wave_numbers % Q), a)
+    np.add.at(coefficients, np.broadcast_arrays(frequencies % P, wave_numbers % Q), b)
+    correlation = 2.0 * np.fft.fft2(coefficients).real
+    best = np.unravel_index(int(np.argmax(correlation)), correlation.shape)
+    angles = np.array([2 * pi * best[0] / P, 2 * pi * best[1] / Q])
+
+    def negative_correlation(x):
+        alpha, beta = (x[0], x[1]) if continuous_space else (x[0], angles[1])
+        a_phases = a * np.exp(-1j * (wave_numbers * beta - frequencies * alpha))
+        b_phases = b * np.exp(-1j * (wave_numbers * beta + frequencies * alpha))
+        value = 2.0 * np.sum(a_phases + b_phases).real
+        derivatives = [2.0 * np.sum(1j * frequencies * (a_phases - b_phases)).real,
+                       2.0 * np.sum(-1j * wave_numbers * (a_phases + b_phases)).real]
+        return -value, -np.array(derivatives[:len(x)])
+
+    if rows > 1 or continuous_space:
+        start = angles[:2] if continuous_space else angles[:1]
+        refined = scipy.optimize.minimize(negative_correlation, start, jac=True, method='BFGS')
+        if refined.fun < negative_correlation(start)[0]:
+            angles[:refined.x.size] = refined.x
+    # The closed form loses precision to cancellation near zero, so the difference is computed directly.
+    difference = np.zeros(blocks.shape)
+    difference[:rows, :columns] = common - _translate(other_common, *angles)
+    return _unblocks(torus, difference)
+
+
+def _blocks(torus):
+    """ The modes as 2 x 2 blocks, (cos, sin) in space times (cos, sin) in time, of each frequency and wave number
+
+    Returns
+    -------
+    ndarray :
+        Array of shape (n + 1, m, 2, 2), whose element (j, k - 1) is the block of the j-th temporal frequency
+        and the k-th spatial wave number; the components which the class does not have are zero.
+    """
+    state = torus.state
+    n = (state.shape[0] - 1) // 2
+    time_cosine, time_sine = state[:n+1], np.concatenate((np.zeros((1, state.shape[1])), state[n+1:]), axis=0)
+    if torus.__class__.__name__ in ['Torus', 'RelativeTorus']:
+        m = state.shape[1] // 2
+        blocks = np.zeros((n + 1, m, 2, 2))
+        blocks[:, :, 0, 0], blocks[:, :, 0, 1] = time_cosine[:, :m], time_sine[:, :m]
+        blocks[:, :, 1, 0], blocks[:, :, 1, 1] = time_cosine[:, m:], time_sine[:, m:]
+    else:
+        blocks = np.zeros((n + 1, state.shape[1], 2, 2))
+        rows = _space_rows(torus, n)
+        blocks[np.arange(n + 1), :, rows, 0] = time_cosine
+        blocks[np.arange(n + 1), :, rows, 1] = time_sine
+    return blocks
+
+
+def _unblocks(torus, blocks):
+    """ Map an array of blocks, see _blocks, back onto the layout of the modes """
+    n = blocks.shape[0] - 1
+    if torus.__class__.__name__ in ['Torus', 'RelativeTorus']:
+        time_cosine = np.concatenate((blocks[:, :, 0, 0], blocks[:, :, 1, 0]), axis=1)
+        time_sine = np.concatenate((blocks[:, :, 0, 1], blocks[:, :, 1, 1]), axis=1)
+    else:
+        rows = _space_rows(torus, n)
+        time_cosine, time_sine = blocks[np.arange(n + 1), :, rows, 0], blocks[np.arange(n + 1), :, rows, 1]
+    return np.concatenate((time_cosine, time_sine[1:]), axis=0)
+
+
+def _space_rows(torus, n):
+    """ The spatial component, cosine (0) or sine (1), of each temporal frequency of the classes with a reflection """
+    if torus.__class__.__name__ == 'ShiftReflectionTorus':
+        # Odd temporal frequencies have cosine spatial modes, even ones sine spatial modes.
+        return 1 - np.arange(n + 1) % 2
+    return np.ones(n + 1, dtype=int)
+
+
+def _rotation_parts(blocks):
+    """ The complex numbers z and w of the blocks [[Re z + Re w, Im w - Im z], [Im z + Im w, Re z - Re w]]
+
+    Rotations of the rows by theta and of the columns by phi multiply z by exp(i (theta - phi)) and w by
+    exp(i (theta + phi)), and the Frobenius inner product of two blocks is 2 Re (z z'* + w w'*).
+    """
+    z = 0.5 * (blocks[..., 0, 0] + blocks[..., 1, 1]) + 0.5j * (blocks[..., 1, 0] - blocks[..., 0, 1])
+    w = 0.5 * (blocks[..., 0, 0] - blocks[..., 1, 1]) + 0.5j * (blocks[..., 0, 1] + blocks[..., 1, 0])
+    return z, w
+
+
+def _translate(blocks, alpha, beta):
+    """ Rotate the rows of each block by k beta and its columns by j alpha, see _blocks """
+    frequencies, wave_numbers = np.arange(blocks.shape[0]), np.arange(1, blocks.shape[1] + 1)
+    space_rotations = _rotations(wave_numbers * beta)
+    time_rotations = _rotations(frequencies * alpha)
+    return np.einsum('kab,jkbc,jdc->jkad', space_rotations, blocks, time_rotations)
+
+
+def _rotations(angles):
+    """ The two dimensional rotation matrices by each angle """
+    cosine, sine = np.cos(angles), np.sin(angles)
+    return np.stack((np.stack((cosine, -sine), axis=-1), np.stack((sine, cosine), axis=-1)), axis=-2)
@@ -0,0 +1,138 @@
+import numpy as np
+
+__all__ = ['TorusExpression']
+
+
+class TorusExpression:
+    """ Lazily evaluated linear combination of Torus states.
+
+    Parameters
+    ----------
+    terms : list of (float, ndarray)
+        The (coefficient, state) pairs whose sum the expression represents.
+    template : Torus
+        The torus whose class, statetype and parameters the evaluated expression inherits.
+
+    Notes
+    -----
+    Arithmetic with expressions only builds up the list of terms; no arrays are allocated until
+    evaluate() is called, at which point the entire expression is computed in a single pass
+    into one output buffer. The operations supported by Torus arithmetic (addition, subtraction
+    and scalar multiplication or division) only ever produce linear combinations, hence the
+    expression graph is stored already flattened.
+
+    Examples
+    --------
+    >>> expression = linear_torus.lazy() + 2 * nonlinear_torus
+    >>> matvec_torus = expression.evaluate(out=preallocated_torus)
+    """
+
+    def __init__(self, terms, template):
+        self.terms = list(terms)
+        self.template = template
+
+    def __add__(self, other):
+        return self.__class__(self.terms + _terms(other), self.template)
+
+    def __radd__(self, other):
+        return self.__class__(_terms(other) + self.terms, self.template)
+
+    def __sub__(self, other):
+        return self.__class__(self.terms + [(-c, x) for c, x in _terms(other)], self.template)
+
+    def __rsub__(self, other):
+        return self.__class__(_terms(other) + [(-c, x) for c, x in self.terms], self.template)
+
+    def __neg__(self):
+        return -1.0 * self
+
+    def __mul__(self, num):
+        return self.__class__([(num * c, x) for c, x in self.terms], self.template)
+
+    def __rmul__(self, num):
+        return self.__mul__(num)
+
+    def __truediv__(self, num):
+        return self.__class__([(c / num, x) for c, x in self.terms], self.template)
+
+    def __repr__(self):
+        return self.__class__.__name__ + '({} terms)'.format(len(self.terms))
+
+    def evaluate(self, out=None, multiplier=None):
+        """ Compute the linear combination in a single pass
+
+        Parameters
+        ----------
+        out : Torus or ndarray
+            Preallocated buffer to write the result into. If a Torus, its state is overwritten and its
+            parameters are set to those of the template. If None, a single new array is allocated.
+        multiplier : ndarray
+            Array which the result is multiplied by elementwise, e.g. the preconditioner.
+
+        Returns
+        -------
+        Torus :
+            Torus whose state is the value of the expression.
+
+        Notes
+        -----
+        The sum c_1 x_1 + c_2 x_2 + ... + c_n x_n is accumulated term by term into the output buffer, each
+        product c_i x_i being written into a single scratch array; hence at most one intermediate array is
+        created regardless of the number of terms. Unlike rescaling the partial sum by ratios of consecutive
+        coefficients, this neither overflows nor underflows unless the result itself does.
+        """
+        if isinstance(out, np.ndarray):
+            buffer, out_torus = out, None
+        elif out is not None:
+            buffer, out_torus = out._mutable_state(), out
+        else:
+            buffer, out_torus = None, None
+
+        target = buffer
+        terms = [(c, x) for c, x in self.terms if c != 0]
+        if buffer is not None:
+            aliased = [i for i, (_, x) in enumerate(terms) if np.may_share_memory(x, buffer)]
+            if len(aliased) > 1 or (aliased and terms[aliased[0]][1] is not buffer):
+                # The output cannot be safely overwritten while it is still being read.
+                buffer = None
+            elif aliased:
+                # The term which is the output must be read before anything is written.
+                terms.insert(0, terms.pop(aliased[0]))
+
+        if not terms:
+            if buffer is None:
+                buffer = np.zeros(self.template.state.shape)
+            else:
+                buffer.fill(0.)
+        else:
+            coefficient, state = terms[0]
+            if buffer is None:
+                buffer = np.empty(state.shape)
+            np.multiply(state, coefficient, out=buffer)
+            scratch = np.empty(buffer.shape) if len(terms) > 1 else None
+            for coefficient, state in terms[1:]:
+                np.multiply(state, coefficient, out=scratch)
+                np.add(buffer, scratch, out=buffer)
+
+        if multiplier is not None:
+            np.multiply(buffer, multiplier, out=buffer)
+        if target is not None and buffer is not target:
+            np.copyto(target, buffer)
+            buffer = target
+
+        template = self.template
+        if out_torus is not None and out_torus.state is buffer:
+            out_torus.statetype = template.statetype
+            out_torus.T, out_torus.L, out_torus.S = template.T, template.L, template.S
+            return out_torus
+        else:
+            return template.__class__(state=buffer, statetype=template.statetype,
+                                      T=template.T, L=template.L, S=template.S)
+
+
+def _terms(other):
+    """ The terms that represent a TorusExpression or Torus """
+    if isinstance(other, TorusExpression):
+        return other.terms
+    else:
+        return [(1.0, other.state)]
@@ -0,0 +1,277 @@
+import numpy as np
+import scipy.linalg
+from torihunter.packing import TorusPacking
+
+__all__ = ['JacobianFactorization', 'FactorizationCache', 'BroydenInverse']
+
+
+class JacobianFactorization:
+    """ Dense factorization of the Jacobian matrix at a single state, reusable for many Newton corrections.
+
+    Parameters
+    ----------
+    torus : Torus
+        The state at which the Jacobian, Torus.jac, is assembled and factorized.
+    fixedparams : tuple of bool
+        Whether or not each parameter is fixed, see Torus.jac.
+    decomposition : str
+        Takes values 'qr' or 'lu'. The QR decomposition of the transpose of the Jacobian yields the minimum norm
+        solution of the (typically underdetermined) Newton equation; the LU decomposition requires a square
+        Jacobian, i.e. every parameter fixed.
+
+    Notes
+    -----
+    The Newton equation J dx = -F has more unknowns than equations whenever a parameter is free. With the
+    economic decomposition J^T = Q R its minimum norm solution is dx = -Q R^{-T} F, which costs two triangular
+    solves and a product with Q once the decomposition is known; the decomposition itself costs O(n^3). The
+    Jacobians of the spatiotemporal mapping are dense, due to the pseudospectral product, so no sparse
+    factorization is used.
+
+    Examples
+    --------
+    >>> factorization = JacobianFactorization(torus, fixedparams=(False, False))
+    >>> next_torus = torus.copy().axpy(1.0, factorization.solve(torus.spatiotemporal_mapping()))
+    """
+
+    def __init__(self, torus, fixedparams, decomposition='qr'):
+        self.torus = torus.copy()
+        self.fixedparams = fixedparams
+        self.decomposition = decomposition
+        self.packing = TorusPacking(torus, fixedparams)
+        jacobian = torus.jac(fixedparams=fixedparams)
+        if decomposition == 'qr':
+            self.factors = scipy.linalg.qr(jacobian.T, mode='economic', check_finite=False)
+        elif decomposition == 'lu':
+            if jacobian.shape[0] != jacobian.shape[1]:
+                raise ValueError('LU decompositions require a square Jacobian; fix every parameter or use QR.')
+            self.factors = scipy.linalg.lu_factor(jacobian, check_finite=False)
+        else:
+            raise ValueError('decomposition must be either \'qr\' or \'lu\'.')
+        self.uses = 0
+
+    def __repr__(self):
+        return self.__class__.__name__ + '({}, {}, uses={})'.format(self.torus.__class__.__name__,
+                                                                    self.decomposition, self.uses)
+
+    def distance(self, torus):
+        """ The largest relative difference between the parameters of torus and those of the factorized state """
+        return max((abs(getattr(torus, parameter) - getattr(self.torus, parameter))
+                    / max(abs(getattr(self.torus, parameter)), np.finfo(float).tiny)
+                    for parameter in ['T', 'L', 'S'] if getattr(self.torus, parameter) or getattr(torus, parameter)),
+                   default=0.)
+
+    def inverse(self, vector, transpose=False):
+        """ The product of the (pseudo-)inverse of the factorized Jacobian, or of its transpose, with a flat vector
+
+        Parameters
+        ----------
+        vector : ndarray
+            Flat vector in the range of the Jacobian (the raveled modes), or in its domain (the modes followed by
+            the free parameters, see TorusPacking) if transpose is True.
+        transpose : bool
+            Whether to multiply with the transpose of the inverse instead.
+
+        Returns
+        -------
+        ndarray :
+            The product, J^+ v or (J^+)^T v.
+        """
+        if self.decomposition == 'qr':
+            q, r = self.factors
+            if transpose:
+                return scipy.linalg.solve_triangular(r, np.dot(q.T, vector), check_finite=False)
+            return np.dot(q, scipy.linalg.solve_triangular(r, vector, trans='T', check_finite=False))
+        else:
+            return scipy.linalg.lu_solve(self.factors, vector, trans=int(transpose), check_finite=False)
+
+    def solve(self, mapping):
+        """ The Newton step -J^{-1} F with the factorized Jacobian, J, and a spatiotemporal mapping, F
+
+        Parameters
+        ----------
+        mapping : Torus
+            The spatiotemporal mapping, in the spatiotemporal mode basis.
+
+        Returns
+        -------
+        Torus :
+            The step, including its parameter components; the components of the fixed parameters are zero.
+        """
+        solution = self.inverse(-1.0 * mapping.state.ravel())
+        self.uses += 1
+        step = mapping.copy()
+        step.state = solution[:mapping.state.size].reshape(mapping.state.shape)
+        step.T, step.L, step.S = 0., 0., 0.
+        for index, parameter in enumerate(self.packing.parameters, start=mapping.state.size):
+            setattr(step, parameter, solution[index])
+        return step
+
+
+class FactorizationCache:
+    """ Least recently used store of Jacobian factorizations, shared by searches with similar parameters.
+
+    Parameters
+    ----------
+    maxsize : int
+        The maximum number of factorizations kept; each holds a dense matrix the size of the Jacobian.
+    rtol : float
+        The largest relative difference of the parameters for which a factorization is reused.
+
+    Notes
+    -----
+    Continuation, e.g. in the spatial period L, solves a sequence of problems whose solutions and Jacobians
+    change slowly. A factorization from a previous step remains a good approximation of the Jacobian, in which
+    case chord_newton only refreshes it once its convergence degrades. Factorizations are only shared between
+    tori of the same class and discretization, with the same fixed parameters.
+
+    Examples
+    --------
+    >>> cache = FactorizationCache(maxsize=2, rtol=0.05)
+    >>> for L in np.linspace(22, 24, 21):
+    ...     torus.L = L
+    ...     torus, statistics = chord_newton(torus, cache=cache)
+    """
+
+    def __init__(self, maxsize=4, rtol=0.02):
+        self.maxsize = maxsize
+        self.rtol = rtol
+        # Ordered from least to most recently used.
+        self._factorizations = []
+        self.hits, self.misses = 0, 0
+
+    def __len__(self):
+        return len(self._factorizations)
+
+    def __repr__(self):
+        return self.__class__.__name__ + '({} factorizations, hits={}, misses={})'.format(len(self), self.hits,
+                                                                                           self.misses)
+
+    def clear(self):
+        """ Remove every factorization """
+        self._factorizations.clear()
+        return None
+
+    def get(self, torus, fixedparams, decomposition='qr'):
+        """ The factorization whose parameters are closest to those of torus, if within rtol, else None """
+        key = self._key(torus, fixedparams, decomposition)
+        candidates = [factorization for factorization in self._factorizations
+                      if self._key(factorization.torus, factorization.fixedparams, factorization.decomposition) == key]
+        factorization = min(candidates, key=lambda candidate: candidate.distance(torus), default=None)
+        if factorization is None or factorization.distance(torus) > self.rtol:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._factorizations.remove(factorization)
+        self._factorizations.append(factorization)
+        return factorization
+
+    def put(self, factorization):
+        """ Store a factorization, evicting the least recently used one if the cache is full """
+        if factorization in self._factorizations:
+            self._factorizations.remove(factorization)
+        self._factorizations.append(factorization)
+        del self._factorizations[:-self.maxsize]
+        return None
+
+    @staticmethod
+    def _key(torus, fixedparams, decomposition):
+        fixedparams = tuple(fixedparams) if not isinstance(fixedparams, bool) else fixedparams
+        return torus.__class__, torus.state.shape, fixedparams, decomposition
+
+
+class BroydenInverse:
+    """ Approximate inverse of the Jacobian, an initial approximation plus limited-memory rank one (Broyden) updates.
+
+    Parameters
+    ----------
+    initial : callable
+        The product of the initial approximation, H_0, with a flat vector in the range of the Jacobian (the
+        raveled modes), which returns a flat vector in its domain (the modes followed by the free parameters).
+    initial_transpose : callable
+        The product of the transpose of H_0 with a flat vector in the domain of the Jacobian.
+    memory : int
+        The number of updates which are kept; the oldest update is discarded once the memory is full.
+
+    Notes
+    -----
+    Broyden's ("good") method updates the inverse H of the Jacobian such that it satisfies the secant condition
+    H y = s, for the step s and the change in the spatiotemporal mapping y, with the least change to the
+    approximation of the Jacobian itself. By the Sherman-Morrison formula the update is the outer product
+    H_{k+1} = H_k + u v^T with u = (s - H_k y) / (s^T H_k y) and v = H_k^T s. The pairs (u, v) are stored as
+    the rows of two arrays, which are used as a ring buffer, such that H x = H_0 x + U^T (V x) costs a product
+    with H_0 and two small dense products. Once the memory is full, the oldest pair is discarded before the
+    next one is computed, so the latest secant condition holds exactly.
+
+    Examples
+    --------
+    >>> preconditioner = torus.block_preconditioner()
+    >>> inverse = BroydenInverse(preconditioner.matvec, preconditioner.rmatvec, memory=20)
+    """
+
+    def __init__(self, initial, initial_transpose, memory=20):
+        self.initial = initial
+        self.initial_transpose = initial_transpose
+        self.memory = memory
+        self._u, self._v = None, None
+        self._count = 0
+
+    def __len__(self):
+        return min(self._count, self.memory)
+
+    def __repr__(self):
+        return self.__class__.__name__ + '({} of {} updates)'.format(len(self), self.memory)
+
+    def matvec(self, vector):
+        """ The product H x with a flat vector in the range of the Jacobian """
+        product = self.initial(vector)
+        if self._count:
+            product = product + np.dot(np.dot(self._v[:len(self)], vector), self._u[:len(self)])
+        return product
+
+    def reset(self):
+        """ Discard every update, keeping the initial approximation """
+        self._count = 0
+        return None
+
+    def rmatvec(self, vector):
+        """ The product H^T x with a flat vector in the domain of the Jacobian """
+        product = self.initial_transpose(vector)
+        if self._count:
+            product = product + np.dot(np.dot(self._u[:len(self)], vector), self._v[:len(self)])
+        return product
+
+    def update(self, step, difference):
+        """ Rank one update such that the approximation maps the change in the mapping onto the step
+
+        Parameters
+        ----------
+        step : ndarray
+            The step, s, in the domain of the Jacobian.
+        difference : ndarray
+            The change of the spatiotemporal mapping, y, over the step.
+
+        Returns
+        -------
+        bool :
+            Whether the update was applied; it is skipped when s^T H y is (nearly) zero.
+        """
+        if self._u is None:
+            self._u = np.empty((self.memory, step.size))
+            self._v = np.empty((self.memory, difference.size))
+        index = self._count % self.memory
+        discarded = None
+        if self._count >= self.memory:
+            # Discard the oldest update before computing the new one, such that H y = s holds after the update.
+            discarded = self._u[index].copy()
+            self._u[index] = 0.
+        image = self.matvec(difference)
+        denominator = np.dot(step, image)
+        if abs(denominator) <= np.sqrt(np.finfo(float).eps) * np.linalg.norm(step) * np.linalg.norm(image):
+            if discarded is not None:
+                self._u[index] = discarded
+            return False
+        v = self.rmatvec(step)
+        self._u[index] = (step - image) / denominator
+        self._v[index] = v
+        self._count += 1
+        return True
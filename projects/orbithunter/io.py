@@ -0,0 +1,84 @@
+import os
+import sys
+import warnings
+# Only the FutureWarnings of importing h5py are silenced; the warning filters of the caller are left in place.
+with warnings.catch_warnings():
+    warnings.simplefilter(action='ignore', category=FutureWarning)
+    import h5py
+
+__all__ = ['read_h5', 'to_h5']
+
+
+def read_h5(filename, torus_class=None):
+    """ Import a torus from an HDF5 file written by to_h5
+
+    Parameters
+    ----------
+    filename : str
+        The file to import.
+    torus_class : type
+        The class of the torus. If None, it is inferred from the file name, which to_h5 prefixes with
+        the class name by default; Torus is used if this fails.
+
+    Returns
+    -------
+    Torus :
+        Torus whose state is the velocity field in the file.
+    """
+    from torihunter import orbit
+    if torus_class is None:
+        classname = os.path.basename(filename).split('_')[0]
+        torus_class = getattr(orbit, classname, orbit.Torus)
+        if not (isinstance(torus_class, type) and issubclass(torus_class, orbit.Torus)):
+            torus_class = orbit.Torus
+    with h5py.File(filename, 'r') as f:
+        field = f['field'][...]
+        T, L, S = float(f['period'][()]), float(f['speriod'][()]), float(f['spatial_shift'][()])
+    torus = torus_class(state=field, statetype='field', T=T, L=L, S=S)
+    # Not every class accepts every parameter as a keyword.
+    torus.T, torus.L, torus.S = T, L, S
+    return torus
+
+
+def to_h5(torus, filename=None, directory='', verbose=False):
+    """ Export current state information to HDF5 file
+
+    Parameters
+    ----------
+    torus : Torus
+        The torus to export.
+    filename : str
+        Name for the save file
+    directory :
+        Location to save at
+    verbose : If true, prints save messages to std out
+    """
+    if filename is None:
+        filename = torus.parameter_dependent_filename()
+    elif filename == 'initial':
+        filename = 'initial_' + torus.parameter_dependent_filename()
+
+    if directory == 'default':
+        directory = os.path.join(os.path.abspath(os.path.join(os.getcwd(), '../data/')), '')
+    elif directory == '':
+        pass
+    elif not os.path.isdir(directory):
+        warnings.warn('Trying to save figure to a directory that does not exist:' + directory, Warning)
+        sys.stdout.flush()
+        proceed = input('Would you like to create this directory? If no, '
+                        'then figure will save where current script is located [y]/[n]')
+        if proceed == 'y':
+            os.mkdir(directory)
+
+    filename = os.path.join(directory, filename)
+    if verbose:
+        print('Saving data to {}'.format(filename))
+    with h5py.File(filename, 'w') as f:
+        f.create_dataset("field", data=torus.convert(to='field').state)
+        f.create_dataset("speriod", data=torus.L)
+        f.create_dataset("period", data=torus.T)
+        f.create_dataset("space_discretization", data=torus.M)
+        f.create_dataset("time_discretization", data=torus.N)
+        f.create_dataset("spatial_shift", data=torus.S)
+        f.create_dataset("residual", data=float(torus.residual()))
+    return None
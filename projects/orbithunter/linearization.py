@@ -0,0 +1,104 @@
+from torihunter.preconditioning import Preconditioner, BlockPreconditioner, parameter_scalings
+
+__all__ = ['Linearization']
+
+
+class Linearization:
+    """ The components of Jacobian-vector products which only depend on the linearization point.
+
+    Parameters
+    ----------
+    torus : Torus
+        The state at which the Jacobian is evaluated.
+    fixedparams : tuple of bool or bool
+        Whether or not each parameter is fixed, see Torus.matvec.
+    field_torus : Torus
+        The velocity field of torus.
+    wj_matrix : ndarray
+        Elementwise temporal frequencies, see Torus.elementwise_dt. None for EquilibriumTorus.
+    qk_matrix : ndarray
+        Elementwise spatial frequencies, see Torus.elementwise_dx.
+    p_matrix : ndarray
+        Elementwise (left) preconditioner, the inverse of the absolute value of the linear terms.
+    parameter_columns : dict
+        The partial derivatives of the spatiotemporal mapping with respect to each free parameter, keyed by
+        the name of the parameter ('T', 'L' or 'S'). These are the columns of the Jacobian that correspond to
+        the parameters.
+
+    Notes
+    -----
+    Jacobian-vector products are typically evaluated many times at the same state, e.g. by the iterations of
+    a Krylov solver within a single Newton step. Linearizations are created by Torus.linearize and passed to
+    matvec and rmatvec, such that the field of the state, the derivatives of the state and the pseudospectral
+    product d_x (u .* u) are only computed once per step; each product then only computes the terms which
+    depend on the vector. The linearization is only valid while its torus remains unchanged.
+
+    Examples
+    --------
+    >>> linearization = torus.linearize(fixedparams=(False, False))
+    >>> matvec_torus = linearization.matvec(vector_torus)
+    """
+
+    def __init__(self, torus, fixedparams, field_torus, wj_matrix, qk_matrix, p_matrix, parameter_columns):
+        self.torus = torus
+        self.fixedparams = fixedparams
+        self.field_torus = field_torus
+        self.wj_matrix = wj_matrix
+        self.qk_matrix = qk_matrix
+        self.elementwise_qk2 = -1.0 * qk_matrix**2
+        self.elementwise_qk4 = qk_matrix**4
+        self.p_matrix = p_matrix
+        self.parameter_columns = parameter_columns
+        self._preconditioners = {}
+
+    def __repr__(self):
+        return self.__class__.__name__ + '({})'.format(self.torus.__class__.__name__)
+
+    def hessvec(self, other, out=None, mapping=None):
+        """ Matrix-vector product with the Hessian of the cost function at the linearization point, see Torus.hessvec """
+        return self.torus.hessvec(other, fixedparams=self.fixedparams, out=out, linearization=self, mapping=mapping)
+
+    def matvec(self, other, preconditioning=True, out=None):
+        """ Matrix-vector product with the Jacobian at the linearization point, see Torus.matvec """
+        return self.torus.matvec(other, fixedparams=self.fixedparams, preconditioning=preconditioning,
+                                 out=out, linearization=self)
+
+    def normal_matvec(self, other, preconditioning=True, out=None):
+        """ Matrix-vector product with J^T J at the linearization point, see Torus.normal_matvec """
+        return self.torus.normal_matvec(other, fixedparams=self.fixedparams, preconditioning=preconditioning,
+                                        out=out, linearization=self)
+
+    def preconditioner(self, preconditioning=True, side='left'):
+        """ The preconditioner which corresponds to the preconditioning argument of the products
+
+        Parameters
+        ----------
+        preconditioning : bool, str or Preconditioner
+            True for the default (diagonal) preconditioner, 'block' for the BlockPreconditioner at the
+            linearization point, or a preconditioner, which is used as is.
+        side : str
+            The side of the default preconditioners, 'left' or 'right'.
+
+        Returns
+        -------
+        Preconditioner or None :
+            The preconditioner itself if one is provided, the default preconditioner at the linearization point,
+            built from p_matrix, if preconditioning is True, and None otherwise.
+        """
+        if isinstance(preconditioning, Preconditioner):
+            return preconditioning
+        elif not preconditioning:
+            return None
+        key = (preconditioning == 'block', side)
+        if key not in self._preconditioners:
+            if preconditioning == 'block':
+                self._preconditioners[key] = BlockPreconditioner(self, side=side)
+            else:
+                scalings = parameter_scalings(self.torus, self.fixedparams)
+                self._preconditioners[key] = Preconditioner(self.p_matrix, scalings, side=side)
+        return self._preconditioners[key]
+
+    def rmatvec(self, other, preconditioning=True, out=None):
+        """ Matrix-vector product with the adjoint of the Jacobian at the linearization point, see Torus.rmatvec """
+        return self.torus.rmatvec(other, fixedparams=self.fixedparams, preconditioning=preconditioning,
+                                  out=out, linearization=self)
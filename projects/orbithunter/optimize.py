@@ -0,0 +1,955 @@
+from torihunter.orbit import RelativeTorus, EquilibriumTorus
+from torihunter.acceleration import AndersonAcceleration
+from torihunter.checkpoint import Checkpoint
+from torihunter.deflation import Deflation
+from torihunter.factorization import BroydenInverse, JacobianFactorization
+from torihunter.packing import TorusPacking
+from torihunter.preconditioning import Preconditioner
+import numpy as np
+import scipy.optimize
+
+__all__ = ['adjoint_descent', 'anderson', 'broyden', 'chord_newton', 'deflated_newton', 'minimize', 'resume',
+           'truncated_newton']
+
+# The methods of scipy.optimize.minimize which make use of Hessian-vector products.
+_hessp_methods = ['newton-cg', 'trust-ncg', 'trust-krylov', 'trust-constr']
+
+
+def default_fixedparams(torus):
+    """ The fixedparams argument which leaves every parameter of the torus free to vary """
+    if isinstance(torus, EquilibriumTorus):
+        return False
+    elif isinstance(torus, RelativeTorus):
+        return False, False, False
+    else:
+        return False, False
+
+
+def adjoint_descent(torus, tol=1e-8, maxiter=10000, stepsize=1.0, min_stepsize=1e-9, fixedparams=None,
+                    preconditioning=True, checkpoint=None, telemetry=None, verbose=False):
+    """ Minimize the cost function by descending along the adjoint of the Jacobian
+
+    Parameters
+    ----------
+    torus : Torus
+        The initial condition of the search.
+    tol : float
+        The value of the cost function at which the search is deemed to have converged.
+    maxiter : int
+        The maximum number of iterations.
+    stepsize : float
+        The initial step size; halved whenever a step fails to decrease the cost function.
+    min_stepsize : float
+        The search terminates once the step size falls beneath this value.
+    fixedparams : tuple of bool
+        Whether or not each parameter is fixed, see Torus.rmatvec. Defaults to all parameters varying.
+    preconditioning : bool, str or Preconditioner
+        Whether or not to precondition the descent direction. If True, the preconditioner of the current state is
+        used at every iteration, or its BlockPreconditioner if 'block'; a Preconditioner is used throughout the
+        search instead, in which case the search cannot be checkpointed.
+    checkpoint : Checkpoint or str
+        If provided, the search is periodically saved to this checkpoint and may be continued with resume().
+    telemetry : Telemetry
+        If provided, the residual, step size, parameters, wall time and transform count of each iteration
+        are streamed to this log.
+    verbose : bool
+        Whether or not to print the progress of the search.
+
+    Returns
+    -------
+    torus : Torus
+        The final state of the search.
+    statistics : dict
+        Contains the keys 'nit', the number of iterations, 'status', the reason for termination, and
+        'history', a list of dicts describing each iteration.
+
+    """
+    torus = torus.convert(to='modes')
+    if fixedparams is None:
+        fixedparams = default_fixedparams(torus)
+    settings = {'method': 'adjoint_descent', 'tol': tol, 'maxiter': maxiter, 'min_stepsize': min_stepsize,
+                'fixedparams': fixedparams, 'preconditioning': preconditioning}
+    _check_checkpointable(preconditioning, checkpoint)
+    direction = _descent_direction(torus, fixedparams, preconditioning)
+    return _adjoint_descent(torus, direction, stepsize, 0, [], settings, _start_checkpoint(checkpoint), telemetry,
+                            verbose)
+
+
+def anderson(torus, update=None, tol=1e-8, maxiter=10000, depth=5, mixing=1.0, stepsize=1.0, min_stepsize=1e-9,
+             fixedparams=None, preconditioning=True, telemetry=None, verbose=False):
+    """ Accelerate a fixed-point or descent iteration on the modes and parameters with Anderson mixing
+
+    Parameters
+    ----------
+    torus : Torus
+        The initial condition of the search.
+    update : callable
+        The iteration to accelerate, which takes a torus and returns the next torus, e.g. a single step of a
+        descent method. Defaults to a step of adjoint descent, see adjoint_descent.
+    tol : float
+        The value of the cost function at which the search is deemed to have converged.
+    maxiter : int
+        The maximum number of iterations.
+    depth : int
+        The number of previous iterates used by the acceleration, see AndersonAcceleration.
+    mixing : float
+        The mixing parameter of the acceleration, see AndersonAcceleration.
+    stepsize : float
+        The initial step size of the default update; halved whenever its steps fail to decrease the cost function.
+    min_stepsize : float
+        The search with the default update terminates once the step size falls beneath this value.
+    fixedparams : tuple of bool
+        Whether or not each parameter is fixed, see Torus.rmatvec. Defaults to all parameters varying. The
+        fixed parameters are never changed, even if update changes them.
+    preconditioning : bool, str or Preconditioner
+        The preconditioning of the default update, see adjoint_descent.
+    telemetry : Telemetry
+        If provided, the residual, step size, whether the step was accelerated, parameters, wall time and
+        transform count of each iteration are streamed to this log.
+    verbose : bool
+        Whether or not to print the progress of the search.
+
+    Returns
+    -------
+    torus : Torus
+        The final state of the search.
+    statistics : dict
+        Contains the keys 'nit', the number of iterations, 'status', the reason for termination, 'history',
+        a list of dicts describing each iteration, and 'rejected', the number of accelerated steps which were
+        rejected by the safeguard.
+
+    Notes
+    -----
+    The modes and the free parameters of the iterates are packed into flat vectors, see TorusPacking, which are
+    accelerated by AndersonAcceleration. The iteration is safeguarded by the cost function: an accelerated
+    iterate is only accepted if it decreases the cost function; otherwise the plain update is taken and the
+    history is discarded. If the plain update does not decrease the cost function either, the step size of the
+    default update is halved (which changes the fixed-point map, so the history is discarded), whereas a search
+    with a given update is deemed to have stalled. Each iteration costs one update and one or two evaluations
+    of the cost function.
+
+    Examples
+    --------
+    >>> torus, statistics = anderson(torus, depth=10, tol=1e-10)
+
+    """
+    torus = torus.convert(to='modes')
+    if fixedparams is None:
+        fixedparams = default_fixedparams(torus)
+    packing = TorusPacking(torus, fixedparams)
+    acceleration = AndersonAcceleration(depth=depth, mixing=mixing)
+    adaptive = update is None
+    if adaptive:
+        def update(current):
+            return current.copy().axpy(-stepsize, _descent_direction(current, fixedparams, preconditioning))
+
+    x = packing.pack(torus)
+    residual = packing.objective(x)
+    history, iteration, rejected = [], 0, 0
+    status = 'maxiter'
+    while iteration < maxiter:
+        if residual < tol:
+            status = 'converged'
+            break
+        image = packing.pack(update(packing.unpack(x)))
+        next_x = acceleration.step(x, image - x)
+        next_residual = packing.objective(next_x)
+        accelerated = len(acceleration) > 0
+        if accelerated and next_residual >= residual:
+            # The safeguard: fall back on the plain update and restart the acceleration from it.
+            rejected += 1
+            acceleration.reset()
+            next_x = image
+            next_residual = packing.objective(next_x)
+            accelerated = False
+        if next_residual >= residual:
+            if not adaptive or stepsize / 2.0 < min_stepsize:
+                status = 'stalled'
+                break
+            stepsize /= 2.0
+            acceleration.reset()
+            continue
+
+        x, residual = next_x, next_residual
+        iteration += 1
+        history.append({'iteration': iteration, 'residual': float(residual), 'stepsize': float(stepsize),
+                        'accelerated': accelerated})
+        if telemetry is not None:
+            telemetry.record(iteration, packing.unpack(x), residual=float(residual), stepsize=float(stepsize),
+                             accelerated=accelerated)
+        if verbose and not iteration % 100:
+            print('Iteration {}, residual {:.6e}, step size {:.3e}'.format(iteration, residual, stepsize))
+    return packing.unpack(x).copy(), {'nit': iteration, 'status': status, 'history': history, 'rejected': rejected}
+
+
+def broyden(torus, tol=1e-8, maxiter=1000, min_stepsize=1e-9, fixedparams=None, memory=100, initial='block',
+            telemetry=None, verbose=False):
+    """ Solve F = 0 with quasi-Newton steps whose inverse Jacobian is corrected by limited-memory Broyden updates
+
+    Parameters
+    ----------
+    torus : Torus
+        The initial condition of the search.
+    tol : float
+        The value of the cost function at which the search is deemed to have converged.
+    maxiter : int
+        The maximum number of iterations.
+    min_stepsize : float
+        The search terminates once the line search step size falls beneath this value after a restart.
+    fixedparams : tuple of bool
+        Whether or not each parameter is fixed, see Torus.matvec. Defaults to all parameters varying.
+    memory : int
+        The number of Broyden updates which are kept, see BroydenInverse.
+    initial : str or Preconditioner
+        The initial approximation of the inverse Jacobian: 'block', the BlockPreconditioner of the current state,
+        which inverts the linear terms, 'jac', the pseudo-inverse of the Jacobian matrix (see
+        JacobianFactorization), or a left Preconditioner.
+    telemetry : Telemetry
+        If provided, the residual, step size, number of stored updates, parameters, wall time and transform count
+        of each iteration are streamed to this log.
+    verbose : bool
+        Whether or not to print the progress of the search.
+
+    Returns
+    -------
+    torus : Torus
+        The final state of the search.
+    statistics : dict
+        Contains the keys 'nit', the number of iterations, 'status', the reason for termination, 'history',
+        a list of dicts describing each iteration, and 'restarts', the number of times the updates were discarded.
+
+    Notes
+    -----
+    Each iteration takes the step -H F, where H is the approximate inverse, followed by a backtracking line
+    search, after which H is updated with the step and the change in the mapping. Hence each iteration costs one
+    spatiotemporal mapping per trial step and no Jacobian-vector products. Quasi-Newton steps need not be descent
+    directions of the cost function, so the line search is the derivative-free, nonmonotone search of Li and
+    Fukushima, which tolerates increases of the cost function that decay with the number of iterations. If no
+    step size is accepted, the updates are discarded and the initial approximation is recomputed at the current
+    state ('block') before the search is deemed to have stalled; the pseudo-inverse of the Jacobian matrix
+    ('jac') is only computed once, as assembling it is what Broyden updates avoid. The block preconditioner
+    inverts the linear terms exactly (absolute=False) and is suited to every class of torus; the pseudo-inverse
+    of the Jacobian converges in far fewer iterations when the nonlinear term is large.
+
+    """
+    torus = torus.convert(to='modes')
+    if fixedparams is None:
+        fixedparams = default_fixedparams(torus)
+    packing = TorusPacking(torus, fixedparams)
+    factorization = JacobianFactorization(torus, fixedparams) if isinstance(initial, str) and initial == 'jac' else None
+    inverse = _initial_inverse(torus, fixedparams, initial, memory, factorization=factorization)
+    x = packing.pack(torus)
+    mapping = packing.mapping(x)
+    residual = 0.5 * np.dot(mapping, mapping)
+    history, iteration, restarts, restarted = [], 0, 0, False
+    status = 'maxiter'
+    while iteration < maxiter:
+        if residual < tol:
+            status = 'converged'
+            break
+        direction = -1.0 * inverse.matvec(mapping)
+        # Derivative-free, nonmonotone backtracking line search (Li and Fukushima); the increase which is
+        # tolerated decays with the number of iterations.
+        stepsize = 1.0
+        tolerance = residual / (iteration + 1)**2
+        next_x = x + direction
+        next_mapping = packing.mapping(next_x)
+        next_residual = 0.5 * np.dot(next_mapping, next_mapping)
+        while (next_residual > residual + tolerance - 1e-4 * stepsize**2 * np.dot(direction, direction)
+               and stepsize >= min_stepsize):
+            stepsize /= 2.0
+            next_x = x + stepsize * direction
+            next_mapping = packing.mapping(next_x)
+            next_residual = 0.5 * np.dot(next_mapping, next_mapping)
+        if stepsize < min_stepsize:
+            if restarted:
+                status = 'stalled'
+                break
+            # The updates have spoiled the approximation; start over from the current state.
+            inverse = _initial_inverse(packing.unpack(x), fixedparams, initial, memory, factorization=factorization)
+            restarts, restarted = restarts + 1, True
+            continue
+
+        inverse.update(next_x - x, next_mapping - mapping)
+        x, mapping, residual, restarted = next_x, next_mapping, next_residual, False
+        iteration += 1
+        history.append({'iteration': iteration, 'residual': float(residual), 'stepsize': float(stepsize),
+                        'updates': len(inverse)})
+        if telemetry is not None:
+            telemetry.record(iteration, packing.unpack(x), residual=float(residual), stepsize=float(stepsize),
+                             updates=len(inverse))
+        if verbose and not iteration % 10:
+            print('Iteration {}, residual {:.6e}, step size {:.3e}'.format(iteration, residual, stepsize))
+    return packing.unpack(x).copy(), {'nit': iteration, 'status': status, 'history': history, 'restarts': restarts}
+
+
+def chord_newton(torus, tol=1e-8, maxiter=100, min_stepsize=1e-9, fixedparams=None, decomposition='qr',
+                 max_reuse=None, contraction=0.5, cache=None, checkpoint=None, telemetry=None, verbose=False):
+    """ Solve F = 0 with Newton corrections which reuse a single factorization of the Jacobian matrix
+
+    Parameters
+    ----------
+    torus : Torus
+        The initial condition of the search.
+    tol : float
+        The value of the cost function at which the search is deemed to have converged.
+    maxiter : int
+        The maximum number of iterations (Newton corrections).
+    min_stepsize : float
+        The search terminates once the line search step size of a freshly factorized step falls beneath this value.
+    fixedparams : tuple of bool
+        Whether or not each parameter is fixed, see Torus.jac. Defaults to all parameters varying.
+    decomposition : str
+        The factorization of the Jacobian, 'qr' or 'lu', see JacobianFactorization.
+    max_reuse : int
+        The maximum number of corrections per factorization; Shamanskii's method refactorizes every max_reuse
+        corrections, the chord method (None) only when its convergence degrades.
+    contraction : float
+        The factorization is refreshed once a correction fails to reduce the norm of the spatiotemporal mapping
+        by this factor.
+    cache : FactorizationCache
+        If provided, a cached factorization at similar parameters is used for the first corrections, and the
+        factorizations of the search are stored; e.g. shared by the steps of a continuation.
+    checkpoint : Checkpoint or str
+        If provided, the search is periodically saved to this checkpoint and may be continued with resume().
+    telemetry : Telemetry
+        If provided, the residual, step size, number of factorizations, parameters, wall time and transform
+        count of each iteration are streamed to this log.
+    verbose : bool
+        Whether or not to print the progress of the search.
+
+    Returns
+    -------
+    torus : Torus
+        The final state of the search.
+    statistics : dict
+        Contains the keys 'nit', the number of iterations, 'status', the reason for termination, 'history',
+        a list of dicts describing each iteration, and 'factorizations', the number of factorizations computed.
+
+    Notes
+    -----
+    Each correction x -> x - J(x_0)^{-1} F(x) uses the Jacobian at an earlier state x_0, so that the O(n^3)
+    assembly and factorization of the Jacobian is amortized over several corrections which each cost O(n^2).
+    The chord iteration converges linearly, with a rate which grows with the distance to x_0; once a correction
+    reduces ||F|| by less than the factor contraction, it is rejected and the Jacobian is refactorized at the
+    current state. Steps with a fresh factorization are full Newton steps, safeguarded by a backtracking line
+    search. Checkpoints do not contain the factorization, which is recomputed when the search is resumed.
+    EquilibriumTorus does not provide the Jacobian matrix; use truncated_newton instead.
+
+    """
+    torus = torus.convert(to='modes')
+    if isinstance(torus, EquilibriumTorus):
+        raise ValueError('chord_newton requires the Jacobian matrix, Torus.jac, which equilibria do not provide.')
+    if fixedparams is None:
+        fixedparams = default_fixedparams(torus)
+    settings = {'method': 'chord_newton', 'tol': tol, 'maxiter': maxiter, 'min_stepsize': min_stepsize,
+                'fixedparams': fixedparams, 'decomposition': decomposition, 'max_reuse': max_reuse,
+                'contraction': contraction}
+    direction = torus.copy()
+    return _chord_newton(torus, direction, 1.0, 0, [], settings, _start_checkpoint(checkpoint), telemetry, verbose,
+                         cache=cache)
+
+
+def deflated_newton(torus, known, tol=1e-8, maxiter=100, min_stepsize=1e-9, fixedparams=None, power=2, shift=1.0,
+                    decomposition='qr', telemetry=None, verbose=False):
+    """ Solve F = 0 with Newton's method applied to the mapping deflated by known tori
+
+    Parameters
+    ----------
+    torus : Torus
+        The initial condition of the search.
+    known : iterable of Torus or Deflation
+        The known tori, which the search is pushed away from, or their deflation operator.
+    tol : float
+        The value of the cost function (of the undeflated mapping) at which the search is deemed to have
+        converged.
+    maxiter : int
+        The maximum number of iterations.
+    min_stepsize : float
+        The search terminates once the line search step size falls beneath this value.
+    fixedparams : tuple of bool
+        Whether or not each parameter is fixed, see Torus.jac. Defaults to all parameters varying.
+    power, shift : float
+        The parameters of the deflation operator, see Deflation; ignored if known is a Deflation.
+    decomposition : str
+        The factorization of the Jacobian, 'qr' or 'lu', see JacobianFactorization.
+    telemetry : Telemetry
+        If provided, the residual, step size, value of the deflation operator, parameters, wall time and
+        transform count of each iteration are streamed to this log.
+    verbose : bool
+        Whether or not to print the progress of the search.
+
+    Returns
+    -------
+    torus : Torus
+        The final state of the search.
+    statistics : dict
+        Contains the keys 'nit', the number of iterations, 'status', the reason for termination, 'history',
+        a list of dicts describing each iteration, and 'distances', the distances between the final state and
+        each of the known tori.
+
+    Notes
+    -----
+    Newton's method for the deflated mapping G = M F does not require the Jacobian of G: with the Newton step
+    of the mapping itself, dx_F = -J^{-1} F, the Newton step of G is dx = dx_F / (1 - g . dx_F), where
+    g = grad M / M is the gradient of the logarithm of the deflation operator, see Deflation.gradient. The step
+    is followed by a backtracking line search on the deflated cost function, 1/2 M^2 ||F||^2. Near a known torus
+    the deflated steps lengthen, so the search is pushed away from the known tori instead of converging to them
+    again. The Jacobian matrix is assembled and factorized at every iteration; EquilibriumTorus does not provide
+    it.
+
+    """
+    torus = torus.convert(to='modes')
+    if isinstance(torus, EquilibriumTorus):
+        raise ValueError('deflated_newton requires the Jacobian matrix, Torus.jac, which equilibria do not provide.')
+    if fixedparams is None:
+        fixedparams = default_fixedparams(torus)
+    deflation = known if isinstance(known, Deflation) else Deflation(known, power=power, shift=shift)
+    torus, next_torus = torus.copy(), torus.copy()
+    mapping = torus.spatiotemporal_mapping()
+    residual, multiplier = 0.5 * np.linalg.norm(mapping.state.ravel())**2, deflation.multiplier(torus)
+    history, iteration = [], 0
+    status = 'maxiter'
+    while iteration < maxiter:
+        if residual < tol:
+            status = 'converged'
+            break
+        direction = JacobianFactorization(torus, fixedparams, decomposition=decomposition).solve(mapping)
+        denominator = 1.0 - _inner(deflation.gradient(torus), direction)
+        if abs(denominator) > np.finfo(float).eps:
+            _scale(direction, 1.0 / denominator)
+
+        # Backtracking line search on the deflated cost function.
+        stepsize = 2.0
+        next_residual, next_multiplier = np.inf, np.inf
+        while next_multiplier**2 * next_residual >= multiplier**2 * residual and stepsize >= min_stepsize:
+            stepsize /= 2.0
+            torus.copy(out=next_torus).axpy(stepsize, direction)
+            next_mapping = next_torus.spatiotemporal_mapping()
+            next_residual = 0.5 * np.linalg.norm(next_mapping.state.ravel())**2
+            next_multiplier = deflation.multiplier(next_torus)
+        if stepsize < min_stepsize:
+            status = 'stalled'
+            break
+
+        torus, next_torus = next_torus, torus
+        mapping, residual, multiplier = next_mapping, next_residual, next_multiplier
+        iteration += 1
+        history.append({'iteration': iteration, 'residual': float(residual), 'stepsize': float(stepsize),
+                        'multiplier': multiplier})
+        if telemetry is not None:
+            telemetry.record(iteration, torus, residual=float(residual), stepsize=float(stepsize),
+                             multiplier=multiplier)
+        if verbose:
+            print('Iteration {}, residual {:.6e}, step size {:.3e}, deflation {:.3e}'.format(
+                iteration, residual, stepsize, multiplier))
+    return torus, {'nit': iteration, 'status': status, 'history': history, 'distances': deflation.distances(torus)}
+
+
+def minimize(torus, method='L-BFGS-B', tol=None, maxiter=None, fixedparams=None, preconditioning=False, callback=None,
+             telemetry=None, **options):
+    """ Minimize the cost function with scipy.optimize.minimize
+
+    Parameters
+    ----------
+    torus : Torus
+        The initial condition of the search.
+    method : str
+        The method passed to scipy.optimize.minimize, e.g. 'L-BFGS-B', 'CG', 'trust-ncg' or 'newton-cg'.
+        Hessian-vector products (Torus.hessvec) are provided to the methods which use them.
+    tol : float
+        Tolerance for termination, passed to scipy.optimize.minimize.
+    maxiter : int
+        The maximum number of iterations.
+    fixedparams : tuple of bool
+        Whether or not each parameter is fixed, see Torus.rmatvec. Defaults to all parameters varying.
+    preconditioning : bool, str or Preconditioner
+        Whether or not to precondition the problem by the change of variables x = P y, where P is the (right)
+        preconditioner of the initial condition if True, its BlockPreconditioner if 'block', or the
+        Preconditioner provided.
+    callback : callable
+        Called after each iteration with the current torus; note that its state is a view of the array used
+        by the optimizer.
+    telemetry : Telemetry
+        If provided, the residual, parameters, wall time and transform count of each iteration are streamed
+        to this log.
+    **options :
+        Method specific options, passed to scipy.optimize.minimize.
+
+    Returns
+    -------
+    torus : Torus
+        The final state of the search.
+    result : OptimizeResult
+        The result returned by scipy.optimize.minimize; if preconditioned, x is mapped back to the original variables.
+
+    Notes
+    -----
+    The objective, gradient and Hessian-vector products are evaluated on views of the optimizer's arrays, see
+    TorusPacking, with the spatiotemporal mapping and linearization shared between callbacks at the same point.
+
+    """
+    torus = torus.convert(to='modes')
+    if fixedparams is None:
+        fixedparams = default_fixedparams(torus)
+    packing = TorusPacking(torus, fixedparams)
+    if maxiter is not None:
+        options['maxiter'] = maxiter
+    objective, gradient, hessp = packing.objective, packing.gradient, packing.hessp
+    preconditioner = None
+    if preconditioning:
+        if isinstance(preconditioning, Preconditioner):
+            preconditioner = preconditioning
+        elif preconditioning == 'block':
+            preconditioner = torus.block_preconditioner(fixedparams=fixedparams, side='right')
+        else:
+            preconditioner = torus.preconditioner(fixedparams=fixedparams, side='right')
+
+        def objective(y):
+            return packing.objective(preconditioner.matvec(y))
+
+        def gradient(y):
+            return preconditioner.rmatvec(packing.gradient(preconditioner.matvec(y)))
+
+        def hessp(y, p):
+            return preconditioner.rmatvec(packing.hessp(preconditioner.matvec(y), preconditioner.matvec(p)))
+    iteration = 0
+
+    def packed_callback(y, *args):
+        nonlocal iteration
+        iteration += 1
+        x = preconditioner.matvec(y) if preconditioner is not None else y
+        current_torus = packing.unpack(x)
+        if telemetry is not None:
+            telemetry.record(iteration, current_torus, residual=float(packing.objective(x)))
+        if callback is not None:
+            return callback(current_torus)
+    initial = packing.pack(torus)
+    if preconditioner is not None:
+        initial = preconditioner.inv().matvec(initial)
+    result = scipy.optimize.minimize(objective, initial, method=method, jac=gradient,
+                                     hessp=hessp if method.lower() in _hessp_methods else None, tol=tol,
+                                     callback=packed_callback, options=options)
+    if preconditioner is not None:
+        result.x = preconditioner.matvec(result.x)
+    return packing.unpack(result.x.copy()), result
+
+
+def resume(checkpoint, telemetry=None, verbose=False, **settings):
+    """ Continue a search from its most recent checkpoint
+
+    Parameters
+    ----------
+    checkpoint : Checkpoint or str
+        The checkpoint (or its filename) that the search was saved to.
+    telemetry : Telemetry
+        If provided, the iterations of the resumed search are streamed to this log.
+    verbose : bool
+        Whether or not to print the progress of the search.
+    **settings :
+        Overrides for the settings the search was started with, e.g. maxiter.
+
+    Returns
+    -------
+    torus, statistics :
+        See the documentation of the search method which was resumed.
+
+    Notes
+    -----
+    The search continues from the exact state, search direction and step size of the snapshot, so that
+    the sequence of iterates is identical to an uninterrupted search.
+    """
+    checkpoint = _as_checkpoint(checkpoint)
+    snapshot = checkpoint.load()
+    resumed_settings = dict(snapshot['settings'], **settings)
+    fixedparams = resumed_settings['fixedparams']
+    if not isinstance(fixedparams, bool):
+        resumed_settings['fixedparams'] = tuple(fixedparams)
+    method = _resumable_methods[resumed_settings['method']]
+    return method(snapshot['torus'], snapshot['direction'], snapshot['stepsize'], snapshot['iteration'],
+                  snapshot['history'], resumed_settings, checkpoint, telemetry, verbose)
+
+
+def truncated_newton(torus, tol=1e-8, maxiter=500, max_cg_iter=50, min_stepsize=1e-9, fixedparams=None,
+                     preconditioning=False, checkpoint=None, telemetry=None, verbose=False):
+    """ Minimize the cost function with a line search Newton-CG method based on Hessian-vector products
+
+    Parameters
+    ----------
+    torus : Torus
+        The initial condition of the search.
+    tol : float
+        The value of the cost function at which the search is deemed to have converged.
+    maxiter : int
+        The maximum number of (Newton) iterations.
+    max_cg_iter : int
+        The maximum number of conjugate gradient iterations used to compute each Newton step.
+    min_stepsize : float
+        The search terminates once the line search step size falls beneath this value.
+    fixedparams : tuple of bool
+        Whether or not each parameter is fixed, see Torus.rmatvec. Defaults to all parameters varying.
+    preconditioning : bool, str or Preconditioner
+        Whether or not to precondition the conjugate gradient iterations with P P^T, where P is the (right)
+        preconditioner of the current state, such that P P^T approximates the inverse of the Hessian; 'block'
+        uses the BlockPreconditioner of the current state instead. A Preconditioner is used throughout the
+        search instead, in which case the search cannot be checkpointed.
+    checkpoint : Checkpoint or str
+        If provided, the search is periodically saved to this checkpoint and may be continued with resume().
+    telemetry : Telemetry
+        If provided, the residual, step size, number of conjugate gradient iterations, parameters, wall time and
+        transform count of each iteration are streamed to this log.
+    verbose : bool
+        Whether or not to print the progress of the search.
+
+    Returns
+    -------
+    torus : Torus
+        The final state of the search.
+    statistics : dict
+        Contains the keys 'nit', the number of iterations, 'status', the reason for termination, and
+        'history', a list of dicts describing each iteration.
+
+    Notes
+    -----
+    Each iteration approximately solves H p = -g by conjugate gradient, which is truncated once the residual
+    is reduced by the factor min(0.5, sqrt(||g||)) or when negative curvature is encountered, followed by a
+    backtracking line search on the cost function; see Nocedal and Wright, Numerical Optimization, Algorithm 7.1.
+    The Hessian-vector products are those of Torus.hessvec; the linearization and the spatiotemporal mapping
+    are computed once per iteration and shared by all of the conjugate gradient iterations.
+
+    """
+    torus = torus.convert(to='modes')
+    if fixedparams is None:
+        fixedparams = default_fixedparams(torus)
+    settings = {'method': 'truncated_newton', 'tol': tol, 'maxiter': maxiter, 'max_cg_iter': max_cg_iter,
+                'min_stepsize': min_stepsize, 'fixedparams': fixedparams, 'preconditioning': preconditioning}
+    _check_checkpointable(preconditioning, checkpoint)
+    gradient = _gradient(torus, torus.linearize(fixedparams=fixedparams), torus.spatiotemporal_mapping(), fixedparams)
+    return _truncated_newton(torus, gradient, 1.0, 0, [], settings, _start_checkpoint(checkpoint), telemetry,
+                             verbose)
+
+
+def _adjoint_descent(torus, direction, stepsize, iteration, history, settings, checkpoint, telemetry, verbose):
+    """ The iterations of adjoint_descent, separated so that they may be resumed from a checkpoint """
+    fixedparams, preconditioning = settings['fixedparams'], settings['preconditioning']
+    # Two buffers are alternated between the current and trial states, so the iterations do not allocate tori.
+    torus, next_torus = torus.copy(), torus.copy()
+    residual = torus.residual()
+    status = 'maxiter'
+    while iteration < settings['maxiter']:
+        if residual < settings['tol']:
+            status = 'converged'
+            break
+        torus.copy(out=next_torus).axpy(-stepsize, direction)
+        next_residual = next_torus.residual()
+        while next_residual >= residual and stepsize >= settings['min_stepsize']:
+            stepsize /= 2.0
+            torus.copy(out=next_torus).axpy(-stepsize, direction)
+            next_residual = next_torus.residual()
+        if stepsize < settings['min_stepsize']:
+            status = 'stalled'
+            break
+
+        torus, next_torus = next_torus, torus
+        residual = next_residual
+        iteration += 1
+        history.append({'iteration': iteration, 'residual': float(residual), 'stepsize': float(stepsize)})
+        direction = _descent_direction(torus, fixedparams, preconditioning, out=direction)
+        if checkpoint is not None:
+            checkpoint.update(iteration, torus, direction, stepsize, settings, residual=float(residual))
+        if telemetry is not None:
+            telemetry.record(iteration, torus, residual=float(residual), stepsize=float(stepsize))
+        if verbose and not iteration % 100:
+            print('Iteration {}, residual {:.6e}, step size {:.3e}'.format(iteration, residual, stepsize))
+
+    if checkpoint is not None:
+        checkpoint.save(iteration, torus, direction, stepsize, settings)
+        checkpoint.close()
+    return torus, {'nit': iteration, 'status': status, 'history': history}
+
+
+def _truncated_newton(torus, direction, stepsize, iteration, history, settings, checkpoint, telemetry, verbose):
+    """ The iterations of truncated_newton, separated so that they may be resumed from a checkpoint
+
+    Notes
+    -----
+    The search direction which is saved to checkpoints is the Newton step of the last iteration; the line
+    search always begins with a unit step, therefore the search is resumed from the state alone.
+    """
+    fixedparams = settings['fixedparams']
+    torus, next_torus = torus.copy(), torus.copy()
+    residual = torus.residual()
+    status = 'maxiter'
+    while iteration < settings['maxiter']:
+        if residual < settings['tol']:
+            status = 'converged'
+            break
+        mapping = torus.spatiotemporal_mapping()
+        linearization = torus.linearize(fixedparams=fixedparams)
+        gradient = _gradient(torus, linearization, mapping, fixedparams)
+        preconditioner = linearization.preconditioner(settings['preconditioning'], side='right')
+        direction, cg_iterations = _newton_cg_step(torus, gradient, linearization, mapping, fixedparams,
+                                                   settings['max_cg_iter'], preconditioner=preconditioner)
+        slope = _inner(gradient, direction)
+        if slope >= 0:
+            # The approximate Hessian is not positive definite along the step; fall back on steepest descent.
+            direction = _scale(gradient, -1.0)
+            slope = _inner(gradient, direction)
+
+        # Backtracking line search with the sufficient decrease (Armijo) condition.
+        stepsize = 1.0
+        torus.copy(out=next_torus).axpy(stepsize, direction)
+        next_residual = next_torus.residual()
+        while next_residual > residual + 1e-4 * stepsize * slope and stepsize >= settings['min_stepsize']:
+            stepsize /= 2.0
+            torus.copy(out=next_torus).axpy(stepsize, direction)
+            next_residual = next_torus.residual()
+        if stepsize < settings['min_stepsize']:
+            status = 'stalled'
+            break
+
+        torus, next_torus = next_torus, torus
+        residual = next_residual
+        iteration += 1
+        history.append({'iteration': iteration, 'residual': float(residual), 'stepsize': float(stepsize),
+                        'cg_iterations': cg_iterations})
+        if checkpoint is not None:
+            checkpoint.update(iteration, torus, direction, stepsize, settings, residual=float(residual),
+                              cg_iterations=cg_iterations)
+        if telemetry is not None:
+            telemetry.record(iteration, torus, residual=float(residual), stepsize=float(stepsize),
+                             cg_iterations=cg_iterations)
+        if verbose:
+            print('Iteration {}, residual {:.6e}, step size {:.3e}, {} CG iterations'.format(
+                iteration, residual, stepsize, cg_iterations))
+
+    if checkpoint is not None:
+        checkpoint.save(iteration, torus, direction, stepsize, settings)
+        checkpoint.close()
+    return torus, {'nit': iteration, 'status': status, 'history': history}
+
+
+def _as_checkpoint(checkpoint):
+    """ Allow checkpoints to be specified by filename """
+    if isinstance(checkpoint, str):
+        return Checkpoint(checkpoint)
+    return checkpoint
+
+
+def _start_checkpoint(checkpoint):
+    """ The checkpoint of a new search, emptied of any previous search saved under the same filename """
+    checkpoint = _as_checkpoint(checkpoint)
+    if checkpoint is not None:
+        checkpoint.start()
+    return checkpoint
+
+
+def _check_checkpointable(preconditioning, checkpoint):
+    """ Checkpoints store the settings as JSON, which excludes Preconditioner instances """
+    if checkpoint is not None and isinstance(preconditioning, Preconditioner):
+        raise ValueError('searches with a Preconditioner cannot be checkpointed; use preconditioning=True instead.')
+    return None
+
+
+def _descent_direction(torus, fixedparams, preconditioning, out=None):
+    """ The gradient of the cost function, J^T F, with the components of fixed parameters set to zero """
+    direction = torus.rmatvec(torus.spatiotemporal_mapping(), fixedparams=fixedparams,
+                              preconditioning=preconditioning, out=out)
+    _zero_fixed_parameters(direction, fixedparams)
+    return direction
+
+
+def _gradient(torus, linearization, mapping, fixedparams):
+    """ The (unpreconditioned) gradient of the cost function, J^T F, with fixed parameter components set to zero """
+    return _zero_fixed_parameters(linearization.rmatvec(mapping, preconditioning=False), fixedparams)
+
+
+def _inner(torus, other):
+    """ Inner product of two vectors which includes the parameter components
+
+    Notes
+    -----
+    The components of fixed parameters are assumed to have been set to zero, see _zero_fixed_parameters.
+    """
+    return torus.dot(other) + torus.T*other.T + torus.L*other.L + torus.S*other.S
+
+
+def _chord_newton(torus, direction, stepsize, iteration, history, settings, checkpoint, telemetry, verbose,
+                  cache=None):
+    """ The iterations of chord_newton, separated so that they may be resumed from a checkpoint """
+    fixedparams, decomposition = settings['fixedparams'], settings['decomposition']
+    torus, next_torus = torus.copy(), torus.copy()
+    mapping = torus.spatiotemporal_mapping()
+    residual = 0.5 * np.linalg.norm(mapping.state.ravel())**2
+    factorization = cache.get(torus, fixedparams, decomposition) if cache is not None else None
+    # Whether the factorization was computed at the current state, in which case it is never refreshed.
+    fresh = False
+    n_factorizations = 0
+    status = 'maxiter'
+    while iteration < settings['maxiter']:
+        if residual < settings['tol']:
+            status = 'converged'
+            break
+        if factorization is None or (settings['max_reuse'] is not None and
+                                     factorization.uses >= settings['max_reuse']):
+            factorization = JacobianFactorization(torus, fixedparams, decomposition=decomposition)
+            fresh = True
+            n_factorizations += 1
+            if cache is not None:
+                cache.put(factorization)
+        direction = factorization.solve(mapping)
+
+        stepsize = 1.0
+        torus.copy(out=next_torus).axpy(stepsize, direction)
+        next_mapping = next_torus.spatiotemporal_mapping()
+        next_residual = 0.5 * np.linalg.norm(next_mapping.state.ravel())**2
+        if not fresh and next_residual > settings['contraction']**2 * residual:
+            # The convergence of the chord iteration has degraded; reject the step and refactorize.
+            factorization = None
+            continue
+        while fresh and next_residual >= residual and stepsize >= settings['min_stepsize']:
+            stepsize /= 2.0
+            torus.copy(out=next_torus).axpy(stepsize, direction)
+            next_mapping = next_torus.spatiotemporal_mapping()
+            next_residual = 0.5 * np.linalg.norm(next_mapping.state.ravel())**2
+        if stepsize < settings['min_stepsize']:
+            status = 'stalled'
+            break
+
+        torus, next_torus = next_torus, torus
+        mapping, residual, fresh = next_mapping, next_residual, False
+        iteration += 1
+        history.append({'iteration': iteration, 'residual': float(residual), 'stepsize': float(stepsize),
+                        'factorizations': n_factorizations})
+        if checkpoint is not None:
+            checkpoint.update(iteration, torus, direction, stepsize, settings, residual=float(residual),
+                              factorizations=n_factorizations)
+        if telemetry is not None:
+            telemetry.record(iteration, torus, residual=float(residual), stepsize=float(stepsize),
+                             factorizations=n_factorizations)
+        if verbose:
+            print('Iteration {}, residual {:.6e}, step size {:.3e}, {} factorizations'.format(
+                iteration, residual, stepsize, n_factorizations))
+
+    if checkpoint is not None:
+        checkpoint.save(iteration, torus, direction, stepsize, settings)
+        checkpoint.close()
+    return torus, {'nit': iteration, 'status': status, 'history': history, 'factorizations': n_factorizations}
+
+
+def _initial_inverse(torus, fixedparams, initial, memory, factorization=None):
+    """ BroydenInverse whose initial approximation is either the pseudo-inverse of the Jacobian or a preconditioner
+
+    Notes
+    -----
+    A left preconditioner, P, approximates the inverse of the part of the Jacobian, A, which acts on the modes.
+    The columns of the free parameters, C, are included exactly: the initial approximation returns the minimum
+    norm solution of [A C] [dx; dp] = r, that is dx = P r - G dp with G = P C and (G^T G + I) dp = G^T P r.
+    """
+    if factorization is not None:
+        return BroydenInverse(factorization.inverse, lambda vector: factorization.inverse(vector, transpose=True),
+                              memory=memory)
+    elif isinstance(initial, Preconditioner):
+        preconditioner = initial
+    elif initial == 'block':
+        preconditioner = torus.block_preconditioner(fixedparams=fixedparams, absolute=False)
+    else:
+        raise ValueError('initial must be either \'block\', \'jac\' or a Preconditioner.')
+    columns = torus.linearize(fixedparams=fixedparams).parameter_columns
+    # The parameter columns in the order T, L, S of the packed vectors.
+    preconditioned_columns = np.array([preconditioner.matvec(columns[parameter].ravel()) for parameter
+                                       in ['T', 'L', 'S'] if parameter in columns])
+    preconditioned_columns = preconditioned_columns.reshape(len(columns), torus.state.size).T
+    normal_matrix = np.dot(preconditioned_columns.T, preconditioned_columns) + np.eye(len(columns))
+
+    def initial_matvec(vector):
+        preconditioned = preconditioner.matvec(vector)
+        parameters = np.linalg.solve(normal_matrix, np.dot(preconditioned_columns.T, preconditioned))
+        return np.concatenate((preconditioned - np.dot(preconditioned_columns, parameters), parameters))
+
+    def initial_rmatvec(vector):
+        modes, parameters = vector[:vector.size - len(columns)], vector[vector.size - len(columns):]
+        coefficients = np.linalg.solve(normal_matrix, parameters - np.dot(preconditioned_columns.T, modes))
+        return preconditioner.rmatvec(modes + np.dot(preconditioned_columns, coefficients))
+
+    return BroydenInverse(initial_matvec, initial_rmatvec, memory=memory)
+
+
+def _newton_cg_step(torus, gradient, linearization, mapping, fixedparams, maxiter, preconditioner=None):
+    """ Approximate solution of H p = -g by (preconditioned) conjugate gradient, truncated on negative curvature
+
+    Returns
+    -------
+    step : Torus
+        The approximate Newton step, including the parameter components.
+    int :
+        The number of conjugate gradient iterations.
+    """
+    gradient_norm = np.sqrt(_inner(gradient, gradient))
+    tolerance = min(0.5, np.sqrt(gradient_norm)) * gradient_norm
+    step = _scale(gradient.copy(), 0.0)
+    # The residual of H p + g, the preconditioned residual and the conjugate search direction.
+    cg_residual = gradient.copy()
+    preconditioned = _precondition_twice(preconditioner, cg_residual)
+    search = _scale(preconditioned.copy(), -1.0)
+    residual_norm_squared = _inner(cg_residual, preconditioned)
+    hessvec_torus = None
+    for cg_iteration in range(1, maxiter+1):
+        hessvec_torus = _zero_fixed_parameters(torus.hessvec(search, out=hessvec_torus, linearization=linearization,
+                                                             mapping=mapping), fixedparams)
+        curvature = _inner(search, hessvec_torus)
+        if curvature <= 0:
+            if cg_iteration == 1:
+                step = search
+            break
+        alpha = residual_norm_squared / curvature
+        step.axpy(alpha, search)
+        cg_residual.axpy(alpha, hessvec_torus)
+        if np.sqrt(_inner(cg_residual, cg_residual)) < tolerance:
+            break
+        preconditioned = _precondition_twice(preconditioner, cg_residual, out=preconditioned)
+        next_residual_norm_squared = _inner(cg_residual, preconditioned)
+        beta = next_residual_norm_squared / residual_norm_squared
+        residual_norm_squared = next_residual_norm_squared
+        _scale(search, beta).axpy(-1.0, preconditioned)
+    return step, cg_iteration
+
+
+def _precondition_twice(preconditioner, torus, out=None):
+    """ The product P P^T r, or r itself without a preconditioner """
+    if preconditioner is None:
+        return torus
+    return preconditioner.apply(preconditioner.apply(torus, out=out, transpose=True), out=out)
+
+
+def _scale(torus, alpha):
+    """ In-place scalar multiplication which, unlike Torus arithmetic, includes the parameter components """
+    torus *= alpha
+    torus.T, torus.L, torus.S = alpha * torus.T, alpha * torus.L, alpha * torus.S
+    return torus
+
+
+def _zero_fixed_parameters(torus, fixedparams):
+    """ Zero the parameter components which correspond to fixed parameters
+
+    Notes
+    -----
+    Products such as rmatvec leave the parameters of fixed components equal to those of the base torus;
+    these must not be used to increment the parameters.
+    """
+    if isinstance(fixedparams, bool):
+        # EquilibriumTorus only has a single parameter, its spatial period.
+        torus.T = 0.
+        if fixedparams:
+            torus.L = 0.
+    else:
+        for parameter, fixed in zip(['T', 'L', 'S'], fixedparams):
+            if fixed:
+                setattr(torus, parameter, 0.)
+        if len(fixedparams) < 3:
+            torus.S = 0.
+    return torus
+
+
+_resumable_methods = {'adjoint_descent': _adjoint_descent, 'chord_newton': _chord_newton,
+                      'truncated_newton': _truncated_newton}
@@ -1,22 +1,67 @@
 from math import pi
 from torihunter._arrayops import swap_modes, so2_generator, so2_coefficients
-from torihunter.discretization import rediscretize
 from torihunter.generate import random_initial_condition
+from torihunter.expression import TorusExpression
+from torihunter.linearization import Linearization
+from torihunter.preconditioning import Preconditioner, BlockPreconditioner, parameter_scalings
 from scipy.fft import rfft, irfft
 from scipy.linalg import block_diag
-from mpl_toolkits.axes_grid1 import make_axes_locatable
+from collections import Counter, OrderedDict
 import copy
-import os
-import sys
+import functools
+import threading
 import warnings
 import numpy as np
-import matplotlib.pyplot as plt
-warnings.simplefilter(action='ignore', category=FutureWarning)
-import h5py
-warnings.resetwarnings()
 
 __all__ = ['Torus', 'RelativeTorus', 'ShiftReflectionTorus', 'AntisymmetricTorus', 'EquilibriumTorus']
 
+# The number of Fourier transforms performed by Torus.convert in the current process, by transform.
+transform_counts = Counter()
+# Guards transform_counts, which may be updated by several threads at once.
+transform_counts_lock = threading.Lock()
+
+# Operators which only depend on the class and the discretization, keyed by (class, N, M); least recently used last.
+operator_cache = OrderedDict()
+# The number of discretizations whose operators are kept in operator_cache. Zero disables the cache, such that the
+# dense operators are not retained after use; enabled by the workers of ShapeAffinePool.
+operator_cache_shapes = 0
+
+
+def _count_transform(transform):
+    """ Increment the count of a transform, see transform_counts """
+    with transform_counts_lock:
+        transform_counts[transform] += 1
+
+
+def _shape_cached(method):
+    """ Memoize a method which returns an operator that only depends on the class of the torus and on (N, M)
+
+    Notes
+    -----
+    The operators are returned read-only because they are shared by every torus with the same discretization.
+    Only cached if operator_cache_shapes is positive; a dense operator of a 48 x 48 discretization alone
+    takes tens of megabytes.
+    """
+    @functools.wraps(method)
+    def cached_method(self):
+        if operator_cache_shapes <= 0:
+            return method(self)
+        key = (self.__class__, self.N, self.M)
+        operators = operator_cache.get(key)
+        if operators is None:
+            operators = operator_cache[key] = {}
+            while len(operator_cache) > operator_cache_shapes:
+                operator_cache.popitem(last=False)
+        else:
+            operator_cache.move_to_end(key)
+        operator = operators.get(method.__qualname__)
+        if operator is None:
+            operator = method(self)
+            operator.flags.writeable = False
+            operators[method.__qualname__] = operator
+        return operator
+    return cached_method
+
 
 class Torus:
     """ Object that represents invariant 2-torus solution of the Kuramoto-Sivashinsky equation.
@@ -65,6 +110,11 @@ class Torus:
     provided. It's dimensions will provide on the spatial and temporal periods unless provided
     as keyword arguments {N, M}.
 
+    Conversions to other bases are memoized, such that repeated calls of convert() on an unchanged torus only
+    perform the Fourier transforms once. Assignment to 'state', in-place arithmetic, axpy and copy(out=...)
+    discard the memoized conversions; modifying the elements of 'state' directly does not, therefore
+    this should be followed by reassignment, torus.state = torus.state.
+
 
     Examples
     --------
@@ -96,10 +146,47 @@ class Torus:
         # For uniform save format
         self.S = S
 
+    @property
+    def state(self):
+        """ The array of velocity field values, spatial modes or spatiotemporal modes, see statetype """
+        return self._state
+
+    @state.setter
+    def state(self, state):
+        # The memoized conversions no longer represent the new state; they are discarded.
+        self._state = state
+        self._bases = {}
+        self._memoized_by = None
+
+    def __getstate__(self):
+        # Memoized conversions are not pickled; recomputing them is cheaper than sending them to other processes.
+        attributes = self.__dict__.copy()
+        attributes['_bases'], attributes['_memoized_by'] = {}, None
+        return attributes
+
+    def _mutable_state(self):
+        """ The state array, prepared to be written to in place
+
+        Notes
+        -----
+        The memoized conversions of the state are discarded, for self and for any views which share its state.
+        If the state was itself produced by convert(), it is also memoized by the torus it was converted from;
+        it is removed from those conversions as well.
+        """
+        self._bases.clear()
+        if self._memoized_by is not None:
+            for statetype, state in list(self._memoized_by.items()):
+                if state is self._state:
+                    del self._memoized_by[statetype]
+            self._memoized_by = None
+        return self._state
+
     def __copy__(self):
-        return self.__class__(state=self.state, T=self.T, L=self.L, S=self.S)
+        return self.copy()
 
     def __add__(self, other):
+        if isinstance(other, TorusExpression):
+            return self.lazy() + other
         return self.__class__(state=(self.state + other.state),
                               T=self.T, L=self.L, S=self.S, statetype=self.statetype)
 
@@ -107,12 +194,30 @@ class Torus:
         return self.__class__(state=(self.state + other.state),
                               T=self.T, L=self.L, S=self.S, statetype=self.statetype)
 
+    def __iadd__(self, other):
+        """ In-place addition of states; the parameters of self are unchanged """
+        if isinstance(other, TorusExpression):
+            return (self.lazy() + other).evaluate(out=self)
+        state = self._mutable_state()
+        np.add(state, other.state, out=state)
+        return self
+
     def __sub__(self, other):
+        if isinstance(other, TorusExpression):
+            return self.lazy() - other
         return self.__class__(state=(self.state-other.state),  T=self.T, L=self.L, S=self.S, statetype=self.statetype)
 
     def __rsub__(self, other):
         return self.__class__(state=(other.state - self.state), T=self.T, L=self.L, S=self.S, statetype=self.statetype)
 
+    def __isub__(self, other):
+        """ In-place subtraction of states; the parameters of self are unchanged """
+        if isinstance(other, TorusExpression):
+            return (self.lazy() - other).evaluate(out=self)
+        state = self._mutable_state()
+        np.subtract(state, other.state, out=state)
+        return self
+
     def __mul__(self, num):
         """ Scalar multiplication
 
@@ -143,6 +248,18 @@ class Torus:
         """
         return self.__class__(state=num*self.state,  T=self.T, L=self.L, S=self.S, statetype=self.statetype)
 
+    def __imul__(self, num):
+        """ In-place scalar multiplication
+
+        Parameters
+        ----------
+        num : float
+            Scalar value to multiply by.
+        """
+        state = self._mutable_state()
+        np.multiply(state, num, out=state)
+        return self
+
     def __truediv__(self, num):
         """ Scalar multiplication
 
@@ -157,6 +274,18 @@ class Torus:
         """
         return self.__class__(state=self.state / num, T=self.T, L=self.L, S=self.S, statetype=self.statetype)
 
+    def __itruediv__(self, num):
+        """ In-place scalar division
+
+        Parameters
+        ----------
+        num : float
+            Scalar value to division by.
+        """
+        state = self._mutable_state()
+        np.divide(state, num, out=state)
+        return self
+
     def __floordiv__(self, num):
         """ Scalar multiplication
 
@@ -200,6 +329,57 @@ class Torus:
         """ Vector which completely specifies the Torus """
         return np.concatenate((self.state.reshape(-1, 1), [[float(self.T)]], [[float(self.L)]]), axis=0)
 
+    def axpy(self, alpha, other):
+        """ In-place update self = self + alpha * other, of both the state and the parameters.
+
+        Parameters
+        ----------
+        alpha : float
+            Multiplicative factor of other.
+        other : Torus
+            Represents the values to increment by, typically an optimization correction.
+
+        Returns
+        -------
+        Torus
+            self, whose state and parameters have been incremented.
+
+        Notes
+        -----
+        No arrays are allocated; the state is updated within its own buffer. The spatial shift is not a
+        variable of Torus, hence only the periods are incremented.
+        """
+        if alpha != 0:
+            (self.lazy() + alpha * other.lazy()).evaluate(out=self)
+            self.T = self.T + alpha * other.T
+            self.L = self.L + alpha * other.L
+        return self
+
+    def block_preconditioner(self, fixedparams=(False, False), side='left', advection=0., absolute=True):
+        """ Preconditioner which exactly inverts the linear terms, including the time and space derivatives
+
+        Parameters
+        ----------
+        fixedparams : tuple of bool
+            Whether or not each parameter is fixed, see Torus.matvec.
+        side : str
+            Takes values 'left' or 'right'; right preconditioners include the parameters.
+        advection : float
+            The velocity of a (frozen) mean flow whose advection term is included in the linear terms.
+        absolute : bool
+            Whether to use q_k^2 + q_k^4 and the magnitude of the advection by the state instead of the linear
+            spatial terms q_k^4 - q_k^2, see BlockPreconditioner.
+
+        Returns
+        -------
+        BlockPreconditioner :
+            Preconditioner which couples the real and imaginary components of each mode, usable wherever
+            Torus.preconditioner is. The same preconditioner is used by passing preconditioning='block'.
+
+        """
+        return BlockPreconditioner(self.linearize(fixedparams=fixedparams), side=side, advection=advection,
+                                   absolute=absolute)
+
     def check_if_equilibrium_or_zero(self):
         """ Check whether the Torus converged to an equilibrium or close-to-zero solution """
         # Take the L_2 norm of the field, if uniformly close to zero, the magnitude will be very small.
@@ -252,37 +432,67 @@ class Torus:
         converted_torus : Torus or Torus subclass instance
             The class instance in the new basis.
         """
-        if to == 'field':
-            if self.statetype == 's_modes':
-                converted_torus = self.space_ifft()
-            elif self.statetype == 'modes':
-                converted_torus = self.spacetime_ifft()
-            else:
-                converted_torus = self
-        elif to == 's_modes':
-            if self.statetype == 'field':
-                converted_torus = self.space_fft()
-            elif self.statetype == 'modes':
-                converted_torus = self.time_ifft()
-            else:
-                converted_torus = self
-        elif to == 'modes':
-            if self.statetype == 's_modes':
-                converted_torus = self.time_fft()
-            elif self.statetype == 'field':
-                converted_torus = self.spacetime_fft()
-            else:
-                converted_torus = self
-        else:
+        if to not in ['field', 's_modes', 'modes']:
             raise ValueError('Trying to convert to unrecognizable state type.')
+        elif to == self.statetype:
+            converted_torus = self
+        elif to in self._bases:
+            converted_torus = self.__class__(state=self._bases[to], statetype=to, T=self.T, L=self.L, S=self.S)
+            converted_torus._memoized_by = self._bases
+        else:
+            if to == 'field':
+                if self.statetype == 's_modes':
+                    converted_torus = self.space_ifft()
+                else:
+                    # Go through the spatial modes so that they are memoized as well.
+                    converted_torus = self.convert(to='s_modes').space_ifft()
+                _count_transform('space_ifft')
+            elif to == 's_modes':
+                if self.statetype == 'field':
+                    converted_torus = self.space_fft()
+                    _count_transform('space_fft')
+                else:
+                    converted_torus = self.time_ifft()
+                    _count_transform('time_ifft')
+            else:
+                if self.statetype == 's_modes':
+                    converted_torus = self.time_fft()
+                else:
+                    converted_torus = self.convert(to='s_modes').time_fft()
+                _count_transform('time_fft')
+            self._bases[to] = converted_torus.state
+            converted_torus._memoized_by = self._bases
 
         if inplace:
             self.state = converted_torus.state
             self.statetype = to
+            self._memoized_by = converted_torus._memoized_by
             return self
         else:
             return converted_torus
 
+    def copy(self, out=None):
+        """ Copy of the current torus which does not share memory with self
+
+        Parameters
+        ----------
+        out : Torus
+            Preallocated Torus of the same class and shape to copy into. If None, a new Torus is created.
+
+        Returns
+        -------
+        Torus :
+            Torus with a copy of the current state and the same parameters; see Torus.view for
+            the version which shares the state.
+        """
+        if out is None:
+            return self.__class__(state=self.state.copy(), statetype=self.statetype, T=self.T, L=self.L, S=self.S)
+        else:
+            np.copyto(out._mutable_state(), self.state)
+            out.statetype = self.statetype
+            out.T, out.L, out.S = self.T, self.L, self.S
+            return out
+
     def dot(self, other):
         """ Return the L_2 inner product of two 2-tori
 
@@ -291,7 +501,7 @@ class Torus:
         float :
             The value of self * other via L_2 inner product.
         """
-        return float(np.dot(self.state.reshape(1, -1), other.state.reshape(-1, 1)))
+        return float(np.dot(self.state.ravel(), other.state.ravel()))
 
     def dt(self, order=1):
         """ A time derivative of the current state.
@@ -475,6 +685,47 @@ class Torus:
         """ This is a placeholder for the subclasses """
         return self
 
+    def hessvec(self, other, fixedparams=(False, False), out=None, linearization=None, mapping=None):
+        """ Matrix-vector product of a vector with the Hessian of the cost function at the current state.
+
+        Parameters
+        ----------
+        other : Torus
+            Torus instance whose state represents the vector in the matrix-vector multiplication.
+        fixedparams : tuple of bool
+            Determines whether to include period and spatial period
+            as variables.
+        out : Torus
+            Preallocated Torus to write the product into; if None a new Torus is returned.
+        linearization : Linearization
+            The linearization of the current state, see Torus.linearize.
+        mapping : Torus
+            The spatiotemporal mapping of the current state, if it has already been computed.
+
+        Returns
+        -------
+        Torus :
+            Torus whose state and parameters are the product of the Hessian of R = 1/2 ||F||^2 with other.
+
+        Notes
+        -----
+        The Hessian is J^T J + sum_i F_i D^2 F_i. The only second derivative of the spatiotemporal mapping with
+        respect to the state is that of the quadratic nonlinearity, 1/2 (u^2)_x, whose contraction with F and v is
+        -v * F_x; this is the derivative of the adjoint nonlinear term -u * F_x and it is computed pseudospectrally
+        in the same manner. The second derivatives with respect to the parameters are not included, i.e. the
+        rows and columns of the free parameters are those of the Gauss-Newton approximation J^T J. The products
+        are not preconditioned; with fixed parameters the result is the directional derivative of the gradient
+        J^T F computed by rmatvec.
+        """
+        if linearization is None:
+            linearization = self.linearize(fixedparams=fixedparams)
+        if mapping is None:
+            mapping = self.spatiotemporal_mapping()
+        # The second order term is computed first in case the product is written into the vector itself.
+        second_order = other.convert(to='field').rpseudospectral(mapping, linearization.qk_matrix).state
+        hessvec_torus = self.normal_matvec(other, preconditioning=False, out=out, linearization=linearization)
+        return (hessvec_torus.lazy() + TorusExpression([(1.0, second_order)], self)).evaluate(out=hessvec_torus)
+
     def increment(self, other, stepsize=1):
         """ Add optimization correction  to current state
 
@@ -490,10 +741,9 @@ class Torus:
         Torus
             New Torus which results from adding an optimization correction to self.
         """
-        return self.__class__(state=self.state+stepsize*other.state,
-                              T=self.T+stepsize*other.T, L=self.L+stepsize*other.L)
+        return self.copy().axpy(stepsize, other)
 
-    def jac(self, fixedparams=(False, False)):
+    def jac(self, fixedparams=(False, False), threads=None):
         """ Jacobian matrix evaluated at the current state.
 
         Parameters
@@ -501,13 +751,29 @@ class Torus:
         fixedparams : tuple of bools
             Determines whether to include period and spatial period
             as variables.
+        threads : int
+            If provided, the columns of the Jacobian are computed as Jacobian-vector products with unit vectors by
+            this many threads, see torihunter.assembly.assemble_jacobian; otherwise the Jacobian is composed from
+            the dense Fourier transform matrices.
 
         Returns
         -------
         jac_ : matrix ((N-1)*(M-2), (N-1)*(M-2) + n_params)
             Jacobian matrix of the KSe where n_params = 2 - sum(fixedparams)
 
+        Notes
+        -----
+        The columns are independent and the Fourier transforms of each product release the GIL, hence the
+        assembly from products scales with the number of threads; it also avoids the O(n^3) products of the
+        transform matrices. The pseudospectral term couples every mode to every other, so the Jacobian is dense
+        and no coloring (grouping of structurally orthogonal columns) recovers several columns from one product.
+        The assembly module is only imported when threads is provided, as it supports HDF5 storage.
+
         """
+        if threads is not None:
+            from torihunter.assembly import assemble_jacobian
+            return assemble_jacobian(self, fixedparams=fixedparams, threads=threads).storage
+
         # The Jacobian components for the spatiotemporal Fourier modes
         jac_ = self.jac_lin() + self.jac_nonlin()
 
@@ -565,7 +831,82 @@ class Torus:
         """ L_2 norm between two sets of spatiotemporal states"""
         return np.linalg.norm(self.state.ravel() - other.state.ravel())
 
-    def matvec(self, other, fixedparams=(False, False), preconditioning=True):
+    def lazy(self):
+        """ Lazily evaluated version of the current state
+
+        Returns
+        -------
+        TorusExpression :
+            Expression whose arithmetic is deferred until TorusExpression.evaluate is called, which computes
+            the result in a single pass into one (optionally preallocated) output buffer.
+
+        Examples
+        --------
+        >>> corrected_torus = (torus.lazy() - 0.5 * gradient_torus.lazy()).evaluate(out=torus)
+        """
+        return TorusExpression([(1.0, self.state)], self)
+
+    def linearize(self, fixedparams=(False, False)):
+        """ Precompute the components of Jacobian-vector products which only depend on the current state
+
+        Parameters
+        ----------
+        fixedparams : tuple of bool
+            Determines whether to include period and spatial period
+            as variables.
+
+        Returns
+        -------
+        Linearization :
+            The linearization of the spatiotemporal mapping at the current state, to be passed to matvec and rmatvec.
+
+        Notes
+        -----
+        The columns of the Jacobian with respect to the parameters are dF/dT = -1/T u_t and
+        dF/dL = -2/L u_xx - 4/L u_xxxx - 1/L (0.5 (u^2)_x).
+        """
+        wj_matrix = self.elementwise_dt()
+        qk_matrix = self.elementwise_dx()
+        field_torus = self.convert(to='field')
+        parameter_columns = {}
+        if not fixedparams[0]:
+            dt_self = swap_modes(np.multiply(wj_matrix, self.state), dimension='time')
+            parameter_columns['T'] = (-1.0 / self.T) * dt_self
+
+        if not fixedparams[1]:
+            d2x_self = np.multiply(-1.0*qk_matrix**2, self.state)
+            d4x_self = np.multiply(qk_matrix**4, self.state)
+            dfdl_nonlinear = field_torus.pseudospectral(field_torus, qk_matrix).state
+            parameter_columns['L'] = TorusExpression([(-2.0/self.L, d2x_self), (-4.0/self.L, d4x_self),
+                                                      (-1.0/self.L, dfdl_nonlinear)], self).evaluate(out=d2x_self).state
+
+        p_matrix = 1.0 / (np.abs(wj_matrix) + qk_matrix**2 + qk_matrix**4)
+        return Linearization(self, fixedparams, field_torus, wj_matrix, qk_matrix, p_matrix, parameter_columns)
+
+    def mapping_components(self):
+        """ The terms of the spatiotemporal mapping, whose coefficients only depend on the parameters
+
+        Returns
+        -------
+        dict :
+            The states of u_t, u_xx, u_xxxx and 1/2 (u^2)_x, in the spatiotemporal mode basis, keyed by 'dt', 'd2x',
+            'd4x' and 'nonlinear'; their sum is the spatiotemporal mapping.
+
+        Notes
+        -----
+        The derivatives scale with the inverse of the period T and the spatial period L: for the same modes, the
+        terms at other parameters are (T_0/T) u_t, (L_0/L)^2 u_xx, (L_0/L)^4 u_xxxx and (L_0/L) 1/2 (u^2)_x.
+        See torihunter.scan.ParameterScan.
+        """
+        wj_matrix = self.elementwise_dt()
+        qk_matrix = self.elementwise_dx()
+        field_torus = self.convert(to='field')
+        return {'dt': swap_modes(np.multiply(wj_matrix, self.state), dimension='time'),
+                'd2x': np.multiply(-1.0*qk_matrix**2, self.state),
+                'd4x': np.multiply(qk_matrix**4, self.state),
+                'nonlinear': field_torus.pseudospectral(field_torus, qk_matrix).state}
+
+    def matvec(self, other, fixedparams=(False, False), preconditioning=True, out=None, linearization=None):
         """ Matrix-vector product of a vector with the Jacobian of the current state.
 
         Parameters
@@ -575,8 +916,13 @@ class Torus:
         fixedparams : tuple of bool
             Determines whether to include period and spatial period
             as variables.
-        preconditioning : bool
-            Whether or not to apply (left) preconditioning P (Ax)
+        preconditioning : bool or Preconditioner
+            Whether or not to apply (left) preconditioning P (Ax); a Preconditioner is used instead of the default.
+        out : Torus
+            Preallocated Torus to write the product into; if None a new Torus is returned.
+        linearization : Linearization
+            The linearization of the current state, see Torus.linearize. If provided, its fixedparams are used
+            and the terms which only depend on the current state are not recomputed.
 
         Returns
         -------
@@ -588,45 +934,46 @@ class Torus:
         Equivalent to computation of v_t + v_xx + v_xxxx + d_x (u .* v)
 
         """
-        # Create elementwise frequency matrices for the derivatives
-        wj_matrix = self.elementwise_dt()
-        qk_matrix = self.elementwise_dx()
-        elementwise_qk2 = -1.0*qk_matrix**2
-        elementwise_qk4 = qk_matrix**4
+        if linearization is None:
+            linearization = self.linearize(fixedparams=fixedparams)
 
         # Compute the derivatives
-        dt = swap_modes(np.multiply(wj_matrix, other.state), dimension='time')
-        d2x = np.multiply(elementwise_qk2, other.state)
-        d4x = np.multiply(elementwise_qk4, other.state)
-
-        # Add up linear derivatives
-        linear_term = dt + d2x + d4x
-        linear_torus = self.__class__(state=linear_term, statetype='modes', T=self.T, L=self.L)
+        dt = swap_modes(np.multiply(linearization.wj_matrix, other.state), dimension='time')
+        d2x = np.multiply(linearization.elementwise_qk2, other.state)
+        d4x = np.multiply(linearization.elementwise_qk4, other.state)
+
+        # The terms of the product are accumulated lazily and evaluated in a single pass into one array.
+        nonlinear = linearization.field_torus.pseudospectral(other, linearization.qk_matrix).state
+        matvec_terms = [(1.0, dt), (1.0, d2x), (1.0, d4x), (2.0, nonlinear)]
+        # The products of the partial derivatives with respect to the parameters with the vector's parameters.
+        # These are typically incremental values dT, dL.
+        matvec_terms.extend([(getattr(other, parameter), column)
+                             for parameter, column in linearization.parameter_columns.items()])
 
-        # Compute nonlinear term
-        field_torus = self.convert(to='field')
-        matvec_torus = linear_torus + 2 * field_torus.pseudospectral(other, qk_matrix)
-        if not fixedparams[0]:
-            # Compute the product of the partial derivative with respect to T with the vector's value of T.
-            # This is typically an incremental value dT.
-            matvec_torus.state = matvec_torus.state + other.T * (-1.0 / self.T) * dt
+        # This is equivalent to LEFT preconditioning.
+        preconditioner = linearization.preconditioner(preconditioning)
+        if preconditioner is None:
+            return TorusExpression(matvec_terms, self).evaluate(out=out)
+        matvec_torus = TorusExpression(matvec_terms, self).evaluate(out=out, multiplier=preconditioner.elementwise)
+        return preconditioner.complete(matvec_torus)
 
-        if not fixedparams[1]:
-            # Compute the product of the partial derivative with respect to L with the vector's value of L.
-            # This is typically an incremental value dL.
-            d2x_self = np.multiply(elementwise_qk2, self.state)
-            d4x_self = np.multiply(elementwise_qk4, self.state)
-            dfdl_linear = (-2.0/self.L)*d2x_self + (-4.0/self.L)*d4x_self
-            dfdl_nonlinear = (-1.0/self.L) * field_torus.pseudospectral(field_torus, qk_matrix).state
-            dfdl = dfdl_linear + dfdl_nonlinear
-            matvec_torus.state = matvec_torus.state + other.L*dfdl
+    def mode_norms(self):
+        """ The squared norms of the fields of the individual spatiotemporal modes
 
-        # This is equivalent to LEFT preconditioning.
-        if preconditioning:
-            p_matrix = 1.0 / (np.abs(wj_matrix) + qk_matrix**2 + qk_matrix**4)
-            matvec_torus.state = np.multiply(matvec_torus.state, p_matrix)
+        Returns
+        -------
+        ndarray :
+            Array with the shape of the modes, the diagonal of A^T A for the inverse space-time transform A.
 
-        return matvec_torus
+        Notes
+        -----
+        With the orthonormal scaling of the real FFTs, the cosine and sine modes of each nonzero frequency have
+        squared norm 2 in each dimension; only the first row of modes, of zero temporal frequency, has squared
+        norm 2 instead of 4.
+        """
+        norms = np.full(self.mode_shape, 4.0)
+        norms[0, :] = 2.0
+        return norms
 
     def mode_padding(self, size, dimension='space'):
         """ Increase the size of the discretization via zero-padding
@@ -691,6 +1038,52 @@ class Torus:
             truncated_modes = np.concatenate((first_half, second_half), axis=1)
         return self.__class__(state=truncated_modes, statetype=self.statetype, T=self.T, L=self.L, S=self.S)
 
+    def normal_matvec(self, other, fixedparams=(False, False), preconditioning=True, out=None, linearization=None):
+        """ Matrix-vector product of a vector with the normal matrix J^T J of the current state.
+
+        Parameters
+        ----------
+        other : Torus
+            Torus instance whose state represents the vector in the matrix-vector multiplication.
+        fixedparams : tuple of bool
+            Determines whether to include period and spatial period
+            as variables.
+        preconditioning : bool or Preconditioner
+            Whether or not to use the normal matrix of the right preconditioned Jacobian, P^T J^T J P; a
+            Preconditioner is used instead of the default (right) preconditioner.
+        out : Torus
+            Preallocated Torus to write the product into; if None a new Torus is returned.
+        linearization : Linearization
+            The linearization of the current state, see Torus.linearize.
+
+        Returns
+        -------
+        Torus :
+            Torus whose state and parameters are the product, equal to self.rmatvec(self.matvec(other)) without
+            preconditioning.
+
+        Notes
+        -----
+        Intended for the inner iterations of normal equation solvers (CGNR, LSQR). The field of the current state
+        and the parameter derivatives are only computed once and shared by both products; the intermediate
+        product J v is written into the output buffer. The product is symmetric positive semi-definite with or
+        without preconditioning, as conjugate gradient methods require; a left preconditioner would instead
+        yield P_r J^T P_l J, which is neither.
+        """
+        if linearization is None:
+            linearization = self.linearize(fixedparams=fixedparams)
+        preconditioner = linearization.preconditioner(preconditioning, side='right')
+        if preconditioner is not None:
+            preconditioned = preconditioner.apply(other)
+            # rmatvec scales the parameters by the preconditioner regardless of its side, so does its transpose.
+            for parameter, scaling in preconditioner.scalings.items():
+                setattr(preconditioned, parameter, scaling * getattr(other, parameter))
+            other = preconditioned
+        matvec_torus = self.matvec(other, preconditioning=False, out=out, linearization=linearization)
+        preconditioning = preconditioner if preconditioner is not None else False
+        return self.rmatvec(matvec_torus, preconditioning=preconditioning, out=matvec_torus,
+                            linearization=linearization)
+
     def parameter_dependent_filename(self, extension='.h5', decimals=3):
 
         Lsplit = str(self.L).split('.')
@@ -709,131 +1102,17 @@ class Torus:
     def plot(self, show=True, save=False, padding=True, fundamental_domain=True, **kwargs):
         """ Plot the velocity field as a 2-d density plot using matplotlib's imshow
 
-        Parameters
-        ----------
-        show : bool
-            Whether or not to display the figure
-        save : bool
-            Whether to save the figure
-        padding : bool
-            Whether to interpolate with zero padding before plotting. (Increases the effective resolution).
-        fundamental_domain : bool
-            Whether to plot only the fundamental domain or not.
-        **kwargs :
-            newN : int
-                Even integer for the new discretization size in time
-            newM : int
-                Even integer for the new discretization size in space.
-            filename : str
-                The save name of the figure, if save==True
-            directory : str
-                The location to save to, if save==True
+        See Also
+        --------
+        torihunter.plotting.plot : for the description of the arguments.
+
         Notes
         -----
-        newN and newM are accessed via .get() because this is the only manner in which to incorporate
-        the current N and M values as defaults.
+        Imported on first use so that processes which only evaluate the equations never import matplotlib.
 
         """
-        plt.rc('text', usetex=True)
-        plt.rc('font', family='serif')
-        plt.rcParams.update({'font.size': 16})
-        verbose = kwargs.get('verbose', False)
-
-        if padding:
-            pad_n, pad_m = kwargs.get('newN', 16*self.N), kwargs.get('newM', 16*self.M)
-            plot_torus_tmp = rediscretize(self, newN=pad_n, newM=pad_m)
-        else:
-            plot_torus_tmp = self
-
-        # The following creates custom tick labels and accounts for some pathological cases
-        # where the period is too small (only a single label) or too large (many labels, overlapping due
-        # to font size) Default label tick size is 10 for time and the fundamental frequency, 2 pi sqrt(2) for space.
-        if fundamental_domain:
-            torus_to_plot = plot_torus_tmp.to_fundamental_domain().convert(to='field')
-        else:
-            torus_to_plot = plot_torus_tmp.convert(to='field')
-
-        if torus_to_plot.T != 0:
-            timetick_step = np.min([10, 10 * (2**(int(np.log10(torus_to_plot.T))))])
-            yticks = np.arange(timetick_step, torus_to_plot.T, timetick_step)
-            ylabels = np.array([str(int(y)) for y in yticks])
-        else:
-            torus_to_plot.T = 1
-            yticks = np.array([0, torus_to_plot.T])
-            ylabels = np.array(['0', 'inf'])
-
-        if torus_to_plot.L > 2*pi:
-            xticks = np.arange(0, torus_to_plot.L, 2*pi)
-            xlabels = [str(int(x/(2*pi))) for x in xticks]
-        elif torus_to_plot.L > pi:
-            xticks = np.arange(0, torus_to_plot.L, pi)
-            xlabels = [str(int(x/pi)) for x in xticks]
-        else:
-            torus_to_plot.L = 1
-            xticks = np.array([0, torus_to_plot.L])
-            xlabels = np.array(['0', 'inf'])
-
-        # Modify the size so that relative sizes between different figures is approximately representative
-        # of the different sizes; helps with side-by-side comparison.
-        _figsize = (max([2, 2**np.log10(torus_to_plot.L)]), max([2, 2**np.log10(torus_to_plot.T)]))
-
-        fig, ax = plt.subplots(figsize=_figsize)
-        # plot the field
-        image = ax.imshow(torus_to_plot.state, extent=[0, torus_to_plot.L, 0, torus_to_plot.T], cmap='jet')
-        # Include custom ticks and tick labels
-        ax.set_xticks(xticks)
-        ax.set_yticks(yticks)
-        ax.set_xticklabels(xlabels, fontsize=12)
-        ax.set_yticklabels(ylabels, fontsize=12)
-        ax.grid(True, linestyle=':', color='k', alpha=0.8)
-        fig.subplots_adjust(right=0.9)
-        divider = make_axes_locatable(ax)
-        cax = divider.append_axes('right', size=0.1, pad=0.02)
-
-        # Custom colorbar values
-        maxu = np.max(torus_to_plot.state.ravel())
-        minu = np.min(torus_to_plot.state.ravel())
-        plt.colorbar(image, cax=cax, ticks=[round(minu, 1) + 0.1, round(maxu, 1)-0.1])
-        plt.tight_layout()
-
-        if save:
-            filename = kwargs.get('filename', None)
-            directory = kwargs.get('directory', '')
-
-            # Create save name if one doesn't exist.
-            if filename is None:
-                filename = self.parameter_dependent_filename(extension='.png')
-            elif filename.endswith('.h5'):
-                filename = filename.split('.h5')[0] + '.png'
-
-            # Create save directory if one doesn't exist.
-            if directory is None:
-                pass
-            else:
-                if directory == 'default':
-                    directory = os.path.join(os.path.abspath(os.path.join(os.getcwd(), '../figs/')), '')
-                elif directory == '':
-                    pass
-                elif not os.path.isdir(directory):
-                    warnings.warn('Trying to save figure to a directory that does not exist:' + directory, Warning)
-                    sys.stdout.flush()
-                    proceed = input('Would you like to create this directory? [y]/[n]')
-                    if proceed == 'y':
-                        os.mkdir(directory)
-                    else:
-                        directory = ''
-
-                filename = os.path.join(directory, filename)
-            if verbose:
-                print('Saving figure to {}'.format(filename))
-            plt.savefig(filename, bbox_inches='tight', pad_inches=0)
-
-        if show:
-            plt.show()
-        else:
-            plt.close()
-
-        return None
+        from torihunter.plotting import plot
+        return plot(self, show=show, save=save, padding=padding, fundamental_domain=fundamental_domain, **kwargs)
 
     def precondition(self, target, fixedparams=(False, False)):
         """ Precondition a vector with the inverse (aboslute value) of linear spatial terms
@@ -864,38 +1143,26 @@ class Torus:
         return target
 
     def preconditioner(self, fixedparams=(False, False), side='left'):
-        """ Preconditioning matrix
+        """ Preconditioner equal to the inverse of the absolute value of the linear terms
 
         Parameters
         ----------
-        fixedparams : (bool, bool)
-            Whether or not period T or spatial period L are fixed.
+        fixedparams : tuple of bool
+            Whether or not each parameter is fixed, see Torus.matvec.
         side : str
             Takes values 'left' or 'right'. This is an accomodation for
-            the typically rectangular Jacobian matrix.
+            the typically rectangular Jacobian matrix; right preconditioners include the parameters.
 
         Returns
         -------
-        matrix :
-            Preconditioning matrix
+        Preconditioner :
+            Diagonal preconditioner which stores only its diagonal, usable as a scipy LinearOperator.
 
         """
         # Preconditioner is the inverse of the aboslute value of the linear spatial derivative operators.
         qk_matrix = self.elementwise_dx()
-        ptmp = 1 / (np.abs(self.elementwise_dt()) + qk_matrix**2 + qk_matrix**4)
-        p = ptmp.ravel()
-        parameters = []
-        # If including parameters, need an extra diagonal matrix to account for this (right-side preconditioning)
-        if side == 'right':
-            if not fixedparams[0]:
-                parameters.append(1 / self.T)
-            if not fixedparams[1]:
-                parameters.append(1 / (self.L**4))
-            parameters = np.array(parameters).reshape(1, -1)
-            p_row = np.concatenate((p.reshape(1, -1), parameters.reshape(1, -1)), axis=1)
-            return np.tile(p_row, (p.size, 1))
-        else:
-            return np.tile(p.reshape(-1, 1), (1, p.size+(2-sum(fixedparams))))
+        p_matrix = 1 / (np.abs(self.elementwise_dt()) + qk_matrix**2 + qk_matrix**4)
+        return Preconditioner(p_matrix, parameter_scalings(self, fixedparams), side=side)
 
     def pseudospectral(self, other, qk_matrix):
         """ Pseudospectral computation of the nonlinear term of the Kuramoto-Sivashinsky equation
@@ -938,14 +1205,18 @@ class Torus:
         -----
         The pseudospectral product is the name given to the elementwise product equivalent to the
         convolution of spatiotemporal Fourier modes. It's faster and more accurate hence why it is used.
-        The matrix vector product takes the form -1 * u * d_x v. The spatial frequency matrix is passed to avoid
+        The matrix vector product takes the form -1 * u * d_x v, with the adjoint transforms in place of the
+        transforms, see spacetime_fft_adjoint. The spatial frequency matrix is passed to avoid
         redundant function calls, improving speed.
 
         """
-        # Take spatial derivative
-        other.state = swap_modes(np.multiply(qk_matrix, other.convert(to='modes').state))
-        # Elementwise product
-        return -1.0 * self.convert(to='field').statemul(other.convert(to='field')).convert(to='modes')
+        # Take spatial derivative; a new instance so that the vector itself is left unchanged.
+        other_dx = other.convert(to='modes')
+        other_dx = other_dx.__class__(state=swap_modes(np.multiply(qk_matrix, other_dx.state)),
+                                      T=other_dx.T, L=other_dx.L, S=other_dx.S)
+        # The transpose of d_x F (u .* A v) is -A^T (u .* F^T d_x w); the transforms are not orthogonal.
+        product = self.convert(to='field').statemul(other_dx.spacetime_fft_adjoint())
+        return -1.0 * product.spacetime_ifft_adjoint()
 
     def random_initial_condition(self, T, L, **kwargs):
         """ Initial a set of random spatiotemporal Fourier modes
@@ -1044,7 +1315,7 @@ class Torus:
         """
         return 0.5 * np.linalg.norm(self.convert(to='modes').spatiotemporal_mapping().state.ravel())**2
 
-    def rmatvec(self, other, fixedparams=(False, False), preconditioning=True):
+    def rmatvec(self, other, fixedparams=(False, False), preconditioning=True, out=None, linearization=None):
         """ Matrix-vector product with the adjoint of the Jacobian
 
         Parameters
@@ -1053,8 +1324,14 @@ class Torus:
             Torus whose state represents the vector in the matrix-vector product.
         fixedparams : (bool, bool)
             Whether or not period T or spatial period L are fixed.
-        preconditioning : bool
-            Whether or not to apply (left) preconditioning to the adjoint matrix vector product.
+        preconditioning : bool or Preconditioner
+            Whether or not to apply (left) preconditioning to the adjoint matrix vector product; a Preconditioner
+            is used instead of the default.
+        out : Torus
+            Preallocated Torus to write the product into; if None a new Torus is returned.
+        linearization : Linearization
+            The linearization of the current state, see Torus.linearize. If provided, its fixedparams are used
+            and the terms which only depend on the current state are not recomputed.
 
         Returns
         -------
@@ -1062,47 +1339,32 @@ class Torus:
             Torus with values representative of the adjoint-vector product A^H * x.
 
         """
+        if linearization is None:
+            linearization = self.linearize(fixedparams=fixedparams)
 
         # Linear component of the product, equal to -v_t + v_xx + v_xxxx
-        wj_matrix = self.elementwise_dt()
-        qk_matrix = self.elementwise_dx()
-        elementwise_qk2 = -1.0*qk_matrix**2
-        elementwise_qk4 = qk_matrix**4
-
-        dt = swap_modes(np.multiply(wj_matrix, other.state), dimension='time')
-        d2x = np.multiply(elementwise_qk2, other.state)
-        d4x = np.multiply(elementwise_qk4, other.state)
-        linear_component = -1.0*dt + d2x + d4x
-        linear_torus = self.__class__(state=linear_component, T=self.T, L=self.L, S=self.S)
+        dt = swap_modes(np.multiply(linearization.wj_matrix, other.state), dimension='time')
+        d2x = np.multiply(linearization.elementwise_qk2, other.state)
+        d4x = np.multiply(linearization.elementwise_qk4, other.state)
 
         # Nonlinear component, equal to -u * v_x
-        field_torus = self.convert(to='field')
-        rmatvec_torus = linear_torus + field_torus.rpseudospectral(other, qk_matrix)
-
-        if not fixedparams[0]:
-            # Derivative with respect to T term equal to DF/DT * v
-            dt_self = swap_modes(np.multiply(wj_matrix, self.state), dimension='time')
-            dfdt = (-1.0 / self.T)*dt_self
-            rmatvec_torus.T = np.dot(dfdt.ravel(), other.state.ravel())
-
-        if not fixedparams[1]:
-            # Derivative with respect to L equal to DF/DL * v
-            d2x_self = np.multiply(elementwise_qk2, self.state)
-            d4x_self = np.multiply(elementwise_qk4, self.state)
-            dfdl_linear = ((-2.0/self.L)*d2x_self + (-4.0/self.L)*d4x_self)
-            dfdl_nonlinear = (-1.0/self.L) * field_torus.pseudospectral(field_torus, qk_matrix).state
-            dfdl = dfdl_linear + dfdl_nonlinear
-            rmatvec_torus.L = np.dot(dfdl.ravel(), other.state.ravel())
-
-        if preconditioning:
-            # Apply left preconditioning
-            p_matrix = 1.0 / (np.abs(wj_matrix) + qk_matrix**2 + qk_matrix**4)
-            rmatvec_torus.state = np.multiply(rmatvec_torus.state, p_matrix)
-
-            if not fixedparams[0]:
-                rmatvec_torus.T = rmatvec_torus.T / self.T
-            if not fixedparams[1]:
-                rmatvec_torus.L = rmatvec_torus.L/(self.L**4)
+        nonlinear = linearization.field_torus.rpseudospectral(other, linearization.qk_matrix).state
+        rmatvec_terms = [(-1.0, dt), (1.0, d2x), (1.0, d4x), (1.0, nonlinear)]
+
+        # The parameter components, DF/DT * v and DF/DL * v, are computed first in case the product is written
+        # into the vector itself.
+        rmatvec_parameters = {parameter: np.dot(column.ravel(), other.state.ravel())
+                              for parameter, column in linearization.parameter_columns.items()}
+
+        # Apply preconditioning, including the scalings of the parameters.
+        preconditioner = linearization.preconditioner(preconditioning, side='right')
+        p_matrix = preconditioner.elementwise if preconditioner is not None else None
+        rmatvec_torus = TorusExpression(rmatvec_terms, self).evaluate(out=out, multiplier=p_matrix)
+        if preconditioner is not None:
+            preconditioner.complete(rmatvec_torus, transpose=True)
+        scalings = preconditioner.scalings if preconditioner is not None else {}
+        for parameter, value in rmatvec_parameters.items():
+            setattr(rmatvec_torus, parameter, scalings.get(parameter, 1.0) * value)
 
         return rmatvec_torus
 
@@ -1255,6 +1517,18 @@ class Torus:
         else:
             return self.__class__(state=field, statetype='field', T=self.T, L=self.L, S=self.S)
 
+    def space_fft_adjoint(self):
+        """ Adjoint of space_fft, mapping spatial modes to a field; each spatial mode has squared norm 2 """
+        return self.__class__(state=0.5 * self.state, statetype='s_modes', T=self.T, L=self.L,
+                              S=self.S).space_ifft()
+
+    def space_ifft_adjoint(self):
+        """ Adjoint of space_ifft, mapping a field to spatial modes """
+        adjoint_torus = self.space_fft()
+        adjoint_torus.state = 2.0 * adjoint_torus.state
+        return adjoint_torus
+
+    @_shape_cached
     def space_ifft_matrix(self):
         """ Inverse spatial Fourier transform operator
 
@@ -1273,6 +1547,7 @@ class Torus:
         space_idft_mat = np.concatenate((idft_mat_real, idft_mat_imag), axis=1)
         return np.kron(np.eye(self.N), space_idft_mat)
 
+    @_shape_cached
     def space_fft_matrix(self):
         """ Spatial Fourier transform operator
 
@@ -1331,6 +1606,38 @@ class Torus:
             # Return transform of field
             return self.space_fft().time_fft()
 
+    def spacetime_fft_adjoint(self):
+        """ Adjoint (transpose) of the space-time Fourier transform
+
+        Returns
+        -------
+        Torus :
+            Torus instance in the physical field basis, whose state is F^T applied to the current modes.
+
+        Notes
+        -----
+        The transforms are not orthogonal: the fields of distinct modes are orthogonal, but their squared norms
+        are given by mode_norms. Hence the forward transform is F = G^{-1} A^T, with A the inverse transform and
+        G = A^T A = diag(mode_norms), and its adjoint is F^T = A G^{-1}. Required by adjoint products such as
+        rpseudospectral, which would otherwise not be the transposes of the corresponding products.
+        """
+        return self.time_fft_adjoint().space_fft_adjoint()
+
+    def spacetime_ifft_adjoint(self):
+        """ Adjoint (transpose) of the inverse space-time Fourier transform
+
+        Returns
+        -------
+        Torus :
+            Torus instance in the spatiotemporal mode basis, whose state is A^T applied to the current field.
+
+        Notes
+        -----
+        With the notation of spacetime_fft_adjoint, A^T = G F.
+        """
+        return self.space_ifft_adjoint().time_ifft_adjoint()
+
+    @_shape_cached
     def spacetime_ifft_matrix(self):
         """ Inverse Space-time Fourier transform operator
 
@@ -1345,6 +1652,7 @@ class Torus:
         """
         return np.dot(self.space_ifft_matrix(), self.time_ifft_matrix())
 
+    @_shape_cached
     def spacetime_fft_matrix(self):
         """ Space-time Fourier transform operator
 
@@ -1374,13 +1682,14 @@ class Torus:
         wj_matrix = self.elementwise_dt()
         qk_matrix = self.elementwise_dx()
         elementwise_d2xd4x = -1.0*qk_matrix**2 + qk_matrix**4
-        linear_component = (np.multiply(elementwise_d2xd4x, self.state)
-                            + swap_modes(np.multiply(wj_matrix, self.state), dimension='time'))
-        linear_torus = self.__class__(state=linear_component)
+        d2xd4x = np.multiply(elementwise_d2xd4x, self.state)
+        dt = swap_modes(np.multiply(wj_matrix, self.state), dimension='time')
 
         # Convert state information to field inplace; derivative operation switches this back to modes?
         field_torus = self.convert(to='field')
-        mapping_torus = linear_torus + field_torus.pseudospectral(field_torus, qk_matrix)
+        nonlinear = field_torus.pseudospectral(field_torus, qk_matrix).state
+        # Sum the components in a single pass, reusing the array of the first component as the output.
+        mapping_torus = TorusExpression([(1.0, d2xd4x), (1.0, dt), (1.0, nonlinear)], self).evaluate(out=d2xd4x)
 
         return mapping_torus
 
@@ -1456,6 +1765,23 @@ class Torus:
         else:
             return self.__class__(state=space_modes, statetype='s_modes', T=self.T, L=self.L, S=self.S)
 
+    def time_fft_adjoint(self):
+        """ Adjoint of time_fft, mapping spatiotemporal modes to spatial modes
+
+        Notes
+        -----
+        The modes of nonzero temporal frequency have squared norm 2, those of zero frequency 1, see mode_norms.
+        """
+        return self.__class__(state=np.divide(self.state, 0.5 * self.mode_norms()), statetype='modes', T=self.T,
+                              L=self.L, S=self.S).time_ifft()
+
+    def time_ifft_adjoint(self):
+        """ Adjoint of time_ifft, mapping spatial modes to spatiotemporal modes """
+        adjoint_torus = self.time_fft()
+        adjoint_torus.state = np.multiply(0.5 * self.mode_norms(), adjoint_torus.state)
+        return adjoint_torus
+
+    @_shape_cached
     def time_fft_matrix(self):
         """ Inverse Time Fourier transform operator
 
@@ -1473,6 +1799,7 @@ class Torus:
                                         dft_mat[1:-1, :].imag), axis=0)
         return np.kron(time_idft_mat, np.eye(self.M-2))
 
+    @_shape_cached
     def time_ifft_matrix(self):
         """ Time Fourier transform operator
 
@@ -1498,43 +1825,30 @@ class Torus:
     def to_h5(self, filename=None, directory='', verbose=False):
         """ Export current state information to HDF5 file
 
-        Parameters
-        ----------
-        filename : str
-            Name for the save file
-        directory :
-            Location to save at
-        verbose : If true, prints save messages to std out
-        """
-        if filename is None:
-            filename = self.parameter_dependent_filename()
-        elif filename == 'initial':
-            filename = 'initial_' + self.parameter_dependent_filename()
-
-        if directory == 'default':
-            directory = os.path.join(os.path.abspath(os.path.join(os.getcwd(), '../data/')), '')
-        elif directory == '':
-            pass
-        elif not os.path.isdir(directory):
-            warnings.warn('Trying to save figure to a directory that does not exist:' + directory, Warning)
-            sys.stdout.flush()
-            proceed = input('Would you like to create this directory? If no, '
-                            'then figure will save where current script is located [y]/[n]')
-            if proceed == 'y':
-                os.mkdir(directory)
-
-        filename = os.path.join(directory, filename)
-        if verbose:
-            print('Saving data to {}'.format(filename))
-        with h5py.File(filename, 'w') as f:
-            f.create_dataset("field", data=self.convert(to='field').state)
-            f.create_dataset("speriod", data=self.L)
-            f.create_dataset("period", data=self.T)
-            f.create_dataset("space_discretization", data=self.M)
-            f.create_dataset("time_discretization", data=self.N)
-            f.create_dataset("spatial_shift", data=self.S)
-            f.create_dataset("residual", data=float(self.residual()))
-        return None
+        See Also
+        --------
+        torihunter.io.to_h5 : for the description of the arguments.
+
+        Notes
+        -----
+        Imported on first use so that processes which only evaluate the equations never import h5py.
+
+        """
+        from torihunter.io import to_h5
+        return to_h5(self, filename=filename, directory=directory, verbose=verbose)
+
+    def view(self):
+        """ New Torus instance which shares the state of self
+
+        Returns
+        -------
+        Torus :
+            Torus with the same parameters whose state is the same array as self.state. In-place
+            operations on either instance are reflected in both; see Torus.copy for an independent copy.
+        """
+        view = self.__class__(state=self.state, statetype=self.statetype, T=self.T, L=self.L, S=self.S)
+        view._bases, view._memoized_by = self._bases, self._memoized_by
+        return view
 
     def wave_vector(self):
         """ Spatial frequency vector for the current state
@@ -1550,10 +1864,21 @@ class Torus:
 class RelativeTorus(Torus):
 
     def __init__(self, state=None, statetype='modes', T=0., L=0., S=0., **kwargs):
-        super().__init__(state=state, statetype=statetype, T=T, L=L, **kwargs)
+        super().__init__(state=state, statetype=statetype, T=T, L=L, S=S, **kwargs)
 
         self.comoving_frame = 'comoving'
 
+    def axpy(self, alpha, other):
+        """ Extension of parent method which also increments the spatial shift """
+        super().axpy(alpha, other)
+        self.S = self.S + alpha * other.S
+        return self
+
+    def block_preconditioner(self, fixedparams=(False, False, False), side='left', advection=0., absolute=True):
+        """ Overwrite of parent method; the co-moving term is included in the advection """
+        return super().block_preconditioner(fixedparams=fixedparams, side=side, advection=advection,
+                                            absolute=absolute)
+
     def calculate_shift(self):
         """ Calculate the phase difference between the spatial modes at t=0 and t=T """
         s_modes = self.convert(inplace=False, to='s_modes')
@@ -1613,25 +1938,7 @@ class RelativeTorus(Torus):
     def from_fundamental_domain(self, inplace=False):
         return self.comoving_transformation(inplace=inplace)
 
-    def increment(self, other, stepsize=1):
-        """ Add optimization correction to current state
-
-        Parameters
-        ----------
-        other : RelativeTorus
-            Represents the values to increment by.
-        stepsize : float
-            Multiplicative factor which decides the step length of the correction.
-
-        Returns
-        -------
-        RelativeTorus :
-            New Torus which results from adding an optimization correction to self.
-        """
-        return self.__class__(state=self.state+stepsize*other.state,
-                              T=self.T+stepsize*other.T, L=self.L+stepsize*other.L, S=self.S+stepsize*other.S)
-
-    def jac(self, fixedparams=(False, False, False)):
+    def jac(self, fixedparams=(False, False, False), threads=None):
         """ Jacobian that includes the spatial translation term for relative periodic tori
 
         Parameters
@@ -1639,19 +1946,29 @@ class RelativeTorus(Torus):
         fixedparams : (bool, bool, bool)
             Determines whether or not the various parameters, period, spatial period, spatial shift, (T,L,S)
             are variables or not.
+        threads : int
+            If provided, the Jacobian is assembled from Jacobian-vector products by this many threads, see
+            Torus.jac.
 
         Returns
         -------
         matrix :
             Jacobian matrix for relative periodic tori.
         """
+        if threads is not None:
+            from torihunter.assembly import assemble_jacobian
+            return assemble_jacobian(self, fixedparams=fixedparams, threads=threads).storage
+
         # The linearization matrix of the governing equations.
         jac_ = self.jac_lin() + self.jac_nonlin()
+        # The co-moving term, -S/T u_x, also depends on T and L; see RelativeTorus.linearize.
+        dx = swap_modes(np.multiply(self.elementwise_dx(), self.state), dimension='space')
+        s_self = (-1.0 * self.S / self.T) * dx
 
         # If period is not fixed, need to include dF/dT for changes to period.
         if not fixedparams[0]:
             dt = swap_modes(np.multiply(self.elementwise_dt(), self.state), dimension='time')
-            dfdt = (-1.0 / self.T)*dt.reshape(1, -1)
+            dfdt = (-1.0 / self.T)*(dt + s_self)
             jac_ = np.concatenate((jac_, dfdt.reshape(-1, 1)), axis=1)
 
         # If period is not fixed, need to include dF/dL for changes to period.
@@ -1662,12 +1979,11 @@ class RelativeTorus(Torus):
             d4x = np.multiply(qk_matrix**4, self.state)
             dfdl_linear = (-2.0/self.L)*d2x+(-4.0/self.L)*d4x
             dfdl_nonlinear = - 1.0/self.L * field_torus.pseudospectral(field_torus, qk_matrix).state
-            dfdl = dfdl_linear + dfdl_nonlinear
+            dfdl = dfdl_linear + dfdl_nonlinear + (-1.0 / self.L) * s_self
             jac_ = np.concatenate((jac_, dfdl.reshape(-1, 1)), axis=1)
 
         if not fixedparams[2]:
-            dfds = swap_modes(np.multiply(self.elementwise_dx(), self.state), dimension='space')
-            jac_ = np.concatenate((jac_, (-1.0 / self.T) * dfds.reshape(-1, 1)), axis=1)
+            jac_ = np.concatenate((jac_, (-1.0 / self.T) * dx.reshape(-1, 1)), axis=1)
 
         return jac_
 
@@ -1677,9 +1993,60 @@ class RelativeTorus(Torus):
 
     def spatiotemporal_mapping(self):
         """ Extension of Torus method to include co-moving frame term. """
-        return super().spatiotemporal_mapping() + self.comoving_mapping_component()
+        mapping_torus = super().spatiotemporal_mapping()
+        return (mapping_torus.lazy() + self.comoving_mapping_component().lazy()).evaluate(out=mapping_torus)
+
+    def linearize(self, fixedparams=(False, False, False)):
+        """ Extension of parent method which includes the co-moving frame term and the spatial shift
+
+        Parameters
+        ----------
+        fixedparams : (bool, bool, bool)
+            Determines whether or not the various parameters, period, spatial period, spatial shift, (T,L,S)
+            are variables or not.
+
+        Returns
+        -------
+        Linearization :
+            The linearization of the spatiotemporal mapping at the current state, to be passed to matvec and rmatvec.
+
+        Notes
+        -----
+        The co-moving term -S/T u_x contributes -1/T (-S/T u_x) and -1/L (-S/T u_x) to the derivatives with respect
+        to T and L, respectively. The derivative with respect to S is -1/T u_x.
+        """
+        linearization = super().linearize(fixedparams=fixedparams)
+        parameter_columns = linearization.parameter_columns
+        if not all(fixedparams):
+            dx_self = swap_modes(np.multiply(linearization.qk_matrix, self.state))
+            s_self = (-1.0 * self.S / self.T) * dx_self
+
+        if not fixedparams[0]:
+            # dfdt = (-1.0 / self.T)*(dt_self+s_self)
+            np.add(parameter_columns['T'], (-1.0 / self.T) * s_self, out=parameter_columns['T'])
+
+        if not fixedparams[1]:
+            np.add(parameter_columns['L'], (-1.0 / self.L) * s_self, out=parameter_columns['L'])
+
+        if not fixedparams[2]:
+            parameter_columns['S'] = (-1.0 / self.T) * dx_self
 
-    def matvec(self, other, fixedparams=(False, False, False), preconditioning=True, **kwargs):
+        return linearization
+
+    def mapping_components(self):
+        """ Extension of parent method which includes u_x, the co-moving term without its coefficient -S/T
+
+        Notes
+        -----
+        The co-moving term -(S/T) u_x is a multiple of the component keyed by 'dx'; at other parameters it is
+        -(S/T) (L_0/L) u_x.
+        """
+        components = super().mapping_components()
+        components['dx'] = swap_modes(np.multiply(self.elementwise_dx(), self.state))
+        return components
+
+    def matvec(self, other, fixedparams=(False, False, False), preconditioning=True, out=None, linearization=None,
+               **kwargs):
         """ Extension of parent class method
 
         Parameters
@@ -1689,8 +2056,12 @@ class RelativeTorus(Torus):
         fixedparams : tuple of bool
             Determines whether to include period and spatial period
             as variables.
-        preconditioning : bool
-            Whether or not to apply (left) preconditioning P (Ax)
+        preconditioning : bool or Preconditioner
+            Whether or not to apply (left) preconditioning P (Ax); a Preconditioner is used instead of the default.
+        out : RelativeTorus
+            Preallocated Torus to write the product into; if None a new Torus is returned.
+        linearization : Linearization
+            The linearization of the current state, see RelativeTorus.linearize.
 
         Returns
         -------
@@ -1703,99 +2074,65 @@ class RelativeTorus(Torus):
         The reason for all of the repeated code is that the co-moving terms re-use the same matrices
         as the other terms; this prevents additional function calls.
         """
-        wj_matrix = self.elementwise_dt()
-        qk_matrix = self.elementwise_dx()
-        elementwise_qk2 = -1.0*qk_matrix**2
-        elementwise_qk4 = qk_matrix**4
-
-        dt = swap_modes(np.multiply(wj_matrix, other.state), dimension='time')
-        d2x = np.multiply(elementwise_qk2, other.state)
-        d4x = np.multiply(elementwise_qk4, other.state)
-        s = -1.0 * (self.S / self.T)*swap_modes(np.multiply(qk_matrix, other.state))
-
-        linear_term = dt + d2x + d4x + s
-        linear_torus = self.__class__(state=linear_term, statetype='modes', T=self.T, L=self.L, S=self.S)
-
-        field_torus = self.convert(to='field')
-        # Convert state information to field inplace; derivative operation switches this back to modes?
-        matvec_torus = linear_torus + 2 * field_torus.pseudospectral(other, qk_matrix)
-
-        if not fixedparams[0]:
-            dt_self = swap_modes(np.multiply(wj_matrix, self.state), dimension='time')
-            s_self = (-1.0 * self.S / self.T)*swap_modes(np.multiply(qk_matrix, self.state))
-            dfdt = (-1.0 / self.T)*(dt_self+s_self)
-            matvec_torus.state = matvec_torus.state + other.T*dfdt
-
-        if not fixedparams[1]:
-            d2x_self = np.multiply(elementwise_qk2, self.state)
-            d4x_self = np.multiply(elementwise_qk4, self.state)
-            s_self = (-1.0 * self.S / self.T)*swap_modes(np.multiply(qk_matrix, self.state))
-            dfdl_linear = (-2.0/self.L)*d2x_self + (-4.0/self.L)*d4x_self + (-1.0/self.L)*s_self
-            dfdl_nonlinear = (-1.0/self.L) * field_torus.pseudospectral(field_torus, qk_matrix).state
-            dfdl = dfdl_linear + dfdl_nonlinear
-            # Derivative of mapping with respect to T is the same as -1/T * u_t
-            matvec_torus.state = matvec_torus.state + other.L*dfdl
+        if linearization is None:
+            linearization = self.linearize(fixedparams=fixedparams)
 
-        if not fixedparams[2]:
-            matvec_torus.state = (matvec_torus.state
-                                  + other.S*(-1.0 / self.T)*swap_modes(np.multiply(qk_matrix, self.state)))
+        dt = swap_modes(np.multiply(linearization.wj_matrix, other.state), dimension='time')
+        d2x = np.multiply(linearization.elementwise_qk2, other.state)
+        d4x = np.multiply(linearization.elementwise_qk4, other.state)
+        dx = swap_modes(np.multiply(linearization.qk_matrix, other.state))
 
-        if preconditioning:
-            p_matrix = 1.0 / (np.abs(wj_matrix) + qk_matrix**2 + qk_matrix**4)
-            matvec_torus.state = np.multiply(matvec_torus.state, p_matrix)
+        nonlinear = linearization.field_torus.pseudospectral(other, linearization.qk_matrix).state
+        # The terms of the product are accumulated lazily and evaluated in a single pass into one array.
+        matvec_terms = [(1.0, dt), (1.0, d2x), (1.0, d4x), (-1.0 * (self.S / self.T), dx), (2.0, nonlinear)]
+        matvec_terms.extend([(getattr(other, parameter), column)
+                             for parameter, column in linearization.parameter_columns.items()])
 
-        return matvec_torus
+        preconditioner = linearization.preconditioner(preconditioning)
+        if preconditioner is None:
+            return TorusExpression(matvec_terms, self).evaluate(out=out)
+        matvec_torus = TorusExpression(matvec_terms, self).evaluate(out=out, multiplier=preconditioner.elementwise)
+        return preconditioner.complete(matvec_torus)
 
-    def rmatvec(self, other, fixedparams=(False, False, False), preconditioning=True, **kwargs):
+    def rmatvec(self, other, fixedparams=(False, False, False), preconditioning=True, out=None, linearization=None,
+                **kwargs):
         """ Extension of the parent method to RelativeTorus """
         # For specific computation of the linear component instead
         # of arbitrary derivatives we can optimize the calculation by being specific.
-        wj_matrix = self.elementwise_dt()
-        qk_matrix = self.elementwise_dx()
-        elementwise_qk2 = -1.0*qk_matrix**2
-        elementwise_qk4 = qk_matrix**4
-
-        dt = -1.0 * swap_modes(np.multiply(wj_matrix, other.state), dimension='time')
-        d2x = np.multiply(elementwise_qk2, other.state)
-        d4x = np.multiply(elementwise_qk4, other.state)
-        s = (self.S / self.T)*swap_modes(np.multiply(qk_matrix, other.state))
-        linear_component = dt + d2x + d4x + s
-        linear_torus = self.__class__(state=linear_component)
-        field_torus = self.convert(to='field')
-        rmatvec_torus = linear_torus + field_torus.rpseudospectral(other, qk_matrix)
+        if linearization is None:
+            linearization = self.linearize(fixedparams=fixedparams)
+
+        dt = swap_modes(np.multiply(linearization.wj_matrix, other.state), dimension='time')
+        d2x = np.multiply(linearization.elementwise_qk2, other.state)
+        d4x = np.multiply(linearization.elementwise_qk4, other.state)
+        dx = swap_modes(np.multiply(linearization.qk_matrix, other.state))
+        nonlinear = linearization.field_torus.rpseudospectral(other, linearization.qk_matrix).state
+        rmatvec_terms = [(-1.0, dt), (1.0, d2x), (1.0, d4x), (self.S / self.T, dx), (1.0, nonlinear)]
+
+        # The parameter components are computed first, in case the product is written into the vector itself.
+        rmatvec_parameters = {parameter: np.dot(column.ravel(), other.state.ravel())
+                              for parameter, column in linearization.parameter_columns.items()}
+
+        preconditioner = linearization.preconditioner(preconditioning, side='right')
+        p_matrix = preconditioner.elementwise if preconditioner is not None else None
+        rmatvec_torus = TorusExpression(rmatvec_terms, self).evaluate(out=out, multiplier=p_matrix)
+        if preconditioner is not None:
+            preconditioner.complete(rmatvec_torus, transpose=True)
+        scalings = preconditioner.scalings if preconditioner is not None else {}
+        for parameter, value in rmatvec_parameters.items():
+            setattr(rmatvec_torus, parameter, scalings.get(parameter, 1.0) * value)
 
-        if not fixedparams[0]:
-            dt_self = swap_modes(np.multiply(wj_matrix, self.state), dimension='time')
-            s_self = (-1.0 * self.S / self.T)*swap_modes(np.multiply(qk_matrix, self.state))
-            dfdt = (-1.0 / self.T)*(dt_self+s_self)
-            rmatvec_torus.T = np.dot(dfdt.ravel(), other.state.ravel())
-
-        if not fixedparams[1]:
-            d2x_self = np.multiply(elementwise_qk2, self.state)
-            d4x_self = np.multiply(elementwise_qk4, self.state)
-            s_self = (-1.0 * self.S / self.T)*swap_modes(np.multiply(qk_matrix, self.state))
-            dfdl_linear = (-2.0/self.L)*d2x_self + (-4.0/self.L)*d4x_self + (-1.0/self.L)*s_self
-            dfdl_nonlinear = (-1.0/self.L) * field_torus.pseudospectral(field_torus, qk_matrix).state
-            dfdl = dfdl_linear + dfdl_nonlinear
-
-            # Derivative of mapping with respect to T is the same as -1/T * u_t
-            rmatvec_torus.L = np.dot(dfdl.ravel(), other.state.ravel())
-
-        if not fixedparams[2]:
-            rmatvec_torus.S = ((-1.0 / self.T)
-                               * np.dot(swap_modes(np.multiply(qk_matrix, self.state)).ravel(), other.state.ravel()))
-
-        if preconditioning:
-            p_matrix = 1.0 / (np.abs(wj_matrix) + qk_matrix**2 + qk_matrix**4)
-            rmatvec_torus.state = np.multiply(rmatvec_torus.state, p_matrix)
+        return rmatvec_torus
 
-            if not fixedparams[0]:
-                rmatvec_torus.T = rmatvec_torus.T / self.T
+    def hessvec(self, other, fixedparams=(False, False, False), out=None, linearization=None, mapping=None):
+        """ Extension of parent method which includes the spatial shift, see Torus.hessvec """
+        return super().hessvec(other, fixedparams=fixedparams, out=out, linearization=linearization, mapping=mapping)
 
-            if not fixedparams[1]:
-                rmatvec_torus.L = rmatvec_torus.L / (self.L**4)
-
-        return rmatvec_torus
+    def normal_matvec(self, other, fixedparams=(False, False, False), preconditioning=True, out=None,
+                      linearization=None):
+        """ Extension of parent method which includes the spatial shift, see Torus.normal_matvec """
+        return super().normal_matvec(other, fixedparams=fixedparams, preconditioning=preconditioning, out=out,
+                                     linearization=linearization)
 
     def random_initial_condition(self):
         """ Extension of parent modes to include spatial-shift initialization """
@@ -1843,9 +2180,6 @@ class ShiftReflectionTorus(Torus):
         except ValueError:
             print('Incompatible type provided for field or modes: 2-D NumPy arrays only')
 
-    def __copy__(self):
-        return self.__class__(state=self.state, T=self.T, L=self.L, S=self.S)
-
     def dx(self, order=1):
         """ Overwrite of parent method """
         qkn = self.wave_vector()**order
@@ -1923,9 +2257,12 @@ class ShiftReflectionTorus(Torus):
         """ Overwrite of parent method """
         s_mode_qk_matrix = np.concatenate((qk_matrix, -1.0*qk_matrix), axis=1)
         s_mode_qk_matrix = np.concatenate((s_mode_qk_matrix, s_mode_qk_matrix[0, :].reshape(1, -1)), axis=0)
-        other_dx = other.convert(to='s_modes')
+        # The transpose of the derivative in the spatial mode basis is its negative; the transforms are not
+        # orthogonal, hence their adjoints are used, see spacetime_fft_adjoint.
+        other_dx = other.convert(to='modes').time_fft_adjoint()
         other_dx.state = swap_modes(np.multiply(s_mode_qk_matrix, other_dx.state))
-        return -1.0*self.convert(to='field').statemul(other_dx.convert(to='field')).convert(to='modes')
+        product = self.convert(to='field').statemul(other_dx.space_fft_adjoint())
+        return -1.0 * product.space_ifft_adjoint().time_ifft_adjoint()
 
     def random_initial_condition(self, T, L, **kwargs):
         """ Initial a set of random spatiotemporal Fourier modes
@@ -2051,6 +2388,7 @@ class ShiftReflectionTorus(Torus):
         else:
             return self.__class__(state=space_modes, statetype='s_modes', T=self.T, L=self.L, S=self.S)
 
+    @_shape_cached
     def time_fft_matrix(self):
         """
 
@@ -2079,12 +2417,13 @@ class ShiftReflectionTorus(Torus):
         ab_transform_formatter[-self.n+1::2, 1::2] = 1
         ab_transform_formatter[-self.n::2, ::2] = 1
         
-        full_dft_mat = rfft(np.eye(self.M), norm='ortho', axis=0)
+        full_dft_mat = rfft(np.eye(self.N), norm='ortho', axis=0)
         time_dft_mat = np.concatenate((full_dft_mat[:-1, :].real, full_dft_mat[1:-1, :].imag), axis=0)
         ab_time_dft_matrix = np.insert(time_dft_mat, np.arange(time_dft_mat.shape[1]), time_dft_mat, axis=1)
         full_time_fft_matrix = np.kron(ab_time_dft_matrix*ab_transform_formatter, np.eye(self.m))
         return full_time_fft_matrix
 
+    @_shape_cached
     def time_ifft_matrix(self):
         """ Overwrite of parent method """
         
@@ -2104,6 +2443,32 @@ class ShiftReflectionTorus(Torus):
                                         np.eye(self.mode_shape[1]))
         return full_time_ifft_matrix
 
+    def time_fft_adjoint(self):
+        """ Overwrite of parent method; time_fft adds the two halves of the spatial modes
+
+        Notes
+        -----
+        The transform is that of Torus followed by the sum of the (cosine, sine) halves of the spatial modes,
+        hence its adjoint duplicates the modes before applying the adjoint of the transform of Torus.
+        """
+        full_modes = Torus(state=np.concatenate((self.state, self.state), axis=1), statetype='modes', T=self.T,
+                           L=self.L)
+        return self.__class__(state=full_modes.time_fft_adjoint().state, statetype='s_modes', T=self.T, L=self.L)
+
+    def time_ifft_adjoint(self):
+        """ Overwrite of parent method; time_ifft places each mode into a single half of the spatial modes
+
+        Notes
+        -----
+        The modes of odd temporal frequency are cosine modes in space, those of even frequency sine modes; the
+        adjoint applies the adjoint of the inverse transform of Torus and selects the corresponding half.
+        """
+        full_modes = Torus(state=self.state, statetype='s_modes', T=self.T, L=self.L).time_ifft_adjoint().state
+        frequencies = np.concatenate((np.arange(self.N // 2), np.arange(1, self.N // 2)))
+        odd = (np.mod(frequencies, 2) == 1).reshape(-1, 1)
+        modes = np.where(odd, full_modes[:, :self.m], full_modes[:, self.m:])
+        return self.__class__(state=modes, statetype='modes', T=self.T, L=self.L)
+
     def to_fundamental_domain(self, half='bottom'):
         """ Overwrite of parent method """
         field = self.convert(to='field').state
@@ -2140,9 +2505,6 @@ class AntisymmetricTorus(Torus):
         except ValueError:
             print('Incompatible type provided for field or modes: 2-D NumPy arrays only')
 
-    def __copy__(self):
-        return self.__class__(state=self.state, T=self.T, L=self.L, S=self.S)
-
     def dx(self, order=1):
         """ Overwrite of parent method """
         qkn = self.wave_vector()**order
@@ -2224,9 +2586,12 @@ class AntisymmetricTorus(Torus):
         """ Overwrite of parent method """
         s_mode_qk_matrix = np.concatenate((qk_matrix, -1.0*qk_matrix), axis=1)
         s_mode_qk_matrix = np.concatenate((s_mode_qk_matrix, s_mode_qk_matrix[0, :].reshape(1, -1)), axis=0)
-        other_dx = other.convert(to='s_modes')
+        # The transpose of the derivative in the spatial mode basis is its negative; the transforms are not
+        # orthogonal, hence their adjoints are used, see spacetime_fft_adjoint.
+        other_dx = other.convert(to='modes').time_fft_adjoint()
         other_dx.state = swap_modes(np.multiply(s_mode_qk_matrix, other_dx.state))
-        return -1.0*self.convert(to='field').statemul(other_dx.convert(to='field')).convert(to='modes')
+        product = self.convert(to='field').statemul(other_dx.space_fft_adjoint())
+        return -1.0 * product.space_ifft_adjoint().time_ifft_adjoint()
 
     def random_initial_condition(self, T, L, **kwargs):
         """ Initial a set of random spatiotemporal Fourier modes
@@ -2291,6 +2656,7 @@ class AntisymmetricTorus(Torus):
         self.convert(to='modes', inplace=True)
         return self
 
+    @_shape_cached
     def time_fft_matrix(self):
         """ Inverse Time Fourier transform operator
 
@@ -2312,6 +2678,7 @@ class AntisymmetricTorus(Torus):
                                     axis=1)
         return np.kron(ab_time_dft_mat, np.eye(self.m))
 
+    @_shape_cached
     def time_ifft_matrix(self):
         """ Time Fourier transform operator
 
@@ -2429,13 +2796,15 @@ class EquilibriumTorus(AntisymmetricTorus):
         self.T = 0.
         self.S = 0.
 
-    def __copy__(self):
-        return self.__class__(state=self.state, T=self.T, L=self.L, S=self.S)
-
     def state_vector(self):
         """ Overwrite of parent method """
         return np.concatenate((self.state.reshape(-1, 1), [[float(self.L)]]), axis=0)
 
+    def block_preconditioner(self, fixedparams=False, side='left', advection=0., absolute=True):
+        """ Overwrite of parent method; equilibria have no time derivative """
+        return super().block_preconditioner(fixedparams=fixedparams, side=side, advection=advection,
+                                            absolute=absolute)
+
     def dx(self, order=1):
         """ Overwrite of parent method """
         qkn = self.wave_vector()**order
@@ -2482,6 +2851,61 @@ class EquilibriumTorus(AntisymmetricTorus):
             full_field = np.concatenate((self.reflection().state, self.state), axis=1)
         return self.__class__(state=full_field, statetype='field', L=2.0*self.L)
 
+    def jac(self, fixedparams=False, threads=None):
+        """ Overwrite of parent method; equilibria have no time derivative and only the spatial period as parameter
+
+        Notes
+        -----
+        The dense transform matrices of the parent method do not apply to the single instant in time of an
+        equilibrium, hence the Jacobian is always assembled from Jacobian-vector products, see Torus.jac.
+        """
+        from torihunter.assembly import assemble_jacobian
+        return assemble_jacobian(self, fixedparams=fixedparams, threads=threads or 1).storage
+
+    def linearize(self, fixedparams=False):
+        """ Overwrite of parent method; the spatial period is the only parameter """
+        qk_matrix = self.elementwise_dx()
+        field_torus = self.convert(to='field')
+        parameter_columns = {}
+        if not fixedparams:
+            d2x_self = np.multiply(-1.0*qk_matrix**2, self.state)
+            d4x_self = np.multiply(qk_matrix**4, self.state)
+            dfdl_nonlinear = field_torus.pseudospectral(field_torus, qk_matrix).state
+            parameter_columns['L'] = TorusExpression([(-2.0/self.L, d2x_self), (-4.0/self.L, d4x_self),
+                                                      (-1.0/self.L, dfdl_nonlinear)], self).evaluate(out=d2x_self).state
+
+        p_matrix = 1.0 / (qk_matrix**2 + qk_matrix**4)
+        return Linearization(self, fixedparams, field_torus, None, qk_matrix, p_matrix, parameter_columns)
+
+    def mapping_components(self):
+        """ Overwrite of parent method; equilibria have no time derivative """
+        qk_matrix = self.elementwise_dx()
+        field_torus = self.convert(to='field')
+        return {'d2x': np.multiply(-1.0*qk_matrix**2, self.state),
+                'd4x': np.multiply(qk_matrix**4, self.state),
+                'nonlinear': field_torus.pseudospectral(field_torus, qk_matrix).state}
+
+    def matvec(self, other, fixedparams=False, preconditioning=True, out=None, linearization=None, **kwargs):
+        """ Overwrite of parent method; equilibria have no time dependence """
+        if linearization is None:
+            linearization = self.linearize(fixedparams=fixedparams)
+        d2x = np.multiply(linearization.elementwise_qk2, other.state)
+        d4x = np.multiply(linearization.elementwise_qk4, other.state)
+        nonlinear = linearization.field_torus.pseudospectral(other, linearization.qk_matrix).state
+        matvec_terms = [(1.0, d2x), (1.0, d4x), (2.0, nonlinear)]
+        matvec_terms.extend([(getattr(other, parameter), column)
+                             for parameter, column in linearization.parameter_columns.items()])
+
+        preconditioner = linearization.preconditioner(preconditioning)
+        if preconditioner is None:
+            return TorusExpression(matvec_terms, self).evaluate(out=out)
+        matvec_torus = TorusExpression(matvec_terms, self).evaluate(out=out, multiplier=preconditioner.elementwise)
+        return preconditioner.complete(matvec_torus)
+
+    def mode_norms(self):
+        """ Overwrite of parent method; equilibria only have modes of zero temporal frequency """
+        return np.full(self.mode_shape, 2.0)
+
     def mode_padding(self, size, inplace=False, dimension='space'):
         """ Overwrite of parent method """
         if dimension == 'time':
@@ -2506,6 +2930,15 @@ class EquilibriumTorus(AntisymmetricTorus):
             truncated_modes = self.state[:, :truncate_number]
             return EquilibriumTorus(state=truncated_modes, statetype=self.statetype, L=self.L)
 
+    def hessvec(self, other, fixedparams=False, out=None, linearization=None, mapping=None):
+        """ Overwrite of parent method; the spatial period is the only parameter """
+        return super().hessvec(other, fixedparams=fixedparams, out=out, linearization=linearization, mapping=mapping)
+
+    def normal_matvec(self, other, fixedparams=False, preconditioning=True, out=None, linearization=None):
+        """ Overwrite of parent method; the spatial period is the only parameter """
+        return super().normal_matvec(other, fixedparams=fixedparams, preconditioning=preconditioning, out=out,
+                                     linearization=linearization)
+
     def precondition(self, current, fixedparams=True, **kwargs):
         """ Overwrite of parent method """
         qk_matrix = self.elementwise_dx()
@@ -2516,6 +2949,11 @@ class EquilibriumTorus(AntisymmetricTorus):
             current.L = current.L/(self.L**4)
         return current
 
+    def preconditioner(self, fixedparams=False, side='left'):
+        """ Overwrite of parent method; equilibria have no time derivative """
+        qk_matrix = self.elementwise_dx()
+        return Preconditioner(1.0 / (qk_matrix**2 + qk_matrix**4), parameter_scalings(self, fixedparams), side=side)
+
     def pseudospectral(self, other, qk_matrix):
         """ Overwrite of parent method """
         s_mode_qk_matrix = np.concatenate((qk_matrix, -1.0*qk_matrix), axis=1)
@@ -2583,39 +3021,35 @@ class EquilibriumTorus(AntisymmetricTorus):
         """ Overwrite of parent method """
         s_mode_qk_matrix = np.concatenate((qk_matrix, -1.0*qk_matrix), axis=1)
         s_mode_qk_matrix = np.concatenate((s_mode_qk_matrix, s_mode_qk_matrix[0, :].reshape(1, -1)), axis=0)
-        other_dx = other.convert(to='s_modes')
+        # The transpose of the derivative in the spatial mode basis is its negative; the transforms are not
+        # orthogonal, hence their adjoints are used, see spacetime_fft_adjoint.
+        other_dx = other.convert(to='modes').time_fft_adjoint()
         other_dx.state = swap_modes(np.multiply(s_mode_qk_matrix, other_dx.state))
-        return -1.0*self.convert(to='field').statemul(other_dx.convert(to='field')).convert(to='modes')
+        product = self.convert(to='field').statemul(other_dx.space_fft_adjoint())
+        return -1.0 * product.space_ifft_adjoint().time_ifft_adjoint()
 
-    def rmatvec(self, other, fixedparams=False, preconditioning=True, **kwargs):
+    def rmatvec(self, other, fixedparams=False, preconditioning=True, out=None, linearization=None, **kwargs):
         """ Overwrite of parent method """
         # For specific computation of the linear component instead
         # of arbitrary derivatives we can optimize the calculation by being specific.
-        qk_matrix = self.elementwise_dx()
-        elementwise_qk2 = -1.0*qk_matrix**2
-        elementwise_qk4 = qk_matrix**4
-        d2x = np.multiply(elementwise_qk2, other.state)
-        d4x = np.multiply(elementwise_qk4, other.state)
-        linear_component = d2x + d4x
-        linear_torus = self.__class__(state=linear_component, T=self.T, L=self.L, S=self.S)
-        field_torus = self.convert(to='field')
-
-        rmatvec_torus = linear_torus + field_torus.rpseudospectral(other, qk_matrix)
-
-        if not fixedparams:
-            d2x_self = np.multiply(elementwise_qk2, self.state)
-            d4x_self = np.multiply(elementwise_qk4, self.state)
-            dfdl_linear = ((-2.0/self.L)*d2x_self + (-4.0/self.L)*d4x_self)
-            dfdl_nonlinear = (-1.0/self.L) * field_torus.pseudospectral(field_torus, qk_matrix).state
-            dfdl = dfdl_linear + dfdl_nonlinear
-            rmatvec_torus.L = np.dot(dfdl.ravel(), other.state.ravel())
-
-        if preconditioning:
-            p_matrix = 1.0 / (qk_matrix**2 + qk_matrix**4)
-            rmatvec_torus.state = np.multiply(rmatvec_torus.state, p_matrix)
-
-            if not fixedparams:
-                rmatvec_torus.L = rmatvec_torus.L/(self.L**4)
+        if linearization is None:
+            linearization = self.linearize(fixedparams=fixedparams)
+        d2x = np.multiply(linearization.elementwise_qk2, other.state)
+        d4x = np.multiply(linearization.elementwise_qk4, other.state)
+        nonlinear = linearization.field_torus.rpseudospectral(other, linearization.qk_matrix).state
+        rmatvec_terms = [(1.0, d2x), (1.0, d4x), (1.0, nonlinear)]
+
+        rmatvec_parameters = {parameter: np.dot(column.ravel(), other.state.ravel())
+                              for parameter, column in linearization.parameter_columns.items()}
+
+        preconditioner = linearization.preconditioner(preconditioning, side='right')
+        p_matrix = preconditioner.elementwise if preconditioner is not None else None
+        rmatvec_torus = TorusExpression(rmatvec_terms, self).evaluate(out=out, multiplier=p_matrix)
+        if preconditioner is not None:
+            preconditioner.complete(rmatvec_torus, transpose=True)
+        scalings = preconditioner.scalings if preconditioner is not None else {}
+        for parameter, value in rmatvec_parameters.items():
+            setattr(rmatvec_torus, parameter, scalings.get(parameter, 1.0) * value)
 
         return rmatvec_torus
 
@@ -2626,27 +3060,31 @@ class EquilibriumTorus(AntisymmetricTorus):
         qk_matrix = self.elementwise_dx()
         elementwise_d2xd4x = -1.0*qk_matrix**2 + qk_matrix**4
         linear_component = np.multiply(elementwise_d2xd4x, self.state)
-        linear_torus = self.__class__(state=linear_component)
         # Convert state information to field inplace; derivative operation switches this back to modes?
         field_torus = self.convert(to='field')
-        mapping_torus = linear_torus + field_torus.pseudospectral(field_torus, qk_matrix)
+        nonlinear = field_torus.pseudospectral(field_torus, qk_matrix).state
+        mapping_torus = TorusExpression([(1.0, linear_component), (1.0, nonlinear)], self).evaluate(out=linear_component)
 
         return mapping_torus
 
+    @_shape_cached
     def time_ifft_matrix(self):
         """ Overwrite of parent method """
         return np.concatenate((0*np.eye(self.m), np.eye(self.m)), axis=0)
 
+    @_shape_cached
     def time_fft_matrix(self):
         """ Overwrite of parent method """
         return np.concatenate((0*np.eye(self.m), np.eye(self.m)), axis=1)
 
+    @_shape_cached
     def space_ifft_matrix(self):
         """ Overwrite of parent method """
         idft_imag = irfft(1j*np.eye(self.m), axis=0)[:, 1:-1]
         ab_idft = np.concatenate((0*idft_imag, idft_imag), axis=1)
         return ab_idft
 
+    @_shape_cached
     def space_fft_matrix(self):
         """ Overwrite of parent method """
         dft = rfft(np.eye(self.m), axis=0)[1:-1, :]
@@ -2676,6 +3114,17 @@ class EquilibriumTorus(AntisymmetricTorus):
         else:
             return EquilibriumTorus(state=spatial_modes, statetype='s_modes', L=self.L)
 
+    def space_fft_adjoint(self):
+        """ Overwrite of parent method; space_fft only transforms the last row of the field """
+        field = super().space_fft_adjoint().state
+        field[:-1, :] = 0.
+        return self.__class__(state=field, statetype='field', L=self.L)
+
+    def space_ifft_adjoint(self):
+        """ Overwrite of parent method; space_ifft repeats the same row for every instant in time """
+        row = self.__class__(state=self.state.sum(axis=0).reshape(1, -1), statetype='field', L=self.L)
+        return super(EquilibriumTorus, row).space_ifft_adjoint()
+
     def space_fft(self, inplace=False):
         """ Spatial Fourier transform
 
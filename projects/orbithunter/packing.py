@@ -0,0 +1,154 @@
+import numpy as np
+
+__all__ = ['TorusPacking']
+
+
+class TorusPacking:
+    """ Flat vector representation of tori for optimization routines which operate on 1-d arrays, e.g. scipy.optimize
+
+    Parameters
+    ----------
+    torus : Torus
+        The torus which determines the class, the shape of the state and the parameters of the packed vectors.
+    fixedparams : tuple of bool or bool
+        Whether or not each parameter is fixed, see Torus.matvec. Only the free parameters are packed.
+
+    Notes
+    -----
+    A packed vector is a flat array whose leading slice holds the spatiotemporal modes and whose tail holds
+    the free parameters, in the order T, L, S. Unpacking does not copy: the state of the unpacked torus is a view
+    of the leading slice. Likewise, the gradient and Hessian-vector products are written directly into the
+    leading slice of newly allocated flat arrays. The spatiotemporal mapping and the linearization are memoized
+    for the most recently unpacked point, such that objective, gradient and Hessian-vector products at the same
+    point share them. The callbacks assume that the arrays passed to them are not modified in place afterwards,
+    as is the case for scipy.optimize.minimize.
+
+    Examples
+    --------
+    >>> packing = TorusPacking(torus, fixedparams=(False, False))
+    >>> result = scipy.optimize.minimize(packing.objective, packing.pack(torus), jac=packing.gradient,
+    ...                                  hessp=packing.hessp, method='trust-ncg')
+    >>> minimized_torus = packing.unpack(result.x)
+    """
+
+    def __init__(self, torus, fixedparams):
+        self.template = torus.convert(to='modes')
+        self.fixedparams = fixedparams
+        if isinstance(fixedparams, bool):
+            # EquilibriumTorus only has a single parameter, its spatial period.
+            self.parameters = [] if fixedparams else ['L']
+        else:
+            self.parameters = [parameter for parameter, fixed in zip(['T', 'L', 'S'], fixedparams) if not fixed]
+        self.shape = self.template.state.shape
+        self.size = self.template.state.size + len(self.parameters)
+        self._x, self._torus, self._mapping, self._linearization = None, None, None, None
+
+    def __repr__(self):
+        return self.__class__.__name__ + '({}, {})'.format(self.template.__class__.__name__, self.size)
+
+    def gradient(self, x):
+        """ The gradient of the cost function, J^T F, at the packed point x
+
+        Returns
+        -------
+        ndarray :
+            Packed gradient; a new array, because optimizers may keep references to previous gradients.
+        """
+        torus = self.unpack(x)
+        gradient = np.empty(self.size)
+        gradient_torus = self._view(gradient)
+        linearization = self._linearize()
+        torus.rmatvec(self._mapping, preconditioning=False, out=gradient_torus, linearization=linearization)
+        return self.pack(gradient_torus, out=gradient)
+
+    def hessp(self, x, p):
+        """ The product of the Hessian of the cost function at the packed point x with the packed vector p """
+        torus = self.unpack(x)
+        linearization = self._linearize()
+        hessvec = np.empty(self.size)
+        hessvec_torus = self._view(hessvec)
+        torus.hessvec(self._view(p), out=hessvec_torus, linearization=linearization,
+                      mapping=self._mapping)
+        return self.pack(hessvec_torus, out=hessvec)
+
+    def mapping(self, x):
+        """ The spatiotemporal mapping at the packed point x, as a flat vector """
+        self.unpack(x)
+        return self._mapping.state.ravel()
+
+    def objective(self, x):
+        """ The value of the cost function, 1/2 ||F||^2, at the packed point x """
+        self.unpack(x)
+        return 0.5 * np.linalg.norm(self._mapping.state.ravel())**2
+
+    def pack(self, torus, out=None):
+        """ Flat vector which represents a torus
+
+        Parameters
+        ----------
+        torus : Torus
+            The torus to pack, in the spatiotemporal mode basis.
+        out : ndarray
+            Array to write the packed vector into; if its leading slice is already the state of the torus,
+            only the parameters are written.
+
+        Returns
+        -------
+        ndarray :
+            The packed vector.
+        """
+        if out is None:
+            out = np.empty(self.size)
+        state = out[:self.size - len(self.parameters)]
+        if not np.shares_memory(state, torus.state):
+            np.copyto(state, torus.state.ravel())
+        for index, parameter in enumerate(self.parameters, start=self.size - len(self.parameters)):
+            out[index] = getattr(torus, parameter)
+        return out
+
+    def unpack(self, x):
+        """ Torus which is represented by a packed point
+
+        Parameters
+        ----------
+        x : ndarray
+            The packed point.
+
+        Returns
+        -------
+        Torus :
+            Torus whose state is a view of the leading slice of a copy of x, which is kept by the packing; the
+            parameters which are not packed are equal to those of the template.
+
+        Notes
+        -----
+        The spatiotemporal mapping at x is computed and kept until a different point is unpacked. Points are
+        compared by value with the kept copy, as the optimizer may update x in place between calls.
+        """
+        if self._x is not None and np.array_equal(x, self._x):
+            return self._torus
+        self._x = np.array(x, dtype=float)
+        torus = self._view(self._x, point=True)
+        self._torus, self._linearization = torus, None
+        self._mapping = torus.spatiotemporal_mapping()
+        return torus
+
+    def _linearize(self):
+        """ The linearization at the most recently unpacked point """
+        if self._linearization is None:
+            self._linearization = self._torus.linearize(fixedparams=self.fixedparams)
+        return self._linearization
+
+    def _view(self, x, point=False):
+        """ Torus whose state is a view of the leading slice of x; unpacked parameters are zero unless x is a point """
+        template = self.template
+        state = x[:self.size - len(self.parameters)].reshape(self.shape)
+        torus = template.__class__(state=state, statetype='modes', T=template.T, L=template.L, S=template.S)
+        # Not every class accepts every parameter as a keyword.
+        if point:
+            torus.T, torus.L, torus.S = template.T, template.L, template.S
+        else:
+            torus.T, torus.L, torus.S = 0., 0., 0.
+        for index, parameter in enumerate(self.parameters, start=self.size - len(self.parameters)):
+            setattr(torus, parameter, float(x[index]))
+        return torus
@@ -0,0 +1,333 @@
+from math import pi
+from concurrent.futures import ProcessPoolExecutor
+from torihunter.discretization import rediscretize
+from mpl_toolkits.axes_grid1 import make_axes_locatable
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+import os
+import sys
+import warnings
+import numpy as np
+import matplotlib
+import matplotlib.image
+
+__all__ = ['plot', 'render', 'render_catalog']
+
+# Rediscretization factor and imshow interpolation for each rendering quality.
+_render_qualities = {'draft': (1, 'nearest'), 'standard': (4, 'bilinear'), 'high': (16, 'bicubic')}
+
+
+def plot(torus, show=True, save=False, padding=True, fundamental_domain=True, **kwargs):
+    """ Plot the velocity field as a 2-d density plot using matplotlib's imshow
+
+    Parameters
+    ----------
+    torus : Torus
+        The torus whose velocity field is plotted.
+    show : bool
+        Whether or not to display the figure
+    save : bool
+        Whether to save the figure
+    padding : bool
+        Whether to interpolate with zero padding before plotting. (Increases the effective resolution).
+    fundamental_domain : bool
+        Whether to plot only the fundamental domain or not.
+    **kwargs :
+        newN : int
+            Even integer for the new discretization size in time
+        newM : int
+            Even integer for the new discretization size in space.
+        filename : str
+            The save name of the figure, if save==True
+        directory : str
+            The location to save to, if save==True
+    Notes
+    -----
+    newN and newM are accessed via .get() because this is the only manner in which to incorporate
+    the current N and M values as defaults. The style settings only apply to this figure; the global
+    matplotlib rc parameters are left unchanged. For non-interactive rendering of many tori see render_catalog.
+
+    """
+    import matplotlib.pyplot as plt
+    verbose = kwargs.get('verbose', False)
+
+    if padding:
+        pad_n, pad_m = kwargs.get('newN', 16*torus.N), kwargs.get('newM', 16*torus.M)
+    else:
+        pad_n, pad_m = torus.N, torus.M
+    torus_to_plot = _torus_to_plot(torus, pad_n, pad_m, fundamental_domain)
+
+    with plt.rc_context({'text.usetex': True, 'font.family': 'serif', 'font.size': 16}):
+        fig, ax = plt.subplots(figsize=_figsize(torus_to_plot))
+        _draw_field(fig, ax, torus_to_plot)
+
+        if save:
+            filename = kwargs.get('filename', None)
+            directory = kwargs.get('directory', '')
+
+            # Create save name if one doesn't exist.
+            if filename is None:
+                filename = torus.parameter_dependent_filename(extension='.png')
+            elif filename.endswith('.h5'):
+                filename = filename.split('.h5')[0] + '.png'
+
+            # Create save directory if one doesn't exist.
+            if directory is None:
+                pass
+            else:
+                if directory == 'default':
+                    directory = os.path.join(os.path.abspath(os.path.join(os.getcwd(), '../figs/')), '')
+                elif directory == '':
+                    pass
+                elif not os.path.isdir(directory):
+                    warnings.warn('Trying to save figure to a directory that does not exist:' + directory, Warning)
+                    sys.stdout.flush()
+                    proceed = input('Would you like to create this directory? [y]/[n]')
+                    if proceed == 'y':
+                        os.mkdir(directory)
+                    else:
+                        directory = ''
+
+                filename = os.path.join(directory, filename)
+            if verbose:
+                print('Saving figure to {}'.format(filename))
+            fig.savefig(filename, bbox_inches='tight', pad_inches=0)
+
+        if show:
+            plt.show()
+        else:
+            plt.close(fig)
+
+    return None
+
+
+def render(torus, filename, quality='standard', fundamental_domain=True, dpi=100):
+    """ Render the velocity field to an image file without pyplot or any interactive backend
+
+    Parameters
+    ----------
+    torus : Torus
+        The torus whose velocity field is rendered.
+    filename : str
+        The file to save the figure to; the format is inferred from the extension.
+    quality : str
+        One of 'draft', 'standard' or 'high'; determines the rediscretization (1x, 4x or 16x the current
+        discretization) and the interpolation used by imshow. 'high' reproduces Torus.plot.
+    fundamental_domain : bool
+        Whether to render only the fundamental domain or not.
+    dpi : int
+        Resolution of the saved figure.
+
+    Returns
+    -------
+    ndarray :
+        The rendered velocity field, which can be reused to create a thumbnail.
+
+    Notes
+    -----
+    The figure is created directly on an Agg canvas; no global matplotlib state is read or modified and
+    LaTeX is not required, which makes this safe to call from worker processes.
+    """
+    factor, interpolation = _render_qualities[quality]
+    torus_to_plot = _torus_to_plot(torus, factor*torus.N, factor*torus.M, fundamental_domain)
+    fig = Figure(figsize=_figsize(torus_to_plot))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(1, 1, 1)
+    _draw_field(fig, ax, torus_to_plot, interpolation=interpolation)
+    fig.savefig(filename, bbox_inches='tight', pad_inches=0, dpi=dpi)
+    return torus_to_plot.state
+
+
+def render_catalog(catalog, directory, quality='standard', fundamental_domain=True, processes=None, dpi=100,
+                   thumbnails=True, thumbnail_shape=(96, 96), contact_sheets=True, contact_sheet_shape=(10, 10)):
+    """ Render a catalog of tori in parallel, with optional thumbnails and contact sheets
+
+    Parameters
+    ----------
+    catalog : iterable of Torus or str
+        The tori to render, or the names of HDF5 files they were exported to by Torus.to_h5.
+    directory : str
+        Where to save the figures; created if it does not exist. Thumbnails are saved to the subdirectory
+        'thumbnails'.
+    quality : str
+        One of 'draft', 'standard' or 'high', see render().
+    fundamental_domain : bool
+        Whether to render only the fundamental domain or not.
+    processes : int
+        The number of worker processes; defaults to the number of processors.
+    dpi : int
+        Resolution of the saved figures.
+    thumbnails : bool
+        Whether or not to save a thumbnail of each velocity field.
+    thumbnail_shape : (int, int)
+        The size of each thumbnail in pixels, (height, width).
+    contact_sheets : bool
+        Whether or not to tile the thumbnails into contact sheets.
+    contact_sheet_shape : (int, int)
+        The number of (rows, columns) of thumbnails on each contact sheet.
+
+    Returns
+    -------
+    list of str :
+        The filenames of the rendered figures, in the same order as the catalog.
+
+    Notes
+    -----
+    Each filename starts with the index of the torus in the catalog, followed by its class and periods (or the
+    name of its HDF5 file), so tori with equal or nearly equal parameters never share a figure or thumbnail.
+    Nothing is displayed and there are no prompts; figures overwrite existing files of the same name.
+    The contact sheets are written as they fill up, so only a single sheet of thumbnails is kept in memory.
+    """
+    os.makedirs(directory, exist_ok=True)
+    thumbnail_directory = os.path.join(directory, 'thumbnails')
+    if thumbnails:
+        os.makedirs(thumbnail_directory, exist_ok=True)
+
+    catalog = list(catalog)
+    jobs = []
+    for index, item in enumerate(catalog):
+        basename = _catalog_basename(index, item, len(str(max(len(catalog) - 1, 0))))
+        thumbnail_filename = os.path.join(thumbnail_directory, basename) if thumbnails else None
+        jobs.append((item, os.path.join(directory, basename), thumbnail_filename,
+                     quality, fundamental_domain, dpi, thumbnail_shape))
+
+    filenames = [job[1] for job in jobs]
+    n_rows, n_columns = contact_sheet_shape
+    sheet, sheet_number = [], 0
+    with ProcessPoolExecutor(max_workers=processes, initializer=_initialize_worker) as executor:
+        for thumbnail in executor.map(_render_job, jobs):
+            if not contact_sheets:
+                continue
+            sheet.append(thumbnail)
+            if len(sheet) == n_rows * n_columns:
+                _save_contact_sheet(sheet, n_columns, os.path.join(directory, 'contact_sheet_{:04d}.png'.format(sheet_number)))
+                sheet, sheet_number = [], sheet_number + 1
+    if sheet:
+        _save_contact_sheet(sheet, n_columns, os.path.join(directory, 'contact_sheet_{:04d}.png'.format(sheet_number)))
+    return filenames
+
+
+def _catalog_basename(index, item, width):
+    """ The unique name of the figure of a catalog item, prefixed by its index padded to width digits """
+    if isinstance(item, str):
+        name = os.path.splitext(os.path.basename(item))[0]
+    else:
+        # Every significant digit of the periods is kept, unlike Torus.parameter_dependent_filename.
+        name = '{}_L{!r}_T{!r}'.format(item.__class__.__name__, float(item.L), float(item.T)).replace('.', 'p')
+    return '{:0{}d}_{}.png'.format(index, width, name)
+
+
+def _draw_field(fig, ax, torus_to_plot, interpolation=None):
+    """ Draw the velocity field, its custom ticks and its colorbar onto the provided axes """
+    xticks, xlabels, yticks, ylabels = _ticks(torus_to_plot)
+    # plot the field
+    image = ax.imshow(torus_to_plot.state, extent=[0, torus_to_plot.L, 0, torus_to_plot.T], cmap='jet',
+                      interpolation=interpolation)
+    # Include custom ticks and tick labels
+    ax.set_xticks(xticks)
+    ax.set_yticks(yticks)
+    ax.set_xticklabels(xlabels, fontsize=12)
+    ax.set_yticklabels(ylabels, fontsize=12)
+    ax.grid(True, linestyle=':', color='k', alpha=0.8)
+    fig.subplots_adjust(right=0.9)
+    divider = make_axes_locatable(ax)
+    cax = divider.append_axes('right', size=0.1, pad=0.02)
+
+    # Custom colorbar values
+    maxu = np.max(torus_to_plot.state.ravel())
+    minu = np.min(torus_to_plot.state.ravel())
+    fig.colorbar(image, cax=cax, ticks=[round(minu, 1) + 0.1, round(maxu, 1)-0.1])
+    fig.tight_layout()
+    return image
+
+
+def _figsize(torus_to_plot):
+    """ Figure size which makes relative sizes between different figures approximately representative
+
+    Notes
+    -----
+    This helps with side-by-side comparison of different tori.
+    """
+    return max([2, 2**np.log10(torus_to_plot.L)]), max([2, 2**np.log10(torus_to_plot.T)])
+
+
+def _initialize_worker():
+    """ Select the non-interactive backend in rendering processes """
+    matplotlib.use('Agg')
+
+
+def _render_job(job):
+    """ Render a single torus of a catalog; returns its thumbnail as an RGBA array """
+    item, filename, thumbnail_filename, quality, fundamental_domain, dpi, thumbnail_shape = job
+    if isinstance(item, str):
+        from torihunter.io import read_h5
+        item = read_h5(item)
+    field = render(item, filename, quality=quality, fundamental_domain=fundamental_domain, dpi=dpi)
+    # Nearest neighbor resampling to the thumbnail size; the field has already been interpolated.
+    rows = np.linspace(0, field.shape[0]-1, num=thumbnail_shape[0]).round().astype(int)
+    columns = np.linspace(0, field.shape[1]-1, num=thumbnail_shape[1]).round().astype(int)
+    thumbnail_field = field[np.ix_(rows, columns)]
+    span = np.ptp(thumbnail_field)
+    normalized_field = (thumbnail_field - thumbnail_field.min()) / (span if span > 0 else 1.0)
+    thumbnail = matplotlib.colormaps['jet'](normalized_field, bytes=True)
+    if thumbnail_filename is not None:
+        matplotlib.image.imsave(thumbnail_filename, thumbnail)
+    return thumbnail
+
+
+def _save_contact_sheet(thumbnails, n_columns, filename):
+    """ Tile thumbnails into a single image, row by row, separated by white borders """
+    height, width = thumbnails[0].shape[:2]
+    border = 2
+    n_rows = int(np.ceil(len(thumbnails) / n_columns))
+    sheet = np.full((n_rows*(height+border)+border, n_columns*(width+border)+border, 4), 255, dtype=np.uint8)
+    for index, thumbnail in enumerate(thumbnails):
+        row, column = divmod(index, n_columns)
+        top, left = border + row*(height+border), border + column*(width+border)
+        sheet[top:top+height, left:left+width, :] = thumbnail
+    matplotlib.image.imsave(filename, sheet)
+    return None
+
+
+def _ticks(torus_to_plot):
+    """ Custom tick locations and labels
+
+    Notes
+    -----
+    Accounts for some pathological cases where the period is too small (only a single label) or too large
+    (many labels, overlapping due to font size). Default label tick size is 10 for time and the fundamental
+    frequency, 2 pi sqrt(2) for space. Periods equal to zero are replaced by 1 so that there is something to plot.
+    """
+    if torus_to_plot.T != 0:
+        timetick_step = np.min([10, 10 * (2**(int(np.log10(torus_to_plot.T))))])
+        yticks = np.arange(timetick_step, torus_to_plot.T, timetick_step)
+        ylabels = np.array([str(int(y)) for y in yticks])
+    else:
+        torus_to_plot.T = 1
+        yticks = np.array([0, torus_to_plot.T])
+        ylabels = np.array(['0', 'inf'])
+
+    if torus_to_plot.L > 2*pi:
+        xticks = np.arange(0, torus_to_plot.L, 2*pi)
+        xlabels = [str(int(x/(2*pi))) for x in xticks]
+    elif torus_to_plot.L > pi:
+        xticks = np.arange(0, torus_to_plot.L, pi)
+        xlabels = [str(int(x/pi)) for x in xticks]
+    else:
+        torus_to_plot.L = 1
+        xticks = np.array([0, torus_to_plot.L])
+        xlabels = np.array(['0', 'inf'])
+    return xticks, xlabels, yticks, ylabels
+
+
+def _torus_to_plot(torus, pad_n, pad_m, fundamental_domain):
+    """ The velocity field to plot; rediscretized and restricted to the fundamental domain if requested """
+    if (pad_n, pad_m) != (torus.N, torus.M):
+        plot_torus_tmp = rediscretize(torus, newN=pad_n, newM=pad_m)
+    else:
+        plot_torus_tmp = torus
+
+    if fundamental_domain:
+        return plot_torus_tmp.to_fundamental_domain().convert(to='field')
+    else:
+        return plot_torus_tmp.convert(to='field')
@@ -0,0 +1,135 @@
+from concurrent.futures import ProcessPoolExecutor
+import functools
+import os
+import threading
+from torihunter import orbit
+
+__all__ = ['ShapeAffinePool']
+
+
+class ShapeAffinePool:
+    """ Pool of long-lived worker processes which routes each torus to a worker that has already handled its shape.
+
+    Parameters
+    ----------
+    processes : int
+        The number of worker processes; defaults to the number of processors.
+    max_pending : int
+        The number of unfinished jobs a worker may hold before jobs of its shapes spill over to a worker with less
+        load, which then becomes another home of the shape.
+    cached_shapes : int
+        The number of discretizations whose operators each worker keeps in orbit.operator_cache.
+
+    Notes
+    -----
+    Operators which only depend on the class of a torus and its discretization (N, M), such as the Fourier
+    transform matrices used to construct Jacobians, Torus.jac, are cached by each worker in
+    orbit.operator_cache, which only holds a few discretizations at a time. The cache is disabled outside of
+    the workers, and only searches which assemble dense Jacobians, e.g. chord_newton, use it; searches built on
+    Jacobian-vector products, e.g. adjoint_descent, gain nothing from the routing. A generic process pool scatters jobs over its workers, such
+    that in campaigns with many different discretizations every worker keeps rebuilding these operators. Here
+    each worker is its own single process executor, and the jobs of each (class, N, M) are sent to the least
+    loaded of the workers which have handled that shape before. New shapes are sent to the least loaded worker,
+    preferring workers which are home to the fewest shapes.
+
+    Examples
+    --------
+    >>> with ShapeAffinePool(processes=4) as pool:
+    ...     futures = [pool.submit(adjoint_descent, torus, tol=1e-8) for torus in tori]
+    ...     results = [future.result() for future in futures]
+    """
+
+    def __init__(self, processes=None, max_pending=2, cached_shapes=2):
+        processes = processes if processes is not None else os.cpu_count()
+        self.max_pending = max_pending
+        self.routes = {}
+        self._workers = [ProcessPoolExecutor(max_workers=1, initializer=_initialize_worker, initargs=(cached_shapes,))
+                         for _ in range(processes)]
+        self._pending = [0] * processes
+        self._shapes = [0] * processes
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+
+    def __repr__(self):
+        return self.__class__.__name__ + '(processes={})'.format(len(self._workers))
+
+    def cache_info(self):
+        """ The discretizations whose operators are currently cached by each worker
+
+        Returns
+        -------
+        list of list of tuple :
+            For each worker, the (class name, N, M) of its cached operators, least recently used first.
+        """
+        futures = [worker.submit(_cache_info) for worker in self._workers]
+        return [future.result() for future in futures]
+
+    def map(self, function, tori, **kwargs):
+        """ Apply function to each torus, returning an iterator over the results in order
+
+        Parameters
+        ----------
+        function : callable
+            Picklable callable whose first argument is a torus, e.g. a search method.
+        tori : iterable of Torus
+            The tori to submit.
+        **kwargs :
+            Keyword arguments passed to each call of function.
+        """
+        futures = [self.submit(function, torus, **kwargs) for torus in tori]
+        return (future.result() for future in futures)
+
+    def shutdown(self, wait=True):
+        """ Stop the worker processes once their jobs are finished """
+        for worker in self._workers:
+            worker.shutdown(wait=wait)
+        return None
+
+    def submit(self, function, torus, *args, **kwargs):
+        """ Schedule function(torus, *args, **kwargs) on a worker which holds the shape of torus
+
+        Returns
+        -------
+        Future :
+            The future of the result of the call.
+        """
+        key = (torus.__class__.__name__, torus.N, torus.M)
+        with self._lock:
+            index = self._route(key)
+            self._pending[index] += 1
+        future = self._workers[index].submit(function, torus, *args, **kwargs)
+        future.add_done_callback(functools.partial(self._finished, index))
+        return future
+
+    def _finished(self, index, future):
+        """ Callback which decrements the load of a worker """
+        with self._lock:
+            self._pending[index] -= 1
+        return None
+
+    def _route(self, key):
+        """ Index of the worker which receives the next job of the shape key """
+        homes = self.routes.setdefault(key, [])
+        least_loaded = min(range(len(self._workers)), key=lambda i: (self._pending[i], self._shapes[i]))
+        if homes:
+            home = min(homes, key=lambda i: self._pending[i])
+            if self._pending[home] < self.max_pending or self._pending[least_loaded] >= self._pending[home]:
+                return home
+        homes.append(least_loaded)
+        self._shapes[least_loaded] += 1
+        return least_loaded
+
+
+def _initialize_worker(cached_shapes):
+    """ Enable the operator cache of a worker process """
+    orbit.operator_cache_shapes = cached_shapes
+
+
+def _cache_info():
+    """ The keys of the operator cache of the current process """
+    return [(cls.__name__, N, M) for cls, N, M in orbit.operator_cache]
@@ -0,0 +1,327 @@
+from torihunter._arrayops import swap_modes
+from scipy.sparse.linalg import LinearOperator
+import numpy as np
+
+__all__ = ['Preconditioner', 'BlockPreconditioner', 'column_scalings', 'parameter_scalings']
+
+
+class Preconditioner(LinearOperator):
+    """ Diagonal preconditioner, stored as its elementwise multiplier and the scalings of the parameters.
+
+    Parameters
+    ----------
+    elementwise : ndarray
+        The diagonal of the preconditioner restricted to the spatiotemporal modes, with the shape of the modes.
+    scalings : dict
+        The diagonal elements which correspond to the free parameters, keyed by 'T', 'L' or 'S'.
+    side : str
+        Takes values 'left' or 'right'. Left preconditioners act on the range of the Jacobian, i.e. on the
+        spatiotemporal modes alone; right preconditioners act on its domain, which includes the free parameters.
+
+    Notes
+    -----
+    The default preconditioner of a torus is the inverse of the absolute value of its linear terms,
+    1 / (|w_j| + q_k^2 + q_k^4), with the parameter scalings 1/T, 1/L^4 and 1 for T, L and S, see
+    Torus.preconditioner. As a LinearOperator it acts on flat vectors: the modes, raveled, followed by the free
+    parameters in the order T, L, S, the same order as Torus.state_vector and TorusPacking. The products
+    Torus.matvec, Torus.rmatvec and Torus.normal_matvec, and the searches which take a preconditioning argument,
+    accept a Preconditioner in place of True; it is then used instead of the preconditioner of the current state.
+
+    Examples
+    --------
+    >>> preconditioner = torus.preconditioner(fixedparams=(False, False), side='right')
+    >>> preconditioned_jacobian = preconditioner.scale_jacobian(torus.jac())
+    >>> direction = torus.rmatvec(torus.spatiotemporal_mapping(), preconditioning=preconditioner)
+    """
+
+    def __init__(self, elementwise, scalings=None, side='left'):
+        self.elementwise = elementwise
+        self.scalings = dict(scalings) if scalings is not None else {}
+        self.side = side
+        parameters = [parameter for parameter in ['T', 'L', 'S'] if parameter in self.scalings]
+        if side == 'right':
+            self._diagonal = np.concatenate((elementwise.ravel(), [self.scalings[p] for p in parameters]))
+        else:
+            self._diagonal = elementwise.ravel()
+        super().__init__(dtype=float, shape=(self._diagonal.size, self._diagonal.size))
+
+    def __repr__(self):
+        return self.__class__.__name__ + '({}, side={})'.format(self.shape, self.side)
+
+    def apply(self, torus, out=None, transpose=False):
+        """ Precondition a torus, including its parameters if the preconditioner is a right preconditioner
+
+        Parameters
+        ----------
+        torus : Torus
+            The vector to precondition, in the spatiotemporal mode basis.
+        out : Torus
+            Torus to write the result into, which may be torus itself.
+        transpose : bool
+            Whether to apply the transpose of the preconditioner, which only differs for non-diagonal
+            preconditioners.
+
+        Returns
+        -------
+        Torus :
+            The preconditioned vector.
+        """
+        if out is None:
+            out = torus.copy()
+        np.multiply(torus.state, self.elementwise, out=out._mutable_state())
+        return self._scale_parameters(torus, out)
+
+    def complete(self, torus, transpose=False):
+        """ Apply the part of the preconditioner of the modes which is not the elementwise multiplier, in place
+
+        Notes
+        -----
+        Products such as Torus.matvec fuse the multiplication by the attribute 'elementwise' into their
+        evaluation, see TorusExpression.evaluate, after which this completes the preconditioning of the modes;
+        for diagonal preconditioners nothing remains. The parameters are scaled by the products themselves.
+        """
+        return torus
+
+    def diagonal(self):
+        """ The diagonal of the preconditioner as a flat vector """
+        return self._diagonal
+
+    def inv(self):
+        """ The inverse of the preconditioner, which is also diagonal """
+        return self.__class__(1.0 / self.elementwise, {parameter: 1.0 / scaling for parameter, scaling
+                                                        in self.scalings.items()}, side=self.side)
+
+    def scale_jacobian(self, jacobian):
+        """ The product P J for left preconditioners or J P for right preconditioners, for a dense Jacobian """
+        if self.side == 'right':
+            return jacobian * self._diagonal.reshape(1, -1)
+        else:
+            return self._diagonal.reshape(-1, 1) * jacobian
+
+    def _adjoint(self):
+        return self
+
+    def _scale_parameters(self, torus, out):
+        """ Scale the parameters of right preconditioners """
+        if self.side == 'right':
+            for parameter, scaling in self.scalings.items():
+                setattr(out, parameter, scaling * getattr(torus, parameter))
+        return out
+
+    def _matmat(self, X):
+        return self._diagonal.reshape(-1, 1) * X
+
+    def _matvec(self, x):
+        return self._diagonal * x.ravel()
+
+    def _rmatvec(self, x):
+        return self._diagonal * x.ravel()
+
+
+class BlockPreconditioner(Preconditioner):
+    """ Preconditioner which exactly inverts the linear terms, including the rotations of the derivatives.
+
+    Parameters
+    ----------
+    linearization : Linearization
+        The linearization whose frequencies, fixed parameters and torus define the preconditioner.
+    side : str
+        Takes values 'left' or 'right'; right preconditioners include the parameters.
+    advection : float
+        The (frozen) velocity of a mean flow, c, which adds the advection term c u_x to the linear terms. Only
+        tori without discrete symmetries, Torus and RelativeTorus, admit a mean flow.
+    absolute : bool
+        Whether to use the absolute values of the spatial terms, q_k^2 + q_k^4, as in the default preconditioner,
+        together with the magnitude of the advection by the state (see Notes), or the spatial terms themselves,
+        q_k^4 - q_k^2, which are singular for wave numbers near one.
+    inverse : bool
+        Whether the operator is the inverse of the preconditioner, i.e. the linear terms themselves.
+
+    Notes
+    -----
+    The derivatives u_t and u_x act on each pair of real and imaginary (cosine and sine) coefficients of a
+    frequency or wave number as the 2x2 rotation generators w_j [[0, -1], [1, 0]] and q_k [[0, -1], [1, 0]]. The
+    linear terms, A = a + D_t + c D_x with a = q_k^4 - q_k^2, therefore couple the four coefficients of each
+    (w_j, q_k), whereas the default preconditioner only uses the magnitude of the diagonal. Because D_t and
+    D_x commute and square to -w_j^2 and -q_k^2, the inverse has the closed form
+    A^{-1} = (a - D_t - c D_x) (a^2 + w_j^2 + c^2 q_k^2 + 2 c D_t D_x) / d, with the denominator
+    d = (a^2 + (w_j - c q_k)^2) (a^2 + (w_j + c q_k)^2), which reduces to (a - D_t) / (a^2 + w_j^2) without
+    advection; it is applied with elementwise products and swaps of the modes alone. For relative periodic tori
+    the co-moving term -(S/T) u_x is included in the advection, and equilibria have no time derivative.
+
+    The linearization of the nonlinear term, (u v)_x = u v_x + u_x v, advects each mode by the state itself,
+    whose velocity has no definite direction, hence it is not a rotation D_x which could be inverted. The norm
+    of its column for a mode of wave number q_k is approximately (c_u^2 q_k^2 + c_x^2)^(1/2), with c_u and c_x
+    the root mean square values of u and u_x at the linearization point, which is added to the absolute
+    spatial terms: a = q_k^2 + q_k^4 + (c_u^2 q_k^2 + c_x^2)^(1/2).
+
+    The parameters of right preconditioners are scaled by the inverse norms of the parameter columns of the
+    Jacobian, 1 / ||dF/dp||, such that the columns of J P, both of the modes and of the parameters, have norms
+    of order one; see column_scalings. Right preconditioners are applied to products with the adjoint Jacobian
+    (rmatvec) as their transpose, A^{-T}. The symmetric part of A^{-1} is positive definite when absolute is
+    True, hence the preconditioned gradient remains a descent direction.
+
+    Examples
+    --------
+    >>> preconditioner = torus.block_preconditioner(side='right')
+    >>> torus, statistics = truncated_newton(torus, preconditioning=preconditioner)
+    """
+
+    def __init__(self, linearization, side='left', advection=0., absolute=True, inverse=False):
+        torus = linearization.torus
+        if advection and torus.__class__.__name__ not in ['Torus', 'RelativeTorus']:
+            raise ValueError('tori with discrete symmetries do not admit a mean flow.')
+        qk_matrix, wj_matrix = linearization.qk_matrix, linearization.wj_matrix
+        self.linearization = linearization
+        self.side = side
+        self.absolute = absolute
+        self.inverse = inverse
+        self.elementwise = None
+        # The co-moving term of relative periodic tori, -(S/T) u_x, is an advection term.
+        self.advection = advection + (-1.0 * torus.S / torus.T if torus.S else 0.)
+        self.shape_of_modes = torus.state.shape
+        if absolute:
+            # The magnitude of the advection by the state, see Notes.
+            speed = np.sqrt(np.mean(linearization.field_torus.state**2))
+            strain = np.sqrt(np.mean(torus.dx().convert(to='field').state**2))
+            self.linear = qk_matrix**2 + qk_matrix**4 + np.sqrt((speed * qk_matrix)**2 + strain**2)
+        else:
+            self.linear = qk_matrix**4 - qk_matrix**2
+        frequencies = np.abs(wj_matrix) if wj_matrix is not None else np.zeros(self.shape_of_modes)
+        wave_numbers = np.abs(self.advection * qk_matrix)
+        self._sum = self.linear**2 + frequencies**2 + wave_numbers**2
+        self._denominator = np.maximum((self.linear**2 + (frequencies - wave_numbers)**2)
+                                       * (self.linear**2 + (frequencies + wave_numbers)**2), np.finfo(float).tiny)
+        self.scalings = {}
+        if side == 'right':
+            for parameter, scaling in column_scalings(linearization).items():
+                self.scalings[parameter] = 1.0 / scaling if inverse else scaling
+        size = torus.state.size + len(self.scalings)
+        LinearOperator.__init__(self, dtype=float, shape=(size, size))
+
+    def apply(self, torus, out=None, transpose=False):
+        """ Precondition a torus, see Preconditioner.apply """
+        if out is None:
+            out = torus.copy()
+        state = self._solve(torus.state, transpose=transpose)
+        np.copyto(out._mutable_state(), state)
+        return self._scale_parameters(torus, out)
+
+    def complete(self, torus, transpose=False):
+        """ Precondition the modes in place; none of it is fused into the products, see Preconditioner.complete """
+        np.copyto(torus._mutable_state(), self._solve(torus.state, transpose=transpose))
+        return torus
+
+    def diagonal(self):
+        """ The diagonal of the preconditioner as a flat vector """
+        elementwise = self.linear if self.inverse else self.linear * self._sum / self._denominator
+        return np.concatenate((elementwise.ravel(), [self.scalings[p] for p in ['T', 'L', 'S'] if p in self.scalings]))
+
+    def inv(self):
+        """ The inverse of the preconditioner, the linear terms themselves """
+        return self.__class__(self.linearization, side=self.side, advection=self.advection - self._comoving(),
+                              absolute=self.absolute, inverse=not self.inverse)
+
+    def scale_jacobian(self, jacobian):
+        """ The product P J for left preconditioners or J P for right preconditioners, for a dense Jacobian """
+        if self.side == 'right':
+            return self.rmatmat(jacobian.T).T
+        else:
+            return self.matmat(jacobian)
+
+    def _adjoint(self):
+        return LinearOperator(self.shape, matvec=self._rmatvec, rmatvec=self._matvec, dtype=float)
+
+    def _comoving(self):
+        """ The part of the advection which is due to the co-moving frame """
+        torus = self.linearization.torus
+        return -1.0 * torus.S / torus.T if torus.S else 0.
+
+    def _dt(self, state):
+        """ The time derivative of a state, without the advection """
+        if self.linearization.wj_matrix is None:
+            return np.zeros(state.shape)
+        return swap_modes(np.multiply(self.linearization.wj_matrix, state), dimension='time')
+
+    def _dx(self, state):
+        """ The advection term, c u_x """
+        return self.advection * swap_modes(np.multiply(self.linearization.qk_matrix, state))
+
+    def _matmat(self, X):
+        return np.column_stack([self._matvec(column) for column in X.T])
+
+    def _matvec(self, x):
+        return self._vector(x, transpose=False)
+
+    def _rmatvec(self, x):
+        return self._vector(x, transpose=True)
+
+    def _solve(self, state, transpose=False):
+        """ The product of the preconditioner (or its transpose) with the spatiotemporal modes """
+        sign = 1.0 if transpose else -1.0
+        if self.inverse:
+            # The linear terms themselves, a + D_t + c D_x; the transpose is a - D_t - c D_x.
+            rotation = self._dt(state) + self._dx(state) if self.advection else self._dt(state)
+            return self.linear * state - sign * rotation
+        product = self._sum * state
+        if self.advection:
+            product = product + 2.0 * self._dt(self._dx(state))
+            rotation = self._dt(product) + self._dx(product)
+        else:
+            rotation = self._dt(product)
+        return (self.linear * product + sign * rotation) / self._denominator
+
+    def _vector(self, x, transpose):
+        """ The product with a flat vector, see Preconditioner """
+        x = x.ravel()
+        size = int(np.prod(self.shape_of_modes))
+        state = self._solve(x[:size].reshape(self.shape_of_modes), transpose=transpose).ravel()
+        parameters = [self.scalings[p] * x[size + index] for index, p
+                      in enumerate(p for p in ['T', 'L', 'S'] if p in self.scalings)]
+        return np.concatenate((state, parameters))
+
+
+def column_scalings(linearization):
+    """ The scalings of the free parameters by the inverse norms of their columns of the Jacobian, 1 / ||dF/dp||
+
+    Parameters
+    ----------
+    linearization : Linearization
+        The linearization whose parameter columns determine the scalings.
+
+    Returns
+    -------
+    dict :
+        The scalings of the free parameters, keyed by their names. Parameters whose columns vanish, e.g. the
+        period of a torus without time dependence, are scaled as by parameter_scalings instead.
+    """
+    defaults = parameter_scalings(linearization.torus, linearization.fixedparams)
+    scalings = {}
+    for parameter, column in linearization.parameter_columns.items():
+        norm = np.linalg.norm(column)
+        scalings[parameter] = 1.0 / norm if norm > 0 else defaults[parameter]
+    return scalings
+
+
+def parameter_scalings(torus, fixedparams):
+    """ The default scalings of the free parameters, 1/T, 1/L^4 and 1 for T, L and S respectively
+
+    Parameters
+    ----------
+    torus : Torus
+        The torus whose parameters determine the scalings.
+    fixedparams : tuple of bool or bool
+        Whether or not each parameter is fixed, see Torus.matvec.
+
+    Returns
+    -------
+    dict :
+        The scalings of the free parameters, keyed by their names.
+    """
+    scalings = {'T': 1.0 / torus.T if torus.T else 1.0, 'L': 1.0 / torus.L**4, 'S': 1.0}
+    if isinstance(fixedparams, bool):
+        # EquilibriumTorus only has a single parameter, its spatial period.
+        free = [] if fixedparams else ['L']
+    else:
+        free = [parameter for parameter, fixed in zip(['T', 'L', 'S'], fixedparams) if not fixed]
+    return {parameter: scalings[parameter] for parameter in free}
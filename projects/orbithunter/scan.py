@@ -0,0 +1,183 @@
+import numpy as np
+import scipy.optimize
+
+__all__ = ['ParameterScan']
+
+
+class ParameterScan:
+    """ The cost function of a fixed set of spatiotemporal modes as a function of its parameters alone.
+
+    Parameters
+    ----------
+    torus : Torus
+        The torus whose modes are held fixed; its parameters are the reference parameters T_0, L_0 and S_0.
+
+    Notes
+    -----
+    For fixed modes, the spatiotemporal mapping is a linear combination of the components returned by
+    Torus.mapping_components, whose coefficients only depend on the parameters; e.g. for Torus,
+    F(T, L) = (T_0/T) u_t + (L_0/L)^2 u_xx + (L_0/L)^4 u_xxxx + (L_0/L) 1/2 (u^2)_x. Hence the cost function is the
+    quadratic form 1/2 c^T G c of the coefficients c with the Gram matrix G of the components. The components
+    and their Gram matrix are computed once, after which the cost function, its gradient with respect to the
+    parameters and the mapping at other parameters are evaluated without Fourier transforms; the cost function
+    is vectorized over arrays of parameters.
+
+    Examples
+    --------
+    >>> scan = ParameterScan(torus)
+    >>> residuals = scan.grid(np.linspace(40, 60, 201), np.linspace(20, 24, 101))
+    >>> retargeted_torus, result = scan.minimize()
+    """
+
+    def __init__(self, torus):
+        self.torus = torus.convert(to='modes')
+        components = self.torus.mapping_components()
+        self.names = list(components)
+        self._components = np.stack([component.ravel() for component in components.values()])
+        self.gram = np.dot(self._components, self._components.T)
+        self.T, self.L, self.S = self.torus.T, self.torus.L, self.torus.S
+        # The parameters the mapping depends upon; EquilibriumTorus only depends on its spatial period.
+        if 'dt' not in components:
+            self.parameters = ['L']
+        elif 'dx' in components:
+            self.parameters = ['T', 'L', 'S']
+        else:
+            self.parameters = ['T', 'L']
+
+    def __repr__(self):
+        return self.__class__.__name__ + '({}, T={}, L={}, S={})'.format(self.torus.__class__.__name__,
+                                                                          self.T, self.L, self.S)
+
+    def coefficients(self, T=None, L=None, S=None):
+        """ The coefficients of the components at the given parameters
+
+        Parameters
+        ----------
+        T, L, S : float or ndarray
+            The parameters, which are broadcast against each other; those which are None are equal to the
+            reference parameters.
+
+        Returns
+        -------
+        ndarray :
+            Array whose first axis indexes the components, in the order of the attribute 'names'.
+        """
+        T, L, S = np.broadcast_arrays(*(np.asarray(value if value is not None else reference, dtype=float)
+                                        for value, reference in zip((T, L, S), (self.T, self.L, self.S))))
+        length_ratio = self.L / L
+        coefficients = {'d2x': length_ratio**2, 'd4x': length_ratio**4, 'nonlinear': length_ratio}
+        if 'dt' in self.names:
+            coefficients['dt'] = self.T / T
+        if 'dx' in self.names:
+            coefficients['dx'] = -1.0 * (S / T) * length_ratio
+        return np.stack([coefficients[name] for name in self.names])
+
+    def grid(self, T=None, L=None, S=None):
+        """ The cost function on the grid of all combinations of the given parameter values
+
+        Parameters
+        ----------
+        T, L, S : array_like
+            The values of each parameter; those which are None are equal to the reference parameters.
+
+        Returns
+        -------
+        ndarray :
+            Array with one axis per parameter that was provided, in the order T, L, S.
+        """
+        values = [np.atleast_1d(value) for value in (T, L, S) if value is not None]
+        mesh = iter(np.meshgrid(*values, indexing='ij'))
+        return self.residual(*(next(mesh) if value is not None else None for value in (T, L, S)))
+
+    def gradient(self, T=None, L=None, S=None):
+        """ The gradient of the cost function with respect to the parameters in the attribute 'parameters' """
+        T, L, S = (value if value is not None else reference for value, reference in zip((T, L, S),
+                                                                                          (self.T, self.L, self.S)))
+        gram_coefficients = dict(zip(self.names, np.dot(self.gram, self.coefficients(T, L, S))))
+        # The derivatives of the coefficients with respect to each parameter.
+        derivatives = {'L': {'d2x': -2.0 * self.L**2 / L**3, 'd4x': -4.0 * self.L**4 / L**5,
+                             'nonlinear': -1.0 * self.L / L**2}}
+        if 'dt' in self.names:
+            derivatives['T'] = {'dt': -1.0 * self.T / T**2}
+        if 'dx' in self.names:
+            derivatives['T']['dx'] = (S / T**2) * (self.L / L)
+            derivatives['L']['dx'] = (S / T) * (self.L / L**2)
+            derivatives['S'] = {'dx': -1.0 * (self.L / L) / T}
+        return np.array([sum(derivative * gram_coefficients[name]
+                             for name, derivative in derivatives[parameter].items())
+                         for parameter in self.parameters])
+
+    def mapping(self, T=None, L=None, S=None):
+        """ The spatiotemporal mapping of the fixed modes at the given parameters
+
+        Returns
+        -------
+        Torus :
+            Torus with the parameters T, L and S whose state is the spatiotemporal mapping.
+        """
+        torus = self.retarget(T, L, S)
+        state = np.dot(self.coefficients(T, L, S), self._components).reshape(self.torus.state.shape)
+        return self.torus.__class__(state=state, statetype='modes', T=torus.T, L=torus.L, S=torus.S)
+
+    def minimize(self, fixedparams=None, method='L-BFGS-B', **options):
+        """ Minimize the cost function with respect to the parameters alone
+
+        Parameters
+        ----------
+        fixedparams : tuple of bool or bool
+            Whether or not each parameter is fixed, see Torus.matvec; by default every parameter is free.
+        method : str
+            The method of scipy.optimize.minimize.
+        **options :
+            Keyword arguments passed to scipy.optimize.minimize, e.g. bounds or tol.
+
+        Returns
+        -------
+        Torus :
+            The torus with the fixed modes and the optimal parameters.
+        OptimizeResult :
+            The result returned by scipy.optimize.minimize, with x in the order of the free parameters.
+        """
+        if fixedparams is None:
+            free = list(self.parameters)
+        elif isinstance(fixedparams, bool):
+            free = [] if fixedparams else ['L']
+        else:
+            free = [parameter for parameter, fixed in zip(self.parameters, fixedparams) if not fixed]
+        indices = [self.parameters.index(parameter) for parameter in free]
+
+        def parameters(x):
+            values = {'T': self.T, 'L': self.L, 'S': self.S}
+            values.update(zip(free, x))
+            return values
+
+        result = scipy.optimize.minimize(lambda x: float(self.residual(**parameters(x))),
+                                         np.array([getattr(self, parameter) for parameter in free], dtype=float),
+                                         jac=lambda x: self.gradient(**parameters(x))[indices],
+                                         method=method, **options)
+        return self.retarget(**parameters(result.x)), result
+
+    def residual(self, T=None, L=None, S=None):
+        """ The cost function, 1/2 ||F||^2, at the given parameters
+
+        Parameters
+        ----------
+        T, L, S : float or ndarray
+            The parameters, which are broadcast against each other; those which are None are equal to the
+            reference parameters.
+
+        Returns
+        -------
+        float or ndarray :
+            The cost function, with the broadcast shape of the parameters.
+        """
+        coefficients = self.coefficients(T, L, S)
+        return 0.5 * np.einsum('i...,ij,j...->...', coefficients, self.gram, coefficients)
+
+    def retarget(self, T=None, L=None, S=None):
+        """ Torus with the fixed modes and the given parameters """
+        torus = self.torus.copy()
+        torus.T = T if T is not None else self.T
+        torus.L = L if L is not None else self.L
+        torus.S = S if S is not None else self.S
+        return torus
@@ -0,0 +1,126 @@
+from concurrent.futures import ProcessPoolExecutor
+from inspect import signature
+from torihunter.optimize import adjoint_descent
+import numpy as np
+
+__all__ = ['successive_halving']
+
+
+def successive_halving(seeds, method=adjoint_descent, tol=1e-8, min_iter=100, maxiter=10000, eta=2,
+                       max_rounds=None, processes=None, verbose=False, **settings):
+    """ Search for tori from many initial conditions, pruning the least promising seeds after each round
+
+    Parameters
+    ----------
+    seeds : iterable of Torus
+        The initial conditions, e.g. produced by random_initial_condition.
+    method : callable
+        The search method, with the call signature of adjoint_descent: method(torus, tol=tol, maxiter=maxiter,
+        **settings) returns the tuple (torus, statistics). Searches are continued from their final state in
+        the next round; the step size is carried over for methods which accept one.
+    tol : float
+        The value of the cost function at which a search is deemed to have converged.
+    min_iter : int
+        The number of iterations allotted to each seed in the first round.
+    maxiter : int
+        The maximum total number of iterations allotted to any single seed.
+    eta : int
+        After each round only the best 1/eta of the remaining seeds are continued, each with eta times as many
+        iterations as in the previous round.
+    max_rounds : int
+        The maximum number of rounds. By default, rounds continue until every seed has either finished or
+        been pruned.
+    processes : int
+        The number of worker processes used to run the searches of each round; if None they are run serially.
+    verbose : bool
+        Whether or not to print a summary of each round.
+    **settings :
+        Keyword arguments passed to method.
+
+    Returns
+    -------
+    converged : list of Torus
+        The converged tori which are neither equilibria nor zero, in order of their seeds.
+    report : list of dict
+        One dict per seed, in order, with keys 'seed' (its index), 'status', 'torus' (its final state), 'residual',
+        'nit' (the total number of iterations) and 'round' (the last round it participated in). The status is one
+        of 'converged', 'equilibrium_or_zero', 'stalled', 'pruned', 'maxiter' or 'max_rounds'.
+
+    Notes
+    -----
+    Every search is checked with Torus.check_if_equilibrium_or_zero after each round; those which have
+    collapsed onto an equilibrium or zero are discarded, as are those which have stalled. The remaining
+    searches are ranked by their residual decay: the logarithm of the residual is extrapolated over the next
+    round, using the rate at which it decreased per iteration during the current round. Hence the compute is
+    concentrated on the seeds which are expected to have the smallest residual, whether because they are
+    already close to convergence or because they are converging quickly.
+
+    """
+    candidates = [{'seed': index, 'torus': torus.convert(to='modes'), 'residual': float(torus.residual()),
+                   'nit': 0, 'round': 0, 'settings': dict(settings)} for index, torus in enumerate(seeds)]
+    report = [None] * len(candidates)
+    carry_stepsize = 'stepsize' in signature(method).parameters
+    budget, round_number = min_iter, 0
+    executor = ProcessPoolExecutor(max_workers=processes) if processes is not None else None
+    try:
+        while candidates and (max_rounds is None or round_number < max_rounds):
+            jobs = [(method, candidate['torus'], tol, min(budget, maxiter - candidate['nit']), candidate['settings'])
+                    for candidate in candidates]
+            results = executor.map(_search, jobs) if executor is not None else map(_search, jobs)
+
+            survivors = []
+            for candidate, (torus, statistics) in zip(candidates, results):
+                previous_residual = candidate['residual']
+                residual = float(torus.residual())
+                candidate.update(torus=torus, residual=residual, round=round_number,
+                                 nit=candidate['nit'] + statistics['nit'])
+                if carry_stepsize and statistics['history']:
+                    candidate['settings']['stepsize'] = statistics['history'][-1]['stepsize']
+
+                torus, nontrivial = torus.check_if_equilibrium_or_zero()
+                if not nontrivial:
+                    _finish(report, candidate, 'equilibrium_or_zero')
+                elif statistics['status'] == 'converged' or residual < tol:
+                    _finish(report, candidate, 'converged')
+                elif statistics['status'] == 'stalled':
+                    _finish(report, candidate, 'stalled')
+                elif candidate['nit'] >= maxiter:
+                    _finish(report, candidate, 'maxiter')
+                else:
+                    # The logarithm of the residual, extrapolated over the next round at the current rate of decay.
+                    decay_rate = (np.log(previous_residual) - np.log(residual)) / max(statistics['nit'], 1)
+                    candidate['score'] = np.log(residual) - decay_rate * budget * eta
+                    survivors.append(candidate)
+
+            survivors.sort(key=lambda candidate: candidate['score'])
+            n_kept = max(1, len(survivors) // eta)
+            for candidate in survivors[n_kept:]:
+                _finish(report, candidate, 'pruned')
+            candidates = survivors[:n_kept]
+            if verbose:
+                print('Round {}: {} iterations per seed, {} continuing, {} converged'.format(
+                    round_number, budget, len(candidates),
+                    sum(1 for entry in report if entry is not None and entry['status'] == 'converged')))
+            budget *= eta
+            round_number += 1
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    for candidate in candidates:
+        _finish(report, candidate, 'max_rounds')
+    converged = [entry['torus'] for entry in report if entry['status'] == 'converged']
+    return converged, report
+
+
+def _finish(report, candidate, status):
+    """ Record the final state of a seed which is no longer searched """
+    report[candidate['seed']] = {'seed': candidate['seed'], 'status': status, 'residual': candidate['residual'],
+                                 'nit': candidate['nit'], 'round': candidate['round'], 'torus': candidate['torus']}
+    return None
+
+
+def _search(job):
+    """ Run a single search for the number of iterations allotted in the current round """
+    method, torus, tol, maxiter, settings = job
+    return method(torus, tol=tol, maxiter=maxiter, **settings)
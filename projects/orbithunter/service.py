@@ -0,0 +1,269 @@
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import itertools
+import multiprocessing
+import os
+import threading
+from torihunter.optimize import adjoint_descent
+
+__all__ = ['SearchService', 'SearchJob']
+
+
+class SearchService:
+    """ Asynchronous interface for running searches in a pool of worker processes.
+
+    Parameters
+    ----------
+    processes : int
+        The number of worker processes; defaults to the number of processors.
+    max_concurrent : int
+        The maximum number of searches which are running at once; defaults to the number of processes.
+    max_pending : int
+        The maximum number of unfinished (queued or running) searches. Once reached, submit waits until a search
+        finishes, which applies backpressure to the producer of the searches. Unlimited if None.
+    progress_every : int
+        The number of iterations between progress events; the searches also check for cancellation at this rate.
+
+    Notes
+    -----
+    Searches report their progress through the telemetry argument of the search methods, so any method which
+    accepts telemetry, e.g. adjoint_descent, truncated_newton or minimize, can be submitted. The progress events
+    are sent from the workers to the event loop through a queue held by a multiprocessing manager; the calls of
+    the event loop to the manager are blocking, and are therefore made from the default executor. Cancellation
+    is cooperative: a cancelled search stops at its next progress event and returns its current state with the
+    status 'cancelled', such that the state of stalled searches is not lost. Services must be created and used
+    within a single running event loop.
+
+    Examples
+    --------
+    >>> async with SearchService(processes=4, max_pending=16) as service:
+    ...     job = await service.submit(torus, method=adjoint_descent, tol=1e-8)
+    ...     async for event in job.events():
+    ...         if event['event'] == 'progress' and event['iteration'] > 1000 and event['residual'] > 1e-2:
+    ...             job.cancel()
+    ...     torus, statistics = await job
+    """
+
+    def __init__(self, processes=None, max_concurrent=None, max_pending=None, progress_every=10):
+        processes = processes if processes is not None else os.cpu_count()
+        self.progress_every = progress_every
+        self._executor = ProcessPoolExecutor(max_workers=processes)
+        self._running = asyncio.Semaphore(max_concurrent if max_concurrent is not None else processes)
+        self._pending = asyncio.Semaphore(max_pending) if max_pending is not None else None
+        self._manager = multiprocessing.Manager()
+        self._events = self._manager.Queue()
+        self._jobs = {}
+        self._ids = itertools.count()
+        self._dispatcher = threading.Thread(target=self._dispatch, name='search-events', daemon=True)
+        self._dispatcher.start()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    def __repr__(self):
+        return self.__class__.__name__ + '({} jobs)'.format(len(self._jobs))
+
+    async def close(self, cancel=False):
+        """ Wait for the submitted searches, then stop the worker processes
+
+        Parameters
+        ----------
+        cancel : bool
+            Whether to cancel the unfinished searches instead of waiting for them to converge.
+        """
+        jobs = [job for job in list(self._jobs.values()) if job._task is not None]
+        if cancel:
+            for job in jobs:
+                job.cancel()
+        await asyncio.gather(*(job._task for job in jobs), return_exceptions=True)
+        await self._put(None)
+        await asyncio.get_running_loop().run_in_executor(None, self._dispatcher.join)
+        self._executor.shutdown()
+        self._manager.shutdown()
+        return None
+
+    async def submit(self, torus, method=adjoint_descent, **settings):
+        """ Schedule a search, waiting first if the maximum number of pending searches has been reached
+
+        Parameters
+        ----------
+        torus : Torus
+            The initial condition.
+        method : callable
+            Picklable search method which accepts the keyword argument telemetry and returns (torus, statistics).
+        **settings :
+            Keyword arguments passed to method.
+
+        Returns
+        -------
+        SearchJob :
+            Handle of the search.
+        """
+        if self._pending is not None:
+            await self._pending.acquire()
+        cancelled = await asyncio.get_running_loop().run_in_executor(None, self._manager.Event)
+        job = SearchJob(next(self._ids), torus, cancelled)
+        self._jobs[job.id] = job
+        job._task = asyncio.ensure_future(self._run(job, method, settings))
+        return job
+
+    async def _put(self, event):
+        """ Send an event through the queue of the workers without blocking the event loop """
+        await asyncio.get_running_loop().run_in_executor(None, self._events.put, event)
+        return None
+
+    def _dispatch(self):
+        """ Body of the thread which forwards the events of the workers to the jobs in the event loop """
+        for event in iter(self._events.get, None):
+            job = self._jobs.pop(event['job']) if event['event'] is None else self._jobs.get(event['job'])
+            if job is not None:
+                job._loop.call_soon_threadsafe(job._publish, event)
+        return None
+
+    async def _run(self, job, method, settings):
+        """ Run a search once a slot is available and publish its terminal event """
+        loop = asyncio.get_running_loop()
+        try:
+            async with self._running:
+                if await loop.run_in_executor(None, job._cancelled.is_set):
+                    job.status = 'cancelled'
+                    return job.torus, {'nit': 0, 'status': 'cancelled', 'history': []}
+                job.status = 'running'
+                await self._put({'job': job.id, 'event': 'started'})
+                telemetry = _ProgressTelemetry(job.id, self._events, job._cancelled, self.progress_every)
+                torus, statistics = await loop.run_in_executor(self._executor, _search, method, job.torus,
+                                                               telemetry, settings)
+            job.status = 'cancelled' if statistics['status'] == 'cancelled' else 'finished'
+            return torus, statistics
+        except BaseException:
+            job.status = 'failed'
+            raise
+        finally:
+            if self._pending is not None:
+                self._pending.release()
+            # Sent through the queue of the workers, such that it follows all of the progress events of the job.
+            await self._put({'job': job.id, 'event': job.status})
+            # The job is removed once its terminal event has been dispatched.
+            await self._put({'job': job.id, 'event': None})
+
+
+class SearchJob:
+    """ Handle of a search submitted to a SearchService.
+
+    Attributes
+    ----------
+    id : int
+        The identifier of the search within its service.
+    torus : Torus
+        The initial condition.
+    status : str
+        One of 'queued', 'running', 'finished', 'cancelled' or 'failed'.
+    dropped : int
+        The number of progress events which were dropped because nobody consumed them.
+
+    Notes
+    -----
+    Awaiting a job returns the result of the search, (torus, statistics), or raises the exception of the search.
+    Cancelling the task which awaits the job does not cancel the search itself, use cancel for that.
+    """
+
+    def __init__(self, job_id, torus, cancelled, max_events=1000):
+        self.id = job_id
+        self.torus = torus
+        self.status = 'queued'
+        self.dropped = 0
+        self._cancelled = cancelled
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=max_events)
+        self._task = None
+
+    def __await__(self):
+        return self.result().__await__()
+
+    def __repr__(self):
+        return self.__class__.__name__ + '({}, {})'.format(self.id, self.status)
+
+    def cancel(self):
+        """ Request that the search stops at its next progress event, or before it starts if it is queued """
+        self._cancelled.set()
+        return None
+
+    def done(self):
+        """ Whether or not the search has finished, been cancelled or failed """
+        return self._task.done()
+
+    async def events(self):
+        """ Asynchronous iterator over the events of the search, which ends with its terminal event
+
+        Notes
+        -----
+        Each event is a dict with the keys 'job' and 'event', the type of event: 'started', 'progress' or the
+        final status of the job. Progress events also contain the iteration number, the parameters T, L and S
+        and the values recorded by the search, e.g. 'residual' and 'stepsize'. Events are buffered until they
+        are consumed; there should be only one consumer per job.
+        """
+        while True:
+            event = await self._queue.get()
+            if event is None:
+                return
+            yield event
+
+    async def result(self):
+        """ The result of the search, (torus, statistics) """
+        return await asyncio.shield(self._task)
+
+    def _publish(self, event):
+        """ Buffer an event in the event loop; progress events are dropped if the buffer is full """
+        if event['event'] is None:
+            event = None
+        if self._queue.full():
+            if event is not None and event['event'] == 'progress':
+                self.dropped += 1
+                return None
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(event)
+        return None
+
+
+class _Cancelled(Exception):
+    """ Raised within a worker to stop a cancelled search """
+
+    def __init__(self, torus, iteration):
+        super().__init__()
+        self.torus = torus
+        self.iteration = iteration
+
+
+class _ProgressTelemetry:
+    """ Telemetry which sends progress events to the service and stops the search if it has been cancelled """
+
+    def __init__(self, job_id, events, cancelled, every):
+        self.job_id = job_id
+        self.events = events
+        self.cancelled = cancelled
+        self.every = every
+
+    def record(self, iteration, torus=None, **values):
+        if iteration % self.every:
+            return None
+        if self.cancelled.is_set():
+            raise _Cancelled(torus.copy() if torus is not None else None, iteration)
+        event = {'job': self.job_id, 'event': 'progress', 'iteration': int(iteration)}
+        if torus is not None:
+            event.update(T=float(torus.T), L=float(torus.L), S=float(torus.S))
+        event.update(values)
+        self.events.put(event)
+        return None
+
+
+def _search(method, torus, telemetry, settings):
+    """ Run a search in a worker process """
+    try:
+        return method(torus, telemetry=telemetry, **settings)
+    except _Cancelled as cancelled:
+        final_torus = cancelled.torus if cancelled.torus is not None else torus
+        return final_torus, {'nit': cancelled.iteration, 'status': 'cancelled', 'history': []}
@@ -0,0 +1,246 @@
+from math import pi
+from scipy.fft import rfft, irfft, rfft2, irfft2, next_fast_len
+import numpy as np
+
+__all__ = ['ShadowingDetector', 'detect_shadowing']
+
+
+class ShadowingDetector:
+    """ Streaming detection of the intervals of a trajectory which shadow tori of a library.
+
+    Parameters
+    ----------
+    library : iterable of Torus
+        The tori to detect.
+    dt : float
+        The time step between consecutive rows (frames) of the trajectory.
+    L : float
+        The spatial period of the trajectory.
+    M : int
+        The number of spatial grid points of the trajectory.
+    window : int
+        The number of frames compared at once.
+    tol : float
+        The relative distance below which a window shadows a torus, see Notes.
+    hop : int
+        The number of frames between the starts of consecutive windows.
+    batch_size : int
+        The number of tori whose correlations are computed at once.
+    window_batch_size : int
+        The number of windows whose correlations are computed at once.
+
+    Notes
+    -----
+    Each window of the trajectory, u, is compared with every torus, v, at all temporal phases and all spatial
+    translations at once: the distance ||u(t + tau, x) - v(phase + tau, x + shift)|| over the window is
+    expanded into the energies of u and v and their cross-correlation, which is computed for all phases and
+    translations by two-dimensional FFTs, batched over the windows and the tori. The translation is then refined
+    to a continuous value by interpolating the correlation between the neighbouring grid points. The distance
+    is relative to the norm of the window. Only the correlations of window_batch_size windows with batch_size
+    tori are held at once, so apart from the frames themselves the memory used by update does not grow with
+    the number of frames per chunk.
+
+    The tori are converted to templates on the grid of the trajectory: the field is interpolated in time to the
+    time step of the trajectory, by its temporal Fourier series, and in space to the number of grid points of
+    the trajectory. A template spans one period plus the length of a window, such that windows can be compared
+    at every phase without wrapping around the period. For relative periodic tori the template is in the
+    stationary frame, i.e. it drifts by S per period. Tori are compared as if their spatial period were that of
+    the trajectory, so only tori whose spatial period is close to L are meaningful.
+
+    A window which is closer than tol to a torus starts or extends a shadowing episode of that torus; each
+    episode records the times of its first and last frames and the distance, phase and translation at its
+    closest window. The trajectory is provided in chunks of frames, in order of increasing time (unlike the
+    fields of tori, whose rows are in order of decreasing time), and only the frames of the last incomplete
+    window are kept between chunks.
+
+    Examples
+    --------
+    >>> detector = ShadowingDetector(library, dt=0.25, L=22., M=64, window=200, tol=0.2)
+    >>> for chunk in trajectory_chunks:
+    ...     for episode in detector.update(chunk):
+    ...         print(episode['torus'], episode['start'], episode['end'], episode['distance'])
+    >>> episodes = detector.close()
+    """
+
+    def __init__(self, library, dt, L, M, window, tol=0.2, hop=1, batch_size=16, window_batch_size=16):
+        self.library = list(library)
+        self.dt, self.L, self.M = dt, L, M
+        self.window, self.tol, self.hop = window, tol, hop
+        self.batch_size, self.window_batch_size = batch_size, window_batch_size
+        self.episodes = []
+        templates = [_template(torus, dt, M, window) for torus in self.library]
+        self._n_phases = [n_phases for _, n_phases in templates]
+        # The length of the correlations, such that no template wraps around.
+        self._length = next_fast_len(max(template.shape[0] for template, _ in templates))
+        self._spectra = np.stack([rfft2(template, s=(self._length, M)) for template, _ in templates])
+        # The energy of each template over a window starting at each of its phases.
+        self._energies = []
+        for template, n_phases in templates:
+            cumulative = np.concatenate(([0.], np.cumsum(np.sum(template**2, axis=1))))
+            self._energies.append(cumulative[window:window+n_phases] - cumulative[:n_phases])
+        self._buffer = np.empty((0, M))
+        self._buffer_start, self._next_start = 0, 0
+        self._open = {}
+
+    def __repr__(self):
+        return self.__class__.__name__ + '({} tori, window={})'.format(len(self.library), self.window)
+
+    def close(self):
+        """ End the trajectory, closing the episodes which are still open
+
+        Returns
+        -------
+        list of dict :
+            Every episode of the trajectory, in order of their start times.
+        """
+        for index in sorted(self._open):
+            self.episodes.append(self._open.pop(index))
+        self.episodes.sort(key=lambda episode: (episode['start'], episode['torus']))
+        return self.episodes
+
+    def update(self, frames):
+        """ Compare the windows which are completed by the next frames of the trajectory with the library
+
+        Parameters
+        ----------
+        frames : ndarray
+            Array of shape (n_frames, M), the next frames of the trajectory.
+
+        Returns
+        -------
+        list of dict :
+            The shadowing episodes which ended within these frames. Each episode has the keys 'torus', the
+            index of the torus in the library, 'start' and 'end', the times of the first and last frames of the
+            episode, 'time', the start time of its closest window and the 'distance', 'phase' and 'shift' at
+            that window: u(time + tau, x) is closest to v(phase + tau, x + shift).
+        """
+        self._buffer = np.concatenate((self._buffer, np.reshape(frames, (-1, self.M))))
+        end = self._buffer_start + self._buffer.shape[0]
+        starts = np.arange(self._next_start, end - self.window + 1, self.hop)
+        if starts.size == 0:
+            return []
+        all_windows = np.lib.stride_tricks.sliding_window_view(self._buffer, self.window, axis=0)
+
+        closed = []
+        # Windows are matched in order of increasing time for each torus, as episodes are extended in that order.
+        for first_window in range(0, starts.size, self.window_batch_size):
+            window_starts = starts[first_window:first_window+self.window_batch_size]
+            windows = np.swapaxes(all_windows[window_starts - self._buffer_start], 1, 2)
+            window_energies = np.maximum(np.sum(windows**2, axis=(1, 2)), np.finfo(float).tiny)
+            window_spectra = np.conj(rfft2(windows, s=(self._length, self.M)))
+            for first in range(0, len(self.library), self.batch_size):
+                batch = slice(first, first + self.batch_size)
+                correlations = irfft2(window_spectra[:, None] * self._spectra[None, batch],
+                                      s=(self._length, self.M))
+                for index, correlation in enumerate(np.swapaxes(correlations, 0, 1), start=first):
+                    closed.extend(self._match(index, window_starts, correlation[:, :self._n_phases[index]],
+                                              window_energies))
+
+        self._next_start = starts[-1] + self.hop
+        keep = max(self._next_start - self._buffer_start, 0)
+        self._buffer, self._buffer_start = self._buffer[keep:], self._buffer_start + keep
+        self.episodes.extend(closed)
+        return closed
+
+    def _match(self, index, starts, correlation, window_energies):
+        """ Align each window with a single torus and update its episodes """
+        n_windows, n_phases, M = correlation.shape
+        squared = (window_energies.reshape(-1, 1, 1) + self._energies[index].reshape(1, -1, 1)
+                   - 2 * correlation).reshape(n_windows, -1)
+        phase, shift = np.unravel_index(np.argmin(squared, axis=1), (n_phases, M))
+        # Parabolic interpolation of the correlation between the neighbouring translations.
+        rows = correlation[np.arange(n_windows), phase]
+        left, center, right = (rows[np.arange(n_windows), (shift + offset) % M] for offset in (-1, 0, 1))
+        curvature = left - 2 * center + right
+        offset = np.where(curvature < 0, 0.5 * (left - right) / np.where(curvature < 0, curvature, -1.), 0.)
+        offset = np.clip(offset, -0.5, 0.5)
+        peak = center - 0.25 * (left - right) * offset
+        squared = self._energies[index][phase] + window_energies - 2 * np.maximum(peak, center)
+        distances = np.sqrt(np.maximum(squared, 0.) / window_energies)
+        shifts = ((shift + offset + M / 2) % M - M / 2) * self.L / M
+
+        closed = []
+        for start, distance, window_phase, window_shift in zip(starts, distances, phase, shifts):
+            episode = self._open.get(index)
+            if distance < self.tol:
+                if episode is None:
+                    episode = self._open[index] = {'torus': index, 'start': float(start * self.dt),
+                                                   'distance': np.inf}
+                episode['end'] = float((start + self.window - 1) * self.dt)
+                if distance < episode['distance']:
+                    episode.update(distance=float(distance), time=float(start * self.dt),
+                                   phase=float(window_phase * self.dt), shift=float(window_shift))
+            elif episode is not None:
+                closed.append(self._open.pop(index))
+        return closed
+
+
+def detect_shadowing(trajectory, library, dt, L, window, tol=0.2, hop=1, chunk_size=4096, batch_size=16,
+                     window_batch_size=16):
+    """ Find the intervals of a trajectory which shadow tori of a library
+
+    Parameters
+    ----------
+    trajectory : ndarray
+        Array of shape (n_frames, M), the field of the trajectory in order of increasing time.
+    library : iterable of Torus
+        The tori to detect.
+    dt : float
+        The time step between consecutive frames.
+    L : float
+        The spatial period of the trajectory.
+    window : int
+        The number of frames compared at once.
+    tol : float
+        The relative distance below which a window shadows a torus.
+    hop : int
+        The number of frames between the starts of consecutive windows.
+    chunk_size : int
+        The number of frames processed at once.
+    batch_size : int
+        The number of tori whose correlations are computed at once.
+    window_batch_size : int
+        The number of windows whose correlations are computed at once.
+
+    Returns
+    -------
+    list of dict :
+        The shadowing episodes, in order of their start times; see ShadowingDetector.update.
+    """
+    detector = ShadowingDetector(library, dt, L, trajectory.shape[1], window, tol=tol, hop=hop,
+                                 batch_size=batch_size, window_batch_size=window_batch_size)
+    for first in range(0, trajectory.shape[0], chunk_size):
+        detector.update(trajectory[first:first+chunk_size])
+    return detector.close()
+
+
+def _template(torus, dt, M, window):
+    """ The field of a torus in the stationary frame, sampled on the grid of a trajectory
+
+    Returns
+    -------
+    template : ndarray
+        Array of shape (n_phases + window - 1, M), the field at the times 0, dt, 2 dt, ...
+    n_phases : int
+        The number of distinct phases, i.e. the number of time steps per period.
+    """
+    field = np.flipud(torus.convert(to='field').state)
+    # Only the modes which are resolved by both grids are kept; the Nyquist mode is dropped.
+    n_modes = min(M, field.shape[1]) // 2
+    space_modes = rfft(field, axis=1, norm='forward')[:, :n_modes]
+    if torus.T == 0. or field.shape[0] == 1:
+        n_phases = 1
+        modes = np.tile(space_modes[:1], (window, 1))
+    else:
+        n_phases = max(int(np.ceil(torus.T / dt)), 1)
+        times = dt * np.arange(n_phases + window - 1).reshape(-1, 1)
+        time_modes = np.fft.fft(space_modes, axis=0, norm='forward')
+        frequencies = np.fft.fftfreq(field.shape[0], d=torus.T / field.shape[0])
+        if field.shape[0] % 2 == 0:
+            time_modes[field.shape[0] // 2] = 0.
+        modes = np.dot(np.exp(2j * pi * times * frequencies.reshape(1, -1)), time_modes)
+        if getattr(torus, 'S', 0.):
+            # The same translation as RelativeTorus.comoving_transformation, continued beyond one period.
+            wave_numbers = 2 * pi * np.arange(n_modes).reshape(1, -1) / torus.L
+            modes = modes * np.exp(-1j * (torus.S / torus.T) * times * wave_numbers)
+    return irfft(modes, n=M, axis=1, norm='forward'), n_phases
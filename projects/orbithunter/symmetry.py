@@ -0,0 +1,163 @@
+from math import pi
+from torihunter.orbit import Torus, ShiftReflectionTorus, AntisymmetricTorus
+from torihunter.optimize import chord_newton
+import numpy as np
+import scipy.optimize
+
+__all__ = ['classify_symmetry', 'project_symmetry', 'symmetric_refinement']
+
+# The tori whose modes are restricted to the subspace invariant under each discrete symmetry.
+symmetric_classes = {'reflection': AntisymmetricTorus, 'shift_reflection': ShiftReflectionTorus}
+
+
+def classify_symmetry(torus, atol=1e-4, samples=8):
+    """ Test a torus for invariance under reflection and shift-reflection about any point in space
+
+    Parameters
+    ----------
+    torus : Torus
+        The torus, typically a converged solution of a search without symmetry constraints.
+    atol : float
+        The largest relative defect, ||g u - u|| / ||u||, for which the torus is deemed invariant under g.
+    samples : int
+        The number of candidate spatial translations per spatial grid point, before refinement.
+
+    Returns
+    -------
+    dict :
+        Contains the keys 'symmetry', the name of the symmetry with the smallest defect beneath atol, or None,
+        'shift', the spatial translation which maps the torus into the symmetric subspace, 'defects' and 'shifts',
+        dicts with the smallest defect and its translation for each symmetry, 'reflection' and 'shift_reflection'.
+
+    Notes
+    -----
+    The reflection, u(x, t) -> -u(-x, t), and the shift-reflection, u(x, t) -> -u(-x, t + T/2), are reflections
+    about x = 0; a torus which is invariant under reflection about another point, c, is invariant under them once
+    it is translated by c. In terms of the spatial Fourier coefficients c_k(t) the squared defect of the
+    translated torus is 2 sum |c_k|^2 + 2 Re sum_k exp(2 i q_k s) C_k, with C_k = sum_t c_k(t) c_k(t + h) and h
+    equal to zero or half of the period. Hence the defects are evaluated for every translation s without further
+    Fourier transforms; the minimum is located on a grid and refined by Brent's method. Only Torus is classified,
+    as the other classes either already are symmetric or are not doubly periodic in the laboratory frame.
+
+    Examples
+    --------
+    >>> classification = classify_symmetry(converged_torus)
+    >>> symmetric_torus = project_symmetry(converged_torus, classification['symmetry'], classification['shift'])
+    """
+    if torus.__class__ is not Torus:
+        raise ValueError('only tori without symmetry constraints, Torus, can be classified.')
+    coefficients, wave_numbers = _space_coefficients(torus)
+    norm = max(np.sum(np.abs(coefficients)**2), np.finfo(float).tiny)
+    defects, shifts = {}, {}
+    for symmetry in symmetric_classes:
+        if symmetry == 'shift_reflection' and coefficients.shape[0] % 2:
+            # Half of the period is not a translation of the temporal grid.
+            defects[symmetry], shifts[symmetry] = np.inf, 0.
+            continue
+        correlation = np.sum(coefficients * _half_period(coefficients, symmetry), axis=0)
+
+        def relative_defect(shift):
+            phases = np.exp(2j * np.multiply.outer(np.atleast_1d(shift), wave_numbers))
+            return np.sqrt(np.maximum(2.0 + 2.0 * np.dot(phases, correlation).real / norm, 0.))
+
+        # The defect is periodic in the translation with period L / 2.
+        grid = np.linspace(0, torus.L / 2.0, samples * torus.M, endpoint=False)
+        best = int(np.argmin(relative_defect(grid)))
+        spacing = grid[1] - grid[0]
+        refined = scipy.optimize.minimize_scalar(lambda shift: float(relative_defect(shift)[0]), method='bounded',
+                                                 bounds=(grid[best] - spacing, grid[best] + spacing))
+        shift = refined.x if refined.fun < relative_defect(grid[best])[0] else grid[best]
+        # The closed form loses precision to cancellation near zero, so the final defect is computed directly.
+        translated = coefficients * np.exp(1j * wave_numbers * shift)
+        defect = translated + np.conj(_half_period(translated, symmetry))
+        defects[symmetry] = float(np.sqrt(np.sum(np.abs(defect)**2) / norm))
+        shifts[symmetry] = float(np.mod(shift, torus.L))
+
+    candidates = [symmetry for symmetry in symmetric_classes if defects[symmetry] <= atol]
+    symmetry = min(candidates, key=defects.get, default=None)
+    return {'symmetry': symmetry, 'shift': shifts[symmetry] if symmetry is not None else 0.,
+            'defects': defects, 'shifts': shifts}
+
+
+def project_symmetry(torus, symmetry, shift=0.):
+    """ Translate a torus in space and project it onto the subspace invariant under a discrete symmetry
+
+    Parameters
+    ----------
+    torus : Torus
+        The torus to project.
+    symmetry : str
+        Takes values 'reflection' or 'shift_reflection'.
+    shift : float
+        The spatial translation applied before the projection, see classify_symmetry.
+
+    Returns
+    -------
+    AntisymmetricTorus or ShiftReflectionTorus :
+        The orthogonal projection, (u + g u) / 2, of the translated torus, in the spatiotemporal mode basis.
+    """
+    if symmetry not in symmetric_classes:
+        raise ValueError('symmetry must be either \'reflection\' or \'shift_reflection\'.')
+    coefficients, wave_numbers = _space_coefficients(torus)
+    translated = coefficients * np.exp(1j * wave_numbers * shift)
+    projected = 0.5 * (translated - np.conj(_half_period(translated, symmetry)))
+    spectrum = np.zeros((projected.shape[0], torus.M // 2 + 1), dtype=complex)
+    spectrum[:, 1:projected.shape[1]+1] = projected
+    field = np.fft.irfft(spectrum, n=torus.M, axis=1)
+    return symmetric_classes[symmetry](state=field, statetype='field', T=torus.T, L=torus.L).convert(to='modes')
+
+
+def symmetric_refinement(torus, method=chord_newton, atol=1e-4, **settings):
+    """ Refine a torus in the subspace of its discrete symmetry, if it has one
+
+    Parameters
+    ----------
+    torus : Torus
+        The torus to refine, typically converged by a search without symmetry constraints.
+    method : callable
+        The search method, which returns (torus, statistics), e.g. chord_newton or truncated_newton.
+    atol : float
+        The largest relative defect for which the torus is deemed symmetric, see classify_symmetry.
+    **settings :
+        Keyword arguments passed to method.
+
+    Returns
+    -------
+    torus : Torus
+        The final state of the search; an AntisymmetricTorus or ShiftReflectionTorus if a symmetry was detected.
+    statistics : dict
+        The statistics returned by method, with the additional keys 'symmetry', 'shift' and 'defects' of the
+        classification.
+
+    Notes
+    -----
+    The symmetric subspaces contain half of the modes of Torus, so each iteration of the refinement is
+    correspondingly cheaper; e.g. the dense factorizations of chord_newton by a factor of eight. The projection
+    discards the antisymmetric part of the torus, which is of the order of the defect; tori which are not
+    symmetric are refined without constraints.
+
+    Examples
+    --------
+    >>> refined_torus, statistics = symmetric_refinement(converged_torus, method=chord_newton, tol=1e-12)
+    """
+    classification = classify_symmetry(torus, atol=atol)
+    if classification['symmetry'] is not None:
+        torus = project_symmetry(torus, classification['symmetry'], classification['shift'])
+    torus, statistics = method(torus, **settings)
+    statistics.update((key, classification[key]) for key in ['symmetry', 'shift', 'defects'])
+    return torus, statistics
+
+
+def _half_period(coefficients, symmetry):
+    """ The spatial Fourier coefficients translated by half of the period in time, for shift-reflections """
+    if symmetry == 'shift_reflection':
+        return np.roll(coefficients, coefficients.shape[0] // 2, axis=0)
+    return coefficients
+
+
+def _space_coefficients(torus):
+    """ The complex spatial Fourier coefficients of the nonzero wave numbers of the field, and the wave numbers """
+    field = torus.convert(to='field').state
+    coefficients = np.fft.rfft(field, axis=1)[:, 1:(torus.M + 1) // 2]
+    wave_numbers = (2 * pi / torus.L) * np.arange(1, coefficients.shape[1] + 1)
+    return coefficients, wave_numbers
@@ -0,0 +1,155 @@
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+import warnings
+import numpy as np
+from torihunter import orbit
+
+__all__ = ['Telemetry']
+
+
+class Telemetry:
+    """ Streaming log of the iterations of searches, written by a background thread.
+
+    Parameters
+    ----------
+    filename : str
+        The log file. Files with the extension '.h5' or '.hdf5' are written with h5py, any other file is
+        written as JSON-lines, one record per line.
+    run : str
+        Identifier of the search, included in every record (JSON-lines) or used as the name of the group
+        which contains the records (HDF5). A random identifier is generated if None.
+    maxsize : int
+        The maximum number of records waiting to be written; once reached, further records are dropped
+        rather than block the search. The number of dropped records is available as the attribute 'dropped'.
+
+    Notes
+    -----
+    Each record contains the iteration number, the wall time since the Telemetry was created, the number of
+    Fourier transforms performed by Torus.convert since the previous record, the parameters T, L and S of the
+    current torus and any additional values provided by the search, typically the residual and step size.
+    Recording a value only places it on a queue; serialization and file access are done by the writer thread.
+    HDF5 logs store each value as a one-dimensional, resizable dataset in the group of the run; non-numeric
+    values are stored as attributes of the group. Several runs may share a log file within a single process,
+    but processes should use separate files.
+
+    Examples
+    --------
+    >>> with Telemetry('searches.jsonl', run='seed_42') as telemetry:
+    ...     torus, statistics = adjoint_descent(torus, telemetry=telemetry)
+    """
+
+    def __init__(self, filename, run=None, maxsize=100000):
+        self.filename = filename
+        self.run = run if run is not None else uuid.uuid4().hex[:12]
+        self.hdf5 = os.path.splitext(filename)[1] in ['.h5', '.hdf5']
+        if self.hdf5:
+            # Imported here rather than by the writer thread because the warning filters are process-wide.
+            with warnings.catch_warnings():
+                warnings.simplefilter(action='ignore', category=FutureWarning)
+                import h5py
+            self._h5py = h5py
+        self.dropped = 0
+        self._start = time.perf_counter()
+        self._transforms = _total_transforms()
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._writer = threading.Thread(target=self._write, name='telemetry-writer', daemon=True)
+        self._writer.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __repr__(self):
+        return self.__class__.__name__ + '({}, run={})'.format(self.filename, self.run)
+
+    def close(self):
+        """ Write all of the queued records and stop the writer thread """
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        return None
+
+    def record(self, iteration, torus=None, **values):
+        """ Queue the record of a single iteration
+
+        Parameters
+        ----------
+        iteration : int
+            The iteration number.
+        torus : Torus
+            The current state of the search, whose parameters are recorded.
+        **values :
+            JSON serializable values which describe the iteration, e.g. residual and step size.
+        """
+        transforms = _total_transforms()
+        record = {'run': self.run, 'iteration': int(iteration), 'wall_time': time.perf_counter() - self._start,
+                  'transforms': transforms - self._transforms}
+        self._transforms = transforms
+        if torus is not None:
+            record.update(T=float(torus.T), L=float(torus.L), S=float(torus.S))
+        record.update(values)
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+        return None
+
+    def _records(self):
+        """ Queued records, in batches of all those which are available, until the log is closed """
+        closed = False
+        while not closed:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                batch, closed = batch[:batch.index(None)], True
+            yield batch
+
+    def _write(self):
+        """ Body of the writer thread """
+        if self.hdf5:
+            self._write_hdf5()
+        else:
+            with open(self.filename, 'a') as f:
+                for batch in self._records():
+                    f.write(''.join(json.dumps(record) + '\n' for record in batch))
+                    f.flush()
+        return None
+
+    def _write_hdf5(self):
+        """ Append the records to the datasets of the run's group """
+        with self._h5py.File(self.filename, 'a') as f:
+            group = f.require_group(self.run)
+            for batch in self._records():
+                columns = {}
+                for record in batch:
+                    for key, value in record.items():
+                        if key == 'run':
+                            continue
+                        elif isinstance(value, (int, float, np.number)):
+                            columns.setdefault(key, []).append(value)
+                        else:
+                            group.attrs[key] = str(value)
+                for key, column in columns.items():
+                    if key not in group:
+                        group.create_dataset(key, shape=(0,), maxshape=(None,), chunks=(1024,), dtype='f8')
+                    dataset = group[key]
+                    dataset.resize((dataset.shape[0] + len(column),))
+                    dataset[-len(column):] = column
+                f.flush()
+        return None
+
+
+def _total_transforms():
+    """ The number of Fourier transforms performed so far by the process, see torihunter.orbit.transform_counts """
+    with orbit.transform_counts_lock:
+        return sum(orbit.transform_counts.values())
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+from torihunter.orbit import Torus, RelativeTorus, ShiftReflectionTorus, AntisymmetricTorus, EquilibriumTorus
+
+# Each class of torus, with the fixedparams which leave all of its parameters free and its parameters.
+torus_classes = [(Torus, (False, False), {}), (RelativeTorus, (False, False, False), {'S': 3.}),
+                 (ShiftReflectionTorus, (False, False), {}), (AntisymmetricTorus, (False, False), {}),
+                 (EquilibriumTorus, False, {})]
+
+
+def _random_torus(cls=Torus, parameters=None, seed=0, amplitude=1.0):
+    """ A random torus in the spatiotemporal mode basis, with a single time point for equilibria """
+    rng = np.random.RandomState(seed)
+    N = 1 if cls is EquilibriumTorus else 16
+    return cls(state=amplitude * rng.randn(N, 32), statetype='field', T=30., L=22.,
+               **(parameters or {})).convert(to='modes')
+
+
+def _smooth_field(N, M=32, seed=0):
+    """ A field which is smooth in space and time, with random phases and an amplitude of two """
+    rng = np.random.RandomState(seed)
+    coefficients = (rng.randn(N, M // 2 + 1) + 1j * rng.randn(N, M // 2 + 1)) * np.exp(-np.arange(M // 2 + 1) / 3.)
+    field = np.fft.irfft(coefficients, n=M, axis=1)
+    damping = np.exp(-np.abs(N * np.fft.fftfreq(N)) / 3.).reshape(-1, 1)
+    field = np.real(np.fft.ifft(damping * np.fft.fft(field, axis=0), axis=0))
+    field *= 2.0 / np.abs(field).max()
+    return field
+
+
+def _tangent(packing, x):
+    """ The tangent vector represented by a packed vector; parameters which are not packed are zero """
+    template = packing.template
+    vector = template.__class__(state=x[:template.state.size].reshape(template.state.shape).copy(),
+                                statetype='modes', T=template.T, L=template.L, S=template.S)
+    vector.T, vector.L, vector.S = 0., 0., 0.
+    for parameter, value in zip(packing.parameters, x[template.state.size:]):
+        setattr(vector, parameter, value)
+    return vector
+
+
+def _translate(torus, time_shift, space_shift):
+    """ The torus translated in time and space by spectral interpolation of its field """
+    field = torus.convert(to='field').state
+    N, M = field.shape
+    phases = np.exp(2j * np.pi * (np.fft.fftfreq(N).reshape(-1, 1) * N * time_shift / max(torus.T, 1.)
+                                  + np.fft.fftfreq(M) * M * space_shift / torus.L))
+    field = np.real(np.fft.ifft2(np.fft.fft2(field) * phases))
+    return torus.__class__(state=field, statetype='field', T=torus.T, L=torus.L, S=torus.S).convert(to='modes')
+
+
+@pytest.fixture(params=torus_classes, ids=[cls.__name__ for cls, _, _ in torus_classes])
+def torus_class(request):
+    """ Each class of torus, as the tuple (cls, fixedparams, parameters) """
+    return request.param
+
+
+@pytest.fixture
+def random_torus():
+    return _random_torus
+
+
+@pytest.fixture
+def smooth_field():
+    return _smooth_field
+
+
+@pytest.fixture
+def tangent():
+    return _tangent
+
+
+@pytest.fixture
+def translate():
+    return _translate
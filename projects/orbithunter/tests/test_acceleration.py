@@ -0,0 +1,41 @@
+import numpy as np
+from torihunter.acceleration import AndersonAcceleration
+from torihunter.optimize import anderson
+
+
+def linear_fixed_point(size=10, seed=0):
+    """ A contraction g(x) = M x + b whose plain iteration converges slowly """
+    rng = np.random.RandomState(seed)
+    orthogonal = np.linalg.qr(rng.randn(size, size))[0]
+    matrix = np.dot(orthogonal * np.linspace(0.5, 0.95, size), orthogonal.T)
+    return matrix, rng.randn(size)
+
+
+def test_anderson_accelerates_a_linear_fixed_point_iteration():
+    matrix, offset = linear_fixed_point()
+    solution = np.linalg.solve(np.eye(10) - matrix, offset)
+    acceleration = AndersonAcceleration(depth=10)
+    x, plain = np.zeros(10), np.zeros(10)
+    for _ in range(12):
+        x = acceleration.step(x, np.dot(matrix, x) + offset - x)
+        plain = np.dot(matrix, plain) + offset
+    # With a full history, the type II method is essentially GMRES on the linear map.
+    assert np.linalg.norm(x - solution) < 1e-4 * np.linalg.norm(solution)
+    assert np.linalg.norm(plain - solution) > 0.1 * np.linalg.norm(solution)
+    assert len(acceleration) == 10
+
+
+def test_first_step_is_mixed_and_reset_discards_history():
+    acceleration = AndersonAcceleration(depth=3, mixing=0.5)
+    x, residual = np.ones(4), np.arange(4.)
+    assert np.allclose(acceleration.step(x, residual), x + 0.5 * residual)
+    acceleration.step(x + 1.0, residual + 1.0)
+    assert len(acceleration) == 1
+    acceleration.reset()
+    assert len(acceleration) == 0 and np.allclose(acceleration.step(x, residual), x + 0.5 * residual)
+
+
+def test_anderson_descent_reduces_the_residual(random_torus):
+    torus = random_torus(amplitude=0.1)
+    final, statistics = anderson(torus, maxiter=50)
+    assert final.residual() < 1e-2 * torus.residual()
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from torihunter.packing import TorusPacking
+
+
+def test_transform_adjoints(torus_class, random_torus):
+    cls, _, parameters = torus_class
+    torus = random_torus(cls, parameters)
+    rng = np.random.RandomState(1)
+    modes = torus.copy()
+    modes.state = rng.randn(*torus.state.shape)
+    field = torus.convert(to='field')
+    field.state = rng.randn(*field.state.shape)
+    assert np.isclose(np.sum(modes.convert(to='field').state * field.state),
+                      np.sum(modes.state * field.spacetime_ifft_adjoint().state))
+    assert np.isclose(np.sum(field.convert(to='modes').state * modes.state),
+                      np.sum(field.state * modes.spacetime_fft_adjoint().state))
+
+
+def test_rmatvec_is_adjoint_of_matvec(torus_class, random_torus, tangent):
+    cls, fixedparams, parameters = torus_class
+    torus = random_torus(cls, parameters)
+    packing = TorusPacking(torus, fixedparams)
+    rng = np.random.RandomState(2)
+    x = rng.randn(packing.size)
+    w = torus.copy()
+    w.state = rng.randn(*torus.state.shape)
+    jacobian_x = torus.matvec(tangent(packing, x), fixedparams=fixedparams, preconditioning=False)
+    jacobian_transpose_w = torus.rmatvec(w, fixedparams=fixedparams, preconditioning=False)
+    inner = np.sum(jacobian_x.state * w.state)
+    assert np.isclose(inner, np.dot(x, packing.pack(jacobian_transpose_w)), rtol=1e-10)
+
+
+def test_hessvec_is_symmetric(torus_class, random_torus, tangent):
+    cls, fixedparams, parameters = torus_class
+    torus = random_torus(cls, parameters)
+    packing = TorusPacking(torus, fixedparams)
+    rng = np.random.RandomState(3)
+    x, y = rng.randn(packing.size), rng.randn(packing.size)
+    hessian_x = packing.pack(torus.hessvec(tangent(packing, x), fixedparams=fixedparams))
+    hessian_y = packing.pack(torus.hessvec(tangent(packing, y), fixedparams=fixedparams))
+    assert np.isclose(np.dot(y, hessian_x), np.dot(x, hessian_y), rtol=1e-10)
+
+
+@pytest.mark.parametrize('preconditioning', [False, True, 'block'])
+def test_normal_matvec_is_symmetric_positive_semidefinite(torus_class, random_torus, tangent, preconditioning):
+    cls, fixedparams, parameters = torus_class
+    torus = random_torus(cls, parameters)
+    packing = TorusPacking(torus, fixedparams)
+    linearization = torus.linearize(fixedparams=fixedparams)
+    normal_matrix = np.column_stack([packing.pack(linearization.normal_matvec(tangent(packing, column),
+                                                                              preconditioning=preconditioning))
+                                     for column in np.eye(packing.size)])
+    assert np.allclose(normal_matrix, normal_matrix.T, rtol=1e-10, atol=1e-10 * np.abs(normal_matrix).max())
+    eigenvalues = np.linalg.eigvalsh(0.5 * (normal_matrix + normal_matrix.T))
+    assert eigenvalues.min() >= -1e-10 * eigenvalues.max()
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+from torihunter.assembly import StoredJacobian, assemble_jacobian
+from torihunter.orbit import Torus, RelativeTorus, ShiftReflectionTorus
+
+classes = [(Torus, {}, None), (RelativeTorus, {'S': 3.}, (False, True, False)), (ShiftReflectionTorus, {}, None)]
+
+
+@pytest.mark.parametrize('extension', ['.npy', '.h5'])
+@pytest.mark.parametrize('cls, parameters, fixedparams', classes)
+def test_stored_products_match_the_dense_jacobian(tmp_path, random_torus, extension, cls, parameters, fixedparams):
+    torus = random_torus(cls, parameters)
+    dense = torus.jac() if fixedparams is None else torus.jac(fixedparams)
+    filename = str(tmp_path / ('jacobian' + extension))
+    # A block size which does not divide the number of columns leaves a partial block at the end.
+    with assemble_jacobian(torus, filename, fixedparams=fixedparams, block_size=60, threads=2, max_pending=1):
+        pass
+    rng = np.random.RandomState(1)
+    vector, covector = rng.randn(dense.shape[1]), rng.randn(dense.shape[0])
+    with StoredJacobian.open(filename) as jacobian:
+        # HDF5 datasets are read by their chunks, memory-mapped arrays by the default block size.
+        assert jacobian.shape == dense.shape and jacobian.block_size == (60 if extension == '.h5' else 64)
+        assert np.allclose(jacobian.toarray(), dense)
+        assert np.allclose(jacobian.matvec(vector), np.dot(dense, vector))
+        assert np.allclose(jacobian.rmatvec(covector), np.dot(covector, dense))
+
+
+def test_out_of_the_wrong_shape_is_rejected(random_torus):
+    torus = random_torus()
+    with pytest.raises(ValueError):
+        assemble_jacobian(torus, np.empty((torus.state.size, torus.state.size)))
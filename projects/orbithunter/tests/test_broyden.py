@@ -0,0 +1,50 @@
+import numpy as np
+from torihunter.factorization import BroydenInverse
+from torihunter.optimize import broyden
+
+
+def dense(operator, size):
+    return np.column_stack([operator(column) for column in np.eye(size)])
+
+
+def test_updates_satisfy_the_secant_condition_and_transpose():
+    rng = np.random.RandomState(0)
+    initial = np.eye(6) + 0.1 * rng.randn(6, 6)
+    inverse = BroydenInverse(lambda x: np.dot(initial, x), lambda x: np.dot(initial.T, x), memory=3)
+    for _ in range(5):
+        step, difference = rng.randn(6), rng.randn(6)
+        assert inverse.update(step, difference)
+        assert np.allclose(inverse.matvec(difference), step)
+    # The ring buffer keeps the most recent updates only, and the most recent one satisfies the secant condition.
+    assert len(inverse) == 3
+    assert np.allclose(dense(inverse.rmatvec, 6), dense(inverse.matvec, 6).T)
+    inverse.reset()
+    assert len(inverse) == 0 and np.allclose(dense(inverse.matvec, 6), initial)
+
+
+def test_degenerate_updates_are_skipped():
+    inverse = BroydenInverse(lambda x: x, lambda x: x)
+    assert not inverse.update(np.array([1., 0.]), np.array([0., 1.]))
+    assert len(inverse) == 0
+
+
+def test_linear_systems_are_solved_in_at_most_twice_their_dimension():
+    # Broyden's method terminates on linear systems within 2n iterations (Gay, 1979).
+    rng = np.random.RandomState(1)
+    matrix = np.eye(8) + 0.3 * rng.randn(8, 8)
+    target = rng.randn(8)
+    inverse = BroydenInverse(lambda x: x, lambda x: x, memory=16)
+    x = np.zeros(8)
+    mapping = np.dot(matrix, x) - target
+    for _ in range(16):
+        next_x = x - inverse.matvec(mapping)
+        next_mapping = np.dot(matrix, next_x) - target
+        inverse.update(next_x - x, next_mapping - mapping)
+        x, mapping = next_x, next_mapping
+    assert np.linalg.norm(mapping) < 1e-8 * np.linalg.norm(target)
+
+
+def test_broyden_reduces_the_residual(random_torus):
+    torus = random_torus(amplitude=0.1)
+    final, statistics = broyden(torus, maxiter=20)
+    assert statistics['status'] == 'converged' and final.residual() < 1e-8 * torus.residual()
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from torihunter.checkpoint import Checkpoint
+from torihunter.optimize import adjoint_descent, truncated_newton, resume
+
+
+def test_adjoint_descent_resumes_exactly(tmp_path, random_torus):
+    torus = random_torus(amplitude=0.1)
+    uninterrupted, uninterrupted_statistics = adjoint_descent(torus, maxiter=10)
+    with Checkpoint(str(tmp_path / 'search.npz'), frequency=4) as checkpoint:
+        adjoint_descent(torus, maxiter=6, checkpoint=checkpoint)
+        # The snapshot of the final iteration is taken, not only those which are multiples of the frequency.
+        assert checkpoint.load()['iteration'] == 6
+        resumed, statistics = resume(checkpoint, maxiter=10)
+    assert statistics['nit'] == 10 and statistics['history'] == uninterrupted_statistics['history']
+    assert np.array_equal(resumed.state, uninterrupted.state)
+
+
+def test_new_search_discards_history_of_previous_search(tmp_path, random_torus):
+    torus, filename = random_torus(amplitude=0.1), str(tmp_path / 'search.npz')
+    adjoint_descent(torus, maxiter=5, checkpoint=filename)
+    adjoint_descent(torus, maxiter=4, checkpoint=filename)
+    snapshot = Checkpoint(filename).load()
+    assert [entry['iteration'] for entry in snapshot['history']] == [1, 2, 3, 4]
+    _, statistics = resume(filename, maxiter=6)
+    assert [entry['iteration'] for entry in statistics['history']] == [1, 2, 3, 4, 5, 6]
+
+
+@pytest.mark.parametrize('preconditioning', [False, True, 'block'])
+def test_truncated_newton_resumes_with_its_preconditioning(tmp_path, random_torus, preconditioning):
+    torus = random_torus(amplitude=0.1)
+    uninterrupted, _ = truncated_newton(torus, maxiter=6, preconditioning=preconditioning)
+    with Checkpoint(str(tmp_path / 'search.npz'), frequency=3) as checkpoint:
+        truncated_newton(torus, maxiter=3, preconditioning=preconditioning, checkpoint=checkpoint)
+        assert checkpoint.load()['settings']['preconditioning'] == preconditioning
+        resumed, statistics = resume(checkpoint, maxiter=6)
+    assert statistics['nit'] == 6
+    assert np.allclose(resumed.state, uninterrupted.state)
@@ -0,0 +1,39 @@
+import numpy as np
+from torihunter.deflation import Deflation, amplitude_spectrum
+from torihunter.orbit import Torus, RelativeTorus, EquilibriumTorus
+
+
+def test_translations_of_known_tori_are_deflated(torus_class, random_torus, translate):
+    cls, _, parameters = torus_class
+    torus = random_torus(cls, parameters)
+    deflation = Deflation([torus])
+    # Only the translation by half of the spatial period preserves the discrete symmetries.
+    space_shift = 4.1 if cls in [Torus, RelativeTorus] else torus.L / 2
+    translated = translate(torus, 0. if cls is EquilibriumTorus else 7.3, space_shift)
+    assert np.linalg.norm(translated.state - torus.state) > 0.1 * np.linalg.norm(torus.state)
+    assert deflation.distances(translated)[0] < 1e-6 * np.linalg.norm(torus.state)
+
+
+def test_tori_with_equal_amplitude_spectra_are_not_deflated(torus_class, random_torus):
+    cls, _, parameters = torus_class
+    torus = random_torus(cls, parameters)
+    other = torus.copy()
+    # Negating pairs of columns of modes preserves the amplitude spectrum, but not the relative phases of the modes;
+    # negating every other one would be the translation by half of the spatial period for some classes.
+    other.state[:, 2::4] *= -1.0
+    other.state[:, 3::4] *= -1.0
+    assert np.allclose(amplitude_spectrum(other), amplitude_spectrum(torus))
+    assert Deflation([torus]).distances(other)[0] > 0.1 * np.linalg.norm(torus.state)
+
+
+def test_gradient_matches_finite_differences(torus_class, random_torus):
+    cls, _, parameters = torus_class
+    torus, known = random_torus(cls, parameters), random_torus(cls, parameters, seed=1)
+    deflation = Deflation([known, random_torus(cls, parameters, seed=2)])
+    direction = torus.copy()
+    direction.state = np.random.RandomState(3).randn(*torus.state.shape)
+    step = 1e-6
+    forward, backward = torus.copy(), torus.copy()
+    forward.state, backward.state = torus.state + step * direction.state, torus.state - step * direction.state
+    difference = (np.log(deflation.multiplier(forward)) - np.log(deflation.multiplier(backward))) / (2 * step)
+    assert np.isclose(np.sum(deflation.gradient(torus).state * direction.state), difference, rtol=1e-5)
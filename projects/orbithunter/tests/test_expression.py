@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+from torihunter.expression import TorusExpression
+
+
+@pytest.mark.parametrize('coefficients', [(1.0, -2.0, 0.5), (1e-200, 1e200, 1e-200), (1e-310, 1.0, 1e-310),
+                                          (1e300, 1e300, -1e300)])
+def test_evaluate_matches_direct_sum(random_torus, coefficients):
+    tori = [random_torus(seed=seed) for seed in range(len(coefficients))]
+    expected = sum(coefficient * torus.state for coefficient, torus in zip(coefficients, tori))
+    expression = TorusExpression([(coefficient, torus.state) for coefficient, torus in zip(coefficients, tori)],
+                                 tori[0])
+    with np.errstate(over='raise', under='ignore', invalid='raise'):
+        result = expression.evaluate()
+    assert np.all(np.isfinite(result.state))
+    assert np.allclose(result.state, expected, rtol=1e-12, atol=0.)
+
+
+def test_evaluate_with_subnormal_time_step(random_torus):
+    # e.g. u + dT * u_t with a subnormal dT, which the Horner form divided by.
+    torus, increment = random_torus(seed=0), random_torus(seed=1)
+    with np.errstate(over='raise', invalid='raise'):
+        result = (torus.lazy() + 1e-310 * increment.lazy()).evaluate()
+    assert np.array_equal(result.state, torus.state + 1e-310 * increment.state)
+
+
+def test_evaluate_into_aliased_output(random_torus):
+    out, other = random_torus(seed=0), random_torus(seed=1)
+    expected = 2.0 * out.state - 3.0 * other.state
+    result = (2.0 * out.lazy() - 3.0 * other.lazy()).evaluate(out=out)
+    assert result is out and np.allclose(out.state, expected)
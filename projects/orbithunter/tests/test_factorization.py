@@ -0,0 +1,45 @@
+import numpy as np
+from torihunter.factorization import FactorizationCache, JacobianFactorization
+from torihunter.optimize import chord_newton, minimize
+from torihunter.orbit import RelativeTorus
+
+
+def relative_periodic_solution(smooth_field):
+    """ A converged relative periodic solution with a nonzero shift, from a smooth field of order one amplitude """
+    torus = RelativeTorus(state=smooth_field(32, seed=5), statetype='field', T=50., L=22., S=5.).convert(to='modes')
+    torus, _ = minimize(torus, maxiter=500, preconditioning='block')
+    torus, statistics = chord_newton(torus, maxiter=40, tol=1e-12)
+    assert statistics['status'] == 'converged' and torus.residual() < 1e-10
+    return torus
+
+
+def test_cache_is_reused_along_continuation(smooth_field):
+    torus = relative_periodic_solution(smooth_field)
+    # The solution is neither an equilibrium nor a periodic orbit in the laboratory frame.
+    assert np.linalg.norm(torus.state) > 1.0 and 0.1 < np.mod(torus.S, torus.L) < torus.L - 0.1
+    # Continuation in the spatial period, with the period and the shift free.
+    fixedparams = (False, True, False)
+    cache = FactorizationCache(maxsize=2, rtol=0.01)
+    factorizations = []
+    for step in range(1, 4):
+        torus = torus.copy()
+        torus.L += 0.002
+        torus, statistics = chord_newton(torus, maxiter=20, tol=1e-10, fixedparams=fixedparams, cache=cache)
+        assert statistics['status'] == 'converged' and torus.residual() < 1e-10
+        factorizations.append(statistics['factorizations'])
+    assert cache.misses == 1 and cache.hits == 2
+    # The cached factorizations replace those which each step would otherwise compute before its first correction.
+    assert all(count < factorizations[0] for count in factorizations[1:])
+
+    torus = torus.copy()
+    torus.L += 0.002
+    mapping = torus.spatiotemporal_mapping()
+    factorization = cache.get(torus, fixedparams)
+    assert cache.hits == 3 and factorization.uses > 0 and factorization.distance(torus) > 0.
+    step = factorization.solve(mapping)
+    # The reused step is the minimum norm solution of J(x_0) dx = -F(x), with the Jacobian of the factorized state.
+    jacobian = factorization.torus.jac(fixedparams=fixedparams)
+    expected = np.linalg.lstsq(jacobian, -mapping.state.ravel(), rcond=None)[0]
+    assert np.allclose(factorization.packing.pack(step), expected, rtol=1e-8, atol=1e-8 * np.abs(expected).max())
+    fresh = JacobianFactorization(factorization.torus, fixedparams).solve(mapping)
+    assert np.allclose(fresh.state, step.state) and np.isclose(fresh.T, step.T) and np.isclose(fresh.S, step.S)
@@ -0,0 +1,22 @@
+import subprocess
+import sys
+
+
+def test_orbit_does_not_import_optional_dependencies():
+    # The equations are evaluated by headless processes which need neither plotting nor HDF5 support.
+    code = ('import sys, numpy; import torihunter.orbit as orbit; '
+            'torus = orbit.Torus(state=numpy.random.randn(16, 32), statetype="field", T=30., L=22.); '
+            'torus.jac(threads=2); '
+            'print(",".join(module for module in ["h5py", "matplotlib"] if module in sys.modules))')
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == ''
+
+
+def test_hdf5_support_keeps_the_warning_filters_of_the_caller(tmp_path):
+    code = ('import warnings, numpy; import torihunter.orbit as orbit; '
+            'warnings.filterwarnings("error", message="caller filter"); filters = list(warnings.filters); '
+            'torus = orbit.Torus(state=numpy.random.randn(16, 32), statetype="field", T=30., L=22.); '
+            'torus.to_h5("torus.h5", directory={!r}); '
+            'print(warnings.filters == filters)').format(str(tmp_path))
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == 'True'
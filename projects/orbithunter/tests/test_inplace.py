@@ -0,0 +1,53 @@
+import operator
+import numpy as np
+import pytest
+from torihunter.orbit import Torus, RelativeTorus
+
+
+def random_torus(cls=Torus, seed=0):
+    rng = np.random.RandomState(seed)
+    return cls(state=rng.randn(16, 32), statetype='field', T=30. + seed, L=22. + seed, S=seed).convert(to='modes')
+
+
+@pytest.mark.parametrize('operation, scalar, expected', [(operator.iadd, False, lambda x, y: x + y),
+                                                         (operator.isub, False, lambda x, y: x - y),
+                                                         (operator.imul, True, lambda x, y: 3.0 * x),
+                                                         (operator.itruediv, True, lambda x, y: x / 3.0)])
+def test_inplace_operators_update_the_state_buffer(operation, scalar, expected):
+    torus, other = random_torus(), random_torus(seed=1)
+    initial, buffer = torus.state.copy(), torus.state
+    assert operation(torus, 3.0 if scalar else other) is torus and torus.state is buffer
+    assert np.allclose(torus.state, expected(initial, other.state))
+    # Only the state changes.
+    assert (torus.T, torus.L) == (30., 22.)
+
+
+@pytest.mark.parametrize('cls', [Torus, RelativeTorus])
+def test_axpy_updates_state_and_parameters_in_place(cls):
+    torus, other = random_torus(cls), random_torus(cls, seed=1)
+    expected = torus.state - 0.5 * other.state
+    buffer = torus.state
+    assert torus.axpy(-0.5, other) is torus and torus.state is buffer
+    assert np.allclose(torus.state, expected)
+    assert np.isclose(torus.T, 30. - 0.5 * 31.) and np.isclose(torus.L, 22. - 0.5 * 23.)
+    assert torus.S == (-0.5 if cls is RelativeTorus else 0.)
+
+
+def test_copy_into_preallocated_torus():
+    torus, out = random_torus(RelativeTorus), random_torus(RelativeTorus, seed=1)
+    buffer = out.state
+    assert torus.copy(out=out) is out and out.state is buffer
+    assert np.array_equal(out.state, torus.state) and (out.T, out.L, out.S) == (torus.T, torus.L, torus.S)
+    out *= 2.0
+    assert not np.array_equal(out.state, torus.state)
+
+
+def test_view_shares_the_state():
+    torus = random_torus()
+    view = torus.view()
+    assert view.state is torus.state and (view.T, view.L) == (torus.T, torus.L)
+    view += random_torus(seed=1)
+    assert np.array_equal(torus.state, view.state)
+    copy = torus.copy()
+    copy *= 0.
+    assert np.any(torus.state != 0.)
@@ -0,0 +1,15 @@
+import numpy as np
+import pytest
+from torihunter.packing import TorusPacking
+
+
+@pytest.mark.parametrize('threads', [None, 1, 3])
+def test_jac_matches_matvec(torus_class, random_torus, tangent, threads):
+    cls, fixedparams, parameters = torus_class
+    torus = random_torus(cls, parameters)
+    packing = TorusPacking(torus, fixedparams)
+    x = np.random.RandomState(1).randn(packing.size)
+    jacobian = np.asarray(torus.jac(fixedparams=fixedparams, threads=threads))
+    product = torus.matvec(tangent(packing, x), fixedparams=fixedparams, preconditioning=False).state.ravel()
+    assert jacobian.shape == (torus.state.size, packing.size)
+    assert np.allclose(np.dot(jacobian, x), product, rtol=1e-10, atol=1e-10 * np.abs(product).max())
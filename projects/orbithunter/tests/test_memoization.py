@@ -0,0 +1,60 @@
+import numpy as np
+
+
+def fresh_field(torus):
+    """ The field of a torus computed without any memoized conversions """
+    return torus.copy().convert(to='field').state
+
+
+def test_conversions_are_memoized(random_torus):
+    torus = random_torus()
+    assert torus.convert(to='field').state is torus.convert(to='field').state
+    torus.state = 2.0 * torus.state
+    assert np.allclose(torus.convert(to='field').state, fresh_field(torus))
+
+
+def test_inplace_operators_on_a_conversion_invalidate_the_original(random_torus):
+    torus = random_torus()
+    field = torus.convert(to='field')
+    expected = field.state.copy()
+    field *= 2.0
+    assert np.allclose(torus.convert(to='field').state, expected)
+    assert np.allclose(field.convert(to='modes').state, 2.0 * torus.state)
+    field += random_torus(seed=1).convert(to='field')
+    assert np.allclose(torus.convert(to='field').state, expected)
+
+
+def test_inplace_operators_on_a_view_invalidate_shared_conversions(random_torus):
+    torus, other = random_torus(), random_torus(seed=1)
+    view = torus.view()
+    torus.convert(to='field')
+    view -= other
+    assert np.allclose(torus.convert(to='field').state, fresh_field(torus))
+    assert np.allclose(view.convert(to='field').state, fresh_field(view))
+    torus.convert(to='s_modes')
+    view.axpy(0.5, other)
+    assert np.allclose(torus.convert(to='s_modes').state, torus.copy().convert(to='s_modes').state)
+
+
+def test_inplace_conversion_then_inplace_operator(random_torus):
+    torus = random_torus()
+    view = torus.view()
+    expected = fresh_field(torus)
+    torus.convert(to='field', inplace=True)
+    assert np.allclose(torus.state, expected)
+    torus *= 3.0
+    # The view still holds the modes; the field memoized for them must not have been scaled.
+    assert np.allclose(view.convert(to='field').state, expected)
+    assert np.allclose(torus.convert(to='modes').state, 3.0 * view.state)
+
+
+def test_axpy_and_copy_into_a_conversion_invalidate_the_original(random_torus):
+    torus, other = random_torus(), random_torus(seed=1)
+    expected = fresh_field(torus)
+    field = torus.convert(to='field')
+    field.axpy(1.0, other.convert(to='field'))
+    assert np.allclose(torus.convert(to='field').state, expected)
+    field = torus.convert(to='field')
+    other.convert(to='field').copy(out=field)
+    assert np.allclose(torus.convert(to='field').state, expected)
+    assert np.allclose(field.state, fresh_field(other))
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from torihunter.optimize import minimize
+from torihunter.packing import TorusPacking
+
+
+def central_difference(function, x, direction, step=1e-6):
+    return (function(x + step * direction) - function(x - step * direction)) / (2.0 * step)
+
+
+def test_gradient_matches_finite_differences(torus_class, random_torus):
+    cls, fixedparams, parameters = torus_class
+    torus = random_torus(cls, parameters, amplitude=0.1)
+    packing = TorusPacking(torus, fixedparams)
+    x = packing.pack(torus)
+    direction = np.random.RandomState(1).randn(packing.size)
+    directional_derivative = central_difference(packing.objective, x, direction)
+    assert np.isclose(np.dot(packing.gradient(x), direction), directional_derivative, rtol=1e-7)
+
+
+def test_hessp_matches_finite_differences_of_gradient(torus_class, random_torus):
+    cls, fixedparams, parameters = torus_class
+    # The second derivatives with respect to the parameters are not included, see Torus.hessvec.
+    fixedparams = True if isinstance(fixedparams, bool) else tuple(True for _ in fixedparams)
+    torus = random_torus(cls, parameters, amplitude=0.1)
+    packing = TorusPacking(torus, fixedparams)
+    x = packing.pack(torus)
+    direction = np.random.RandomState(2).randn(packing.size)
+    difference = central_difference(packing.gradient, x, direction)
+    assert np.allclose(packing.hessp(x, direction), difference, rtol=1e-7, atol=1e-7 * np.abs(difference).max())
+
+
+@pytest.mark.parametrize('preconditioning', [False, True])
+def test_minimize_reduces_cost(torus_class, random_torus, preconditioning):
+    cls, fixedparams, parameters = torus_class
+    torus = random_torus(cls, parameters, amplitude=0.1)
+    packing = TorusPacking(torus, fixedparams)
+    initial_cost = packing.objective(packing.pack(torus))
+    minimized_torus, result = minimize(torus, maxiter=200, fixedparams=fixedparams, preconditioning=preconditioning)
+    assert result.fun < 1e-3 * initial_cost
+    if preconditioning:
+        # The exact gradient lets L-BFGS converge rather than stall on inconsistent line searches.
+        assert result.success and result.fun < 1e-6 * initial_cost
+
+
+def test_unpack_sees_points_updated_in_place(random_torus):
+    torus = random_torus(amplitude=0.1)
+    packing = TorusPacking(torus, (False, False))
+    x = packing.pack(torus)
+    initial_cost = packing.objective(x)
+    x *= 2.0
+    expected = TorusPacking(torus, (False, False)).objective(x.copy())
+    assert packing.objective(x) == expected != initial_cost
+    x /= 2.0
+    assert packing.objective(x) == initial_cost
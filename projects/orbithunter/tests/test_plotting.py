@@ -0,0 +1,16 @@
+import os
+import numpy as np
+from torihunter.orbit import Torus
+from torihunter.plotting import render_catalog
+
+
+def test_catalog_filenames_are_unique(tmp_path):
+    rng = np.random.RandomState(0)
+    # Periods which Torus.parameter_dependent_filename maps to the same name, and a duplicated torus.
+    periods = [30.05, 30.5, 30.0004, 30.0004]
+    catalog = [Torus(state=rng.randn(8, 16), statetype='field', T=T, L=22.) for T in periods]
+    filenames = render_catalog(catalog, str(tmp_path), quality='draft', processes=2, contact_sheet_shape=(2, 2))
+    assert len(set(filenames)) == len(catalog)
+    assert all(os.path.isfile(filename) for filename in filenames)
+    assert len(os.listdir(str(tmp_path / 'thumbnails'))) == len(catalog)
+    assert os.path.basename(filenames[0]) == '0_Torus_L22p0_T30p05.png'
@@ -0,0 +1,24 @@
+import numpy as np
+from torihunter import orbit
+from torihunter.orbit import Torus
+from torihunter.pool import ShapeAffinePool
+
+
+def random_torus(N, M, seed=0):
+    return Torus(state=np.random.RandomState(seed).randn(N, M), statetype='field', T=30., L=22.).convert(to='modes')
+
+
+def test_jac_does_not_retain_operators():
+    jacobian = random_torus(16, 16).jac()
+    assert jacobian.shape[0] == random_torus(16, 16).state.size
+    assert len(orbit.operator_cache) == 0
+
+
+def test_workers_cache_the_operators_of_their_shapes():
+    with ShapeAffinePool(processes=2) as pool:
+        futures = [pool.submit(Torus.jac, random_torus(N, M, seed=seed)) for seed, (N, M) in
+                   enumerate([(16, 16), (16, 16), (8, 16)])]
+        jacobians = [future.result() for future in futures]
+        cache_info = pool.cache_info()
+    assert np.array_equal(jacobians[0], random_torus(16, 16).jac())
+    assert sorted(cache_info) == [[('Torus', 8, 16)], [('Torus', 16, 16)]]
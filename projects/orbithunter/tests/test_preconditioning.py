@@ -0,0 +1,61 @@
+import numpy as np
+import scipy.sparse.linalg
+from torihunter.orbit import RelativeTorus, EquilibriumTorus
+from torihunter.packing import TorusPacking
+from torihunter.preconditioning import BlockPreconditioner, column_scalings
+
+
+def smooth_torus(smooth_field, cls, parameters):
+    """ A torus whose field is smooth in space and time """
+    field = smooth_field(1 if cls is EquilibriumTorus else 32)
+    return cls(state=field, statetype='field', T=40., L=22., **parameters).convert(to='modes')
+
+
+def cg_iterations(linearization, packing, preconditioning):
+    """ The number of conjugate gradient iterations for a consistent system of the (preconditioned) normal matrix """
+    def normal_matvec(x):
+        vector = packing.template.copy()
+        vector.state = np.asarray(x, dtype=float)[:vector.state.size].reshape(vector.state.shape)
+        vector.T, vector.L, vector.S = 0., 0., 0.
+        for parameter, value in zip(packing.parameters, np.asarray(x, dtype=float).ravel()[vector.state.size:]):
+            setattr(vector, parameter, value)
+        return packing.pack(linearization.normal_matvec(vector, preconditioning=preconditioning))
+
+    operator = scipy.sparse.linalg.LinearOperator((packing.size, packing.size), matvec=normal_matvec)
+    # The normal matrix is singular (translations), so the right hand side is taken in its range.
+    rhs = normal_matvec(np.random.RandomState(1).randn(packing.size))
+    iterations = []
+    scipy.sparse.linalg.cg(operator, rhs, rtol=1e-6, maxiter=2000, callback=iterations.append)
+    return len(iterations)
+
+
+def test_block_preconditioner_reduces_iterations(torus_class, smooth_field):
+    cls, fixedparams, parameters = torus_class
+    torus = smooth_torus(smooth_field, cls, parameters)
+    linearization = torus.linearize(fixedparams=fixedparams)
+    packing = TorusPacking(torus, fixedparams)
+    diagonal = cg_iterations(linearization, packing, True)
+    block = cg_iterations(linearization, packing, 'block')
+    if cls is EquilibriumTorus:
+        # Without time derivatives, the blocks are diagonal and both preconditioners need very few iterations.
+        assert block <= diagonal
+    else:
+        assert block < 0.95 * diagonal
+
+
+def test_parameter_columns_are_equilibrated(torus_class, smooth_field):
+    cls, fixedparams, parameters = torus_class
+    torus = smooth_torus(smooth_field, cls, parameters)
+    linearization = torus.linearize(fixedparams=fixedparams)
+    preconditioner = BlockPreconditioner(linearization, side='right')
+    assert preconditioner.scalings == column_scalings(linearization)
+    for parameter, column in linearization.parameter_columns.items():
+        assert np.isclose(preconditioner.scalings[parameter] * np.linalg.norm(column), 1.0)
+
+
+def test_block_preconditioner_inverse(smooth_field):
+    torus = smooth_torus(smooth_field, RelativeTorus, {'S': 2.})
+    preconditioner = BlockPreconditioner(torus.linearize(fixedparams=(False, False, False)), side='right')
+    vector = np.random.RandomState(2).randn(preconditioner.shape[0])
+    assert np.allclose(preconditioner.inv().matvec(preconditioner.matvec(vector)), vector)
+    assert np.allclose(preconditioner.inv().rmatvec(preconditioner.rmatvec(vector)), vector)
@@ -0,0 +1,26 @@
+import numpy as np
+from torihunter.scan import ParameterScan
+
+
+def test_residual_and_mapping_match_the_torus(torus_class, random_torus):
+    cls, _, parameters = torus_class
+    scan = ParameterScan(random_torus(cls, parameters))
+    for T, L, S in [(30., 22., 3.), (45., 20.5, -1.), (27.5, 24., 0.5)]:
+        retargeted = scan.retarget(T, L, S)
+        assert np.isclose(scan.residual(T, L, S), retargeted.residual(), rtol=1e-10)
+        assert np.allclose(scan.mapping(T, L, S).state, retargeted.spatiotemporal_mapping().state)
+
+
+def test_gradient_and_grid(torus_class, random_torus):
+    cls, _, parameters = torus_class
+    scan = ParameterScan(random_torus(cls, parameters))
+    point = {'T': 33., 'L': 21., 'S': 2.}
+    gradient = scan.gradient(**point)
+    for index, parameter in enumerate(scan.parameters):
+        forward, backward = dict(point), dict(point)
+        forward[parameter] += 1e-4
+        backward[parameter] -= 1e-4
+        difference = (scan.residual(**forward) - scan.residual(**backward)) / 2e-4
+        assert np.isclose(gradient[index], difference, rtol=1e-6)
+    grid = scan.grid(T=[30., 33.], L=[21., 22., 23.])
+    assert grid.shape == (2, 3) and np.isclose(grid[1, 0], scan.residual(33., 21.))
@@ -0,0 +1,27 @@
+import numpy as np
+from torihunter.optimize import adjoint_descent
+from torihunter.scheduling import successive_halving
+
+
+def test_seeds_are_pruned_each_round(random_torus):
+    seeds = [random_torus(seed=seed) for seed in range(4)]
+    converged, report = successive_halving(seeds, tol=1e-12, min_iter=5, maxiter=40)
+    assert converged == [] and [entry['seed'] for entry in report] == [0, 1, 2, 3]
+    # Rounds of 5, 10 and 20 iterations halve the seeds; the last one is cut short by maxiter.
+    summary = sorted((entry['round'], entry['nit'], entry['status']) for entry in report)
+    assert summary == [(0, 5, 'pruned'), (0, 5, 'pruned'), (1, 15, 'pruned'), (3, 40, 'maxiter')]
+    for entry in report:
+        assert np.isclose(entry['residual'], entry['torus'].residual())
+
+
+def test_rounds_continue_the_searches_and_match_in_parallel(random_torus):
+    seeds = [random_torus(seed=seed) for seed in range(4)]
+    _, report = successive_halving(seeds, tol=1e-12, min_iter=5, maxiter=40)
+    _, parallel_report = successive_halving(seeds, tol=1e-12, min_iter=5, maxiter=40, processes=2)
+    for entry, parallel_entry in zip(report, parallel_report):
+        assert entry['status'] == parallel_entry['status'] and entry['nit'] == parallel_entry['nit']
+        assert np.allclose(entry['torus'].state, parallel_entry['torus'].state)
+    # The survivor is continued from its final state and step size, as if it had never been interrupted.
+    survivor = next(entry for entry in report if entry['status'] == 'maxiter')
+    uninterrupted, _ = adjoint_descent(seeds[survivor['seed']], tol=1e-12, maxiter=40)
+    assert np.allclose(survivor['torus'].state, uninterrupted.state)
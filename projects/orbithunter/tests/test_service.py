@@ -0,0 +1,56 @@
+import asyncio
+import pytest
+from torihunter.optimize import adjoint_descent
+from torihunter.service import SearchService
+
+
+async def collect(job):
+    return [event async for event in job.events()]
+
+
+def test_cancellation_backpressure_and_event_ordering(random_torus):
+    async def scenario():
+        async with SearchService(processes=1, max_concurrent=1, max_pending=2, progress_every=1) as service:
+            running = await service.submit(random_torus(amplitude=0.1), tol=0., maxiter=10**6)
+            running_events = asyncio.ensure_future(collect(running))
+            queued = await service.submit(random_torus(seed=1, amplitude=0.1), tol=0., maxiter=10**6)
+            queued_events = asyncio.ensure_future(collect(queued))
+            # Two searches are pending, so the next submission waits for one of them to finish.
+            blocked = asyncio.ensure_future(service.submit(random_torus(seed=2, amplitude=0.1), maxiter=3))
+            while running.status != 'running':
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.2)
+            assert not blocked.done() and queued.status == 'queued'
+            queued.cancel()
+            running.cancel()
+            running_torus, running_statistics = await running
+            _, queued_statistics = await queued
+            last = await blocked
+            _, last_statistics = await last
+            return (running, running_statistics, await running_events, queued, queued_statistics,
+                    await queued_events, last, last_statistics)
+
+    (running, running_statistics, running_events, queued, queued_statistics, queued_events, last,
+     last_statistics) = asyncio.run(scenario())
+    assert running.status == 'cancelled' and running_statistics['status'] == 'cancelled'
+    kinds = [event['event'] for event in running_events]
+    assert kinds[0] == 'started' and kinds[-1] == 'cancelled' and set(kinds[1:-1]) == {'progress'}
+    iterations = [event['iteration'] for event in running_events[1:-1]]
+    assert iterations == sorted(iterations) and running_statistics['nit'] >= iterations[-1]
+    # The queued search never started.
+    assert queued.status == 'cancelled' and queued_statistics['nit'] == 0
+    assert [event['event'] for event in queued_events] == ['cancelled']
+    assert last.status == 'finished' and last_statistics['nit'] == 3
+
+
+def test_failures_propagate_to_the_job(random_torus):
+    async def scenario():
+        async with SearchService(processes=1) as service:
+            job = await service.submit(random_torus(amplitude=0.1), method=adjoint_descent, unknown_setting=True)
+            events = await collect(job)
+            with pytest.raises(TypeError):
+                await job
+            return job, events
+
+    job, events = asyncio.run(scenario())
+    assert job.status == 'failed' and [event['event'] for event in events] == ['started', 'failed']
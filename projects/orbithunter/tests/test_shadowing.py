@@ -0,0 +1,48 @@
+import tracemalloc
+import numpy as np
+from torihunter.orbit import Torus
+from torihunter.shadowing import ShadowingDetector, detect_shadowing, _template
+
+
+def library(M=32):
+    rng = np.random.RandomState(0)
+    return [Torus(state=rng.randn(16, M), statetype='field', T=20., L=22.).convert(to='modes') for _ in range(3)]
+
+
+def trajectory(torus, dt, n_frames, M=32):
+    """ Noise into which 200 frames of a torus, translated in space, are embedded """
+    frames = 3.0 * np.random.RandomState(1).randn(n_frames, M)
+    template, _ = _template(torus, dt, M, 200)
+    frames[100:300] = np.roll(template[:200], 5, axis=1)
+    return frames
+
+
+def peak_memory_of_update(tori, dt, frames):
+    detector = ShadowingDetector(tori, dt, 22., frames.shape[1], window=20, batch_size=2, window_batch_size=8)
+    tracemalloc.start()
+    try:
+        detector.update(frames)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_chunking_does_not_change_episodes():
+    tori, dt = library(), 0.5
+    frames = trajectory(tori[1], dt, 600)
+    reference = detect_shadowing(frames, tori, dt, 22., window=20, chunk_size=600, batch_size=3,
+                                 window_batch_size=1000)
+    episodes = detect_shadowing(frames, tori, dt, 22., window=20, chunk_size=97, batch_size=2, window_batch_size=7)
+    assert [episode['torus'] for episode in reference] == [1]
+    assert len(episodes) == len(reference)
+    for episode, expected in zip(episodes, reference):
+        assert episode.keys() == expected.keys()
+        assert all(np.isclose(episode[key], expected[key]) for key in expected)
+
+
+def test_update_memory_does_not_grow_with_chunk_size():
+    tori, dt = library(), 0.5
+    small, large = trajectory(tori[1], dt, 400), trajectory(tori[1], dt, 4000)
+    growth = peak_memory_of_update(tori, dt, large) - peak_memory_of_update(tori, dt, small)
+    # Beyond the copy of the frames kept by update, nothing is allocated per frame of the chunk.
+    assert growth < 4 * (large.nbytes - small.nbytes)
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+from torihunter.orbit import Torus, ShiftReflectionTorus, AntisymmetricTorus
+from torihunter.symmetry import classify_symmetry, project_symmetry
+
+
+def symmetric_torus(random_torus, cls):
+    """ A random torus in the subspace of a discrete symmetry, as a Torus and as its own class """
+    torus = random_torus(cls)
+    field = torus.convert(to='field').state
+    return Torus(state=field, statetype='field', T=torus.T, L=torus.L).convert(to='modes'), torus
+
+
+@pytest.mark.parametrize('cls, symmetry', [(ShiftReflectionTorus, 'shift_reflection'),
+                                           (AntisymmetricTorus, 'reflection')])
+def test_classification_and_projection_undo_a_translation(random_torus, translate, cls, symmetry):
+    torus, symmetric = symmetric_torus(random_torus, cls)
+    translated = translate(torus, 0., 3.7)
+    classification = classify_symmetry(translated)
+    # The located translation is accurate to the precision of the bounded scalar minimization.
+    assert classification['symmetry'] == symmetry and classification['defects'][symmetry] < 1e-4
+    projection = project_symmetry(translated, symmetry, classification['shift'])
+    assert isinstance(projection, cls)
+    # Invariance about x = 0 implies invariance about x = L / 2, so either translation may be found.
+    field = projection.convert(to='field').state
+    candidates = [symmetric.convert(to='field').state, translate(symmetric, 0., torus.L / 2).convert(to='field').state]
+    assert min(np.abs(field - candidate).max() for candidate in candidates) < 1e-4 * np.abs(field).max()
+
+
+def test_tori_without_symmetry_are_not_classified(random_torus):
+    classification = classify_symmetry(random_torus())
+    assert classification['symmetry'] is None and min(classification['defects'].values()) > 0.1
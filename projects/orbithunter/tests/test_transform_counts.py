@@ -0,0 +1,29 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from torihunter import orbit
+from torihunter.orbit import Torus
+
+
+def convert_tori(count, field):
+    for _ in range(count):
+        # Each new torus converts from the field to the spatiotemporal modes with two transforms.
+        Torus(state=field, statetype='field', T=30., L=22.).convert(to='modes')
+
+
+def test_transform_counts_are_exact_with_threads():
+    field = np.random.RandomState(0).randn(8, 16)
+    threads, count = 8, 250
+    interval = sys.getswitchinterval()
+    # Frequent thread switches expose unsynchronized read-modify-write updates.
+    sys.setswitchinterval(1e-6)
+    try:
+        with orbit.transform_counts_lock:
+            before = dict(orbit.transform_counts)
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            for future in [executor.submit(convert_tori, count, field) for _ in range(threads)]:
+                future.result()
+    finally:
+        sys.setswitchinterval(interval)
+    for transform in ['space_fft', 'time_fft']:
+        assert orbit.transform_counts[transform] - before.get(transform, 0) == threads * count